@@ -0,0 +1,80 @@
+"""
+Response cache.
+
+`cache` is the process-wide backend selected by settings.CACHE_BACKEND:
+- memory : per-process dict (default); deletes/clears are broadcast to the
+           other workers through a shared invalidation log
+- shm    : SQLite on /dev/shm shared by all workers on the host
+- redis  : any Redis-protocol server at settings.REDIS_URL
+
+The shm database and the invalidation log are private to the deployment:
+settings.CACHE_NAMESPACE, by default derived from the app directory and the
+databases it serves.
+"""
+
+import hashlib
+import json
+import os
+from functools import wraps
+
+from app.config import settings
+from app.cache.base import CacheBackend
+from app.cache.memory import InMemoryCache
+from app.cache.shm import SharedMemoryCache, InvalidationLog, shm_path
+from app.cache.redis import RedisCache
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+
+def cache_namespace() -> str:
+    """Namespace of this deployment's same-host cache files."""
+    if settings.CACHE_NAMESPACE:
+        return settings.CACHE_NAMESPACE
+    app_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    identity = "|".join([app_root, settings.MONGO_URI, settings.MONGO_DB, settings.ES_HOST, settings.ES_INDEX])
+    return hashlib.blake2b(identity.encode(), digest_size=6).hexdigest()
+
+
+def create_cache(backend: str = "", default_ttl: int = 300) -> CacheBackend:
+    backend = (backend or settings.CACHE_BACKEND).lower()
+    if backend == "redis":
+        return RedisCache(settings.REDIS_URL, default_ttl=default_ttl)
+    if backend == "shm":
+        path = shm_path("cart_cache.db", settings.CACHE_SHM_DIR, cache_namespace())
+        return SharedMemoryCache(path, default_ttl)
+    log = None
+    if settings.CACHE_BROADCAST:
+        try:
+            log = InvalidationLog(
+                shm_path("cart_cache_invalidations.db", settings.CACHE_SHM_DIR, cache_namespace())
+            )
+        except OSError as e:
+            logger.warning("Cache invalidation broadcast disabled: %s", e)
+    return InMemoryCache(default_ttl=default_ttl, invalidation_log=log)
+
+
+# Global cache instance
+cache = create_cache(default_ttl=300)
+
+def cache_key(*args, **kwargs) -> str:
+    """Generate a cache key from arguments."""
+    key_data = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True, default=str)
+    return hashlib.md5(key_data.encode()).hexdigest()
+
+def cached(ttl: int = 300):
+    """Decorator to cache function results."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = f"{func.__name__}:{cache_key(*args, **kwargs)}"
+            result = cache.get(key)
+            if result is not None:
+                logger.debug("Cache HIT: %.50s...", key)
+                return result
+            logger.debug("Cache MISS: %.50s...", key)
+            result = func(*args, **kwargs)
+            cache.set(key, result, ttl)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,91 @@
+"""
+Cache backend interface.
+
+Every backend stores JSON-compatible values (optionally carrying a
+pre-encoded `encoded` bytes payload, see utils.serialization.encode_payload)
+under string keys with a TTL in seconds. Shared backends serialize them with
+dump_entry / load_entry, never pickle — a cache file or server that someone
+else can write to must not be able to run code in the app. Shared backends (shm, redis) are visible to every worker, so a
+delete/clear in one worker reaches all of them; the per-process memory backend
+broadcasts its invalidations through an InvalidationLog instead.
+
+Entries can carry tags naming what they depend on ("category:shoes",
+"product:<id>", ...); invalidate_tags() drops every entry bearing any of them.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+from app.utils.serialization import dumps, loads
+
+# Entry formats: a pre-encoded payload (JSON header + raw bytes) or plain JSON
+_PAYLOAD_ENTRY = b"P"
+_JSON_ENTRY = b"J"
+_HEADER_LEN_BYTES = 4
+
+
+class CacheBackend:
+    default_ttl: int = 300
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Delete every entry tagged with any of `tags`. Returns how many were
+        dropped (in this process / store)."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def cleanup_expired(self) -> int:
+        """Remove all expired entries. Returns count of removed items."""
+        return 0
+
+    def stats(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+def payload_sizes(value: Any) -> tuple[int, int]:
+    """(raw, stored) byte sizes for a pre-encoded response payload
+    (utils.serialization.encode_payload), or (0, 0) for anything else."""
+    if isinstance(value, dict) and "raw_size" in value:
+        return value["raw_size"], len(value["encoded"])
+    return 0, 0
+
+
+def dump_entry(value: Any) -> bytes:
+    """Serialize a cache value for a shared backend. A pre-encoded payload's
+    bytes are appended raw after its JSON header instead of being escaped."""
+    if isinstance(value, dict) and isinstance(value.get("encoded"), bytes):
+        header = dumps({k: v for k, v in value.items() if k != "encoded"})
+        return _PAYLOAD_ENTRY + len(header).to_bytes(_HEADER_LEN_BYTES, "big") + header + value["encoded"]
+    return _JSON_ENTRY + dumps(value)
+
+
+def load_entry(data: bytes) -> Any:
+    """Inverse of dump_entry. Raises ValueError for anything else (including
+    entries written by older, pickling versions — treat as a miss)."""
+    kind, body = data[:1], data[1:]
+    if kind == _PAYLOAD_ENTRY:
+        header_len = int.from_bytes(body[:_HEADER_LEN_BYTES], "big")
+        value = loads(body[_HEADER_LEN_BYTES:_HEADER_LEN_BYTES + header_len])
+        value["encoded"] = bytes(body[_HEADER_LEN_BYTES + header_len:])
+        return value
+    if kind == _JSON_ENTRY:
+        return loads(body)
+    raise ValueError("Unrecognised cache entry format")
+
+
+def compression_stats(raw: int, stored: int, count: int) -> Dict[str, Any]:
+    return {
+        "payload_keys": count,
+        "payload_raw_kb": round(raw / 1024, 1),
+        "payload_stored_kb": round(stored / 1024, 1),
+        "compression_ratio": round(raw / stored, 2) if stored else None,
+    }
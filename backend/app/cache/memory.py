@@ -0,0 +1,147 @@
+"""
+In-Memory Cache with TTL
+A lightweight caching solution that works without Redis.
+Perfect for Render free tier deployment.
+
+Each worker process has its own copy. When an InvalidationLog is attached,
+deletes, tag invalidations and clears are published to it and replayed by
+every other worker.
+
+The cache is used from the event loop and from worker threads at the same time
+(asyncio.to_thread batches, the materializer, autocomplete prewarm), so the
+entries and the tag index are only touched under a lock.
+"""
+
+import threading
+import time
+import json
+from typing import Any, Optional, Dict, Iterable, Set
+
+from app.cache.base import CacheBackend, payload_sizes, compression_stats
+from app.cache.shm import InvalidationLog
+
+# How often a worker replays other workers' invalidations (seconds)
+_SYNC_INTERVAL = 0.25
+
+
+class InMemoryCache(CacheBackend):
+    def __init__(self, default_ttl: int = 300, invalidation_log: Optional[InvalidationLog] = None):
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._tagged: Dict[str, Set[str]] = {}  # tag -> keys
+        self.default_ttl = default_ttl  # 5 minutes default
+        self._log = invalidation_log
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+
+    # The underscore helpers below expect self._lock to be held
+
+    def _sync(self) -> None:
+        """Apply invalidations published by other workers since the last sync."""
+        if self._log is None or time.time() < self._next_sync:
+            return
+        self._next_sync = time.time() + _SYNC_INTERVAL
+        for key, tag in self._log.poll():
+            if key is not None:
+                self._evict(key)
+            elif tag is not None:
+                self._evict_tags([tag])
+            else:
+                self._cache.clear()
+                self._tagged.clear()
+
+    def _evict(self, key: str) -> bool:
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry["tags"]:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    self._tagged.pop(tag, None)
+        return True
+
+    def _evict_tags(self, tags: Iterable[str]) -> int:
+        keys = set()
+        for tag in tags:
+            keys |= self._tagged.pop(tag, set())
+        return sum(self._evict(key) for key in keys)
+
+    @staticmethod
+    def _is_expired(entry: Optional[Dict[str, Any]], now: float) -> bool:
+        return entry is None or now > entry["expires_at"]
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            self._sync()
+            entry = self._cache.get(key)
+            if self._is_expired(entry, time.time()):
+                self._evict(key)
+                return None
+            return entry["value"]
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+        tags = tuple(tags)
+        with self._lock:
+            self._evict(key)
+            self._cache[key] = {
+                "value": value,
+                "expires_at": time.time() + (ttl or self.default_ttl),
+                "tags": tags,
+            }
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._evict(key)
+        if self._log is not None:
+            self._log.publish(key=key)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tags = list(tags)
+        with self._lock:
+            dropped = self._evict_tags(tags)
+        if self._log is not None:
+            for tag in tags:
+                self._log.publish(tag=tag)
+        return dropped
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._tagged.clear()
+        if self._log is not None:
+            self._log.publish()
+
+    def cleanup_expired(self) -> int:
+        """Remove all expired entries. Returns count of removed items."""
+        with self._lock:
+            now = time.time()
+            expired_keys = [k for k, entry in self._cache.items() if self._is_expired(entry, now)]
+            for key in expired_keys:
+                self._evict(key)
+        return len(expired_keys)
+
+    def stats(self) -> Dict[str, Any]:
+        # Pre-encoded response payloads are measured by their byte length,
+        # everything else by its JSON size
+        raw = stored = count = 0
+        other = {}
+        with self._lock:
+            entries = list(self._cache.items())
+            total_tags = len(self._tagged)
+        for key, entry in entries:
+            payload_raw, payload_stored = payload_sizes(entry["value"])
+            if payload_stored:
+                raw, stored, count = raw + payload_raw, stored + payload_stored, count + 1
+            else:
+                other[key] = entry
+        return {
+            "backend": "memory",
+            "broadcast": self._log is not None,
+            "total_keys": len(entries),
+            "total_tags": total_tags,
+            "memory_estimate_kb": (len(json.dumps(other, default=str)) + stored) / 1024,
+            **compression_stats(raw, stored, count),
+        }
@@ -0,0 +1,212 @@
+"""
+Redis-protocol cache backend.
+
+Speaks RESP directly over a socket (GET / SET PX / DEL / SCAN, plus SADD /
+SMEMBERS for tags), so it works against Redis, Valkey, KeyDB or any
+RESP-compatible stand-in without an extra client dependency. Keys are
+namespaced with a prefix so clear() only drops this app's entries. Redis is
+shared by every worker, so invalidations are global by construction.
+
+Each tag is a set of the keys carrying it, expiring with its longest-lived
+member; stale members left behind by expired entries are harmless.
+
+A Redis outage degrades to cache misses rather than failed requests.
+"""
+
+import socket
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from app.cache.base import CacheBackend, payload_sizes, compression_stats, dump_entry, load_entry
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+_SCAN_BATCH = 500
+
+
+class RespError(Exception):
+    """Error reply from the server."""
+
+
+class RespClient:
+    """Minimal blocking RESP2 client; one connection guarded by a lock."""
+
+    def __init__(self, url: str, timeout: float = 1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._roundtrip("AUTH", self.password)
+        if self.db:
+            self._roundtrip("SELECT", self.db)
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+    @staticmethod
+    def _pack(args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(out)
+
+    def _read(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RespError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(rest)
+            return None if length < 0 else [self._read() for _ in range(length)]
+        raise ConnectionError(f"Unexpected RESP reply: {line!r}")
+
+    def _roundtrip(self, *args):
+        self._sock.sendall(self._pack(args))
+        return self._read()
+
+    def command(self, *args):
+        """Send one command and return its reply; reconnects once on a dropped socket."""
+        with self._lock:
+            for attempt in (1, 2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._roundtrip(*args)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt == 2:
+                        raise
+
+
+class RedisCache(CacheBackend):
+    def __init__(self, url: str, default_ttl: int = 300, prefix: str = "cart:"):
+        self.client = RespClient(url)
+        self.default_ttl = default_ttl
+        self.prefix = prefix
+        self.tag_prefix = f"{prefix}tag:"
+
+    def _scan(self) -> List[bytes]:
+        keys, cursor = [], b"0"
+        while True:
+            cursor, batch = self.client.command(
+                "SCAN", cursor, "MATCH", f"{self.prefix}*", "COUNT", _SCAN_BATCH
+            )
+            keys.extend(batch)
+            if cursor == b"0":
+                return keys
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            data = self.client.command("GET", self.prefix + key)
+        except (OSError, ConnectionError, RespError) as e:
+            logger.warning("Redis cache GET failed: %s", e)
+            return None
+        if data is None:
+            return None
+        try:
+            return load_entry(data)
+        except ValueError:
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+        ttl_ms = int((ttl or self.default_ttl) * 1000)
+        try:
+            self.client.command(
+                "SET", self.prefix + key, dump_entry(value), "PX", ttl_ms,
+            )
+            for tag in tags:
+                tag_key = self.tag_prefix + tag
+                self.client.command("SADD", tag_key, key)
+                # Only ever extend the set's lifetime so it outlives every member
+                # (PEXPIRE ... GT would do this atomically, but needs Redis 7)
+                if self.client.command("PTTL", tag_key) < ttl_ms:
+                    self.client.command("PEXPIRE", tag_key, ttl_ms)
+        except (OSError, ConnectionError, RespError) as e:
+            logger.warning("Redis cache SET failed: %s", e)
+
+    def delete(self, key: str) -> None:
+        try:
+            self.client.command("DEL", self.prefix + key)
+        except (OSError, ConnectionError, RespError) as e:
+            logger.warning("Redis cache DEL failed: %s", e)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        try:
+            tag_keys = [self.tag_prefix + tag for tag in tags]
+            keys = set()
+            for tag_key in tag_keys:
+                keys.update(self.client.command("SMEMBERS", tag_key) or [])
+            if tag_keys:
+                self.client.command("DEL", *tag_keys)
+            if not keys:
+                return 0
+            return self.client.command("DEL", *[self.prefix.encode() + k for k in keys])
+        except (OSError, ConnectionError, RespError) as e:
+            logger.warning("Redis cache tag invalidation failed: %s", e)
+            return 0
+
+    def clear(self) -> None:
+        try:
+            keys = self._scan()
+            for i in range(0, len(keys), _SCAN_BATCH):
+                self.client.command("DEL", *keys[i:i + _SCAN_BATCH])
+        except (OSError, ConnectionError, RespError) as e:
+            logger.warning("Redis cache clear failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        # Redis expires keys itself; sizes come from sampling every key, which
+        # is fine for this cache's few hundred entries
+        try:
+            keys = [k for k in self._scan() if not k.startswith(self.tag_prefix.encode())]
+            raw = stored = payloads = size = 0
+            for key in keys:
+                data = self.client.command("GET", key)
+                if data is None:
+                    continue
+                size += len(data)
+                try:
+                    payload_raw, payload_stored = payload_sizes(load_entry(data))
+                except ValueError:
+                    continue
+                if payload_stored:
+                    raw, stored, payloads = raw + payload_raw, stored + payload_stored, payloads + 1
+        except (OSError, ConnectionError, RespError) as e:
+            return {"backend": "redis", "error": str(e)}
+        return {
+            "backend": "redis",
+            "total_keys": len(keys),
+            "memory_estimate_kb": size / 1024,
+            **compression_stats(raw, stored, payloads),
+        }
@@ -0,0 +1,235 @@
+"""
+Same-host shared cache backed by SQLite on /dev/shm (tmpfs).
+
+All uvicorn workers on a host open the same database file, so an entry cached
+by one worker is a hit in every other and a delete/clear is seen by all of
+them immediately. WAL mode lets readers proceed while a writer commits, and
+the file is memory-mapped so hot reads are plain page-cache lookups.
+
+InvalidationLog uses the same mechanism as a cross-worker invalidation feed
+for the per-process memory backend.
+
+The database files live in a private directory per user and deployment
+(see shm_path), so other users on the host cannot plant or read them and
+unrelated deployments never share a cache or an invalidation feed.
+"""
+
+import os
+import sqlite3
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.cache.base import CacheBackend, payload_sizes, compression_stats, dump_entry, load_entry
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+_MMAP_SIZE = 256 * 1024 * 1024
+# Invalidation events older than this are pruned (longest cache TTL is 5 min)
+_LOG_RETENTION = 3600
+
+
+def _private_dir(path: str) -> str:
+    """Create `path` as a 0700 directory, or verify an existing one is a real
+    directory owned by this user that nobody else can access."""
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(
+            f"Cache directory {path} must be a directory owned by uid {os.getuid()} "
+            f"and not accessible to other users (mode 0700)"
+        )
+    return path
+
+
+def shm_path(filename: str, directory: str = "", namespace: str = "default") -> str:
+    """Path of a cache file in this user's private directory for `namespace`,
+    under `directory` — tmpfs (/dev/shm) when available, else the temp dir."""
+    if not directory:
+        directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    private = _private_dir(os.path.join(directory, f"cart-{os.getuid()}-{namespace}"))
+    return os.path.join(private, filename)
+
+
+class _SQLiteStore:
+    """One connection per thread and process (sqlite3 connections are neither
+    thread- nor fork-safe)."""
+
+    _SCHEMA = ""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # tmpfs: nothing to fsync to
+            conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+            conn.executescript(self._SCHEMA)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+
+class SharedMemoryCache(_SQLiteStore, CacheBackend):
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            expires_at REAL NOT NULL,
+            raw_size INTEGER NOT NULL DEFAULT 0,
+            stored_size INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS cache_tags (
+            tag TEXT NOT NULL,
+            key TEXT NOT NULL,
+            PRIMARY KEY (tag, key)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS cache_tags_key ON cache_tags (key);
+    """
+
+    def __init__(self, path: str, default_ttl: int = 300):
+        super().__init__(path)
+        self.default_ttl = default_ttl
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if time.time() > row[1]:
+            self._conn().execute("DELETE FROM cache WHERE key = ? AND expires_at = ?", (key, row[1]))
+            return None
+        try:
+            return load_entry(row[0])
+        except ValueError:
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+        raw, stored = payload_sizes(value)
+        data = dump_entry(value)
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, raw_size, stored_size) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, data, time.time() + (ttl or self.default_ttl), raw, stored),
+            )
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in tags]
+            )
+
+    def delete(self, key: str) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tags = list(tags)
+        if not tags:
+            return 0
+        marks = ",".join("?" * len(tags))
+        with self._transaction() as conn:
+            keys = [row[0] for row in conn.execute(
+                f"SELECT DISTINCT key FROM cache_tags WHERE tag IN ({marks})", tags
+            )]
+            conn.executemany("DELETE FROM cache_tags WHERE key = ?", [(k,) for k in keys])
+            return conn.executemany("DELETE FROM cache WHERE key = ?", [(k,) for k in keys]).rowcount
+
+    def clear(self) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM cache")
+            conn.execute("DELETE FROM cache_tags")
+
+    def cleanup_expired(self) -> int:
+        with self._transaction() as conn:
+            removed = conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),)).rowcount
+            conn.execute("DELETE FROM cache_tags WHERE key NOT IN (SELECT key FROM cache)")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        total, size, raw, stored, payloads = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0), COALESCE(SUM(raw_size), 0), "
+            "COALESCE(SUM(stored_size), 0), COUNT(NULLIF(stored_size, 0)) FROM cache"
+        ).fetchone()
+        return {
+            "backend": "shm",
+            "path": self.path,
+            "total_keys": total,
+            "memory_estimate_kb": size / 1024,
+            **compression_stats(raw, stored, payloads),
+        }
+
+
+class InvalidationLog(_SQLiteStore):
+    """Append-only feed of deleted keys / invalidated tags (neither = clear)
+    shared by all workers. Each process replays only the events published
+    after it attached."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS invalidations (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT,
+            tag TEXT,
+            pid INTEGER NOT NULL,
+            at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._pid = os.getpid()
+        self._seen = None
+
+    def _last_seq(self) -> int:
+        return self._conn().execute("SELECT COALESCE(MAX(seq), 0) FROM invalidations").fetchone()[0]
+
+    def publish(self, key: Optional[str] = None, tag: Optional[str] = None) -> None:
+        try:
+            conn = self._conn()
+            now = time.time()
+            conn.execute(
+                "INSERT INTO invalidations (key, tag, pid, at) VALUES (?, ?, ?, ?)",
+                (key, tag, os.getpid(), now),
+            )
+            conn.execute("DELETE FROM invalidations WHERE at < ?", (now - _LOG_RETENTION,))
+        except sqlite3.Error as e:
+            logger.warning("Cache invalidation broadcast failed for %s: %s", key or tag, e)
+
+    def poll(self) -> List[Tuple[Optional[str], Optional[str]]]:
+        """(key, tag) events published by other workers since the previous poll."""
+        try:
+            if self._seen is None or self._pid != os.getpid():
+                # First poll in this process (or after a fork): start from now
+                self._pid, self._seen = os.getpid(), self._last_seq()
+                return []
+            rows = self._conn().execute(
+                "SELECT seq, key, tag, pid FROM invalidations WHERE seq > ? ORDER BY seq", (self._seen,)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Cache invalidation poll failed: %s", e)
+            return []
+        if rows:
+            self._seen = rows[-1][0]
+        return [(key, tag) for _, key, tag, pid in rows if pid != self._pid]
@@ -7,8 +7,45 @@ class Settings(BaseSettings):
     MONGO_DB: str = "ecommerce"
     ES_HOST: str = "http://localhost:9200"
     ES_INDEX: str = "products"
+    # Small completion-suggester index used only by /search/autocomplete
+    ES_SUGGEST_INDEX: str = "products_suggest"
     # Admin API key — change this in production via env var
     ADMIN_SECRET_KEY: str = "cart-admin-secret"
+    # HMAC key for opaque pagination cursors — change in production via env var
+    CURSOR_SECRET: str = "cart-cursor-secret"
+    # Opt-in: serve list endpoints as pre-encoded orjson bytes with
+    # Content-Encoding passthrough (False → FastAPI's encoder; ETags either way)
+    FAST_JSON: bool = False
+    # Compression for cached response payloads: gzip | zstd (needs zstandard) | none
+    CACHE_COMPRESSION: str = "gzip"
+    # Cache backend: memory (per worker) | shm (same-host shared) | redis
+    CACHE_BACKEND: str = "memory"
+    # memory backend: broadcast deletes/clears to the other workers on this host
+    CACHE_BROADCAST: bool = True
+    # Directory for the shm cache / invalidation log ("" → /dev/shm or temp dir);
+    # files go in a private cart-<uid>-<namespace> subdirectory
+    CACHE_SHM_DIR: str = ""
+    # Same-host cache namespace ("" → derived from the app path and databases)
+    CACHE_NAMESPACE: str = ""
+    REDIS_URL: str = "redis://localhost:6379/0"
+    # Background materialization of the top search queries
+    MATERIALIZE_ENABLED: bool = True
+    MATERIALIZE_TOP_N: int = 50
+    MATERIALIZE_INTERVAL: int = 300  # full refresh, seconds
+    MATERIALIZE_TICK: int = 10       # dirty-entry refresh + cross-worker sync, seconds
+    # Compiled NLP knowledge base snapshot ("" → nlp_kb.json in the private
+    # cart-<uid>-<namespace> directory under the temp dir)
+    NLP_SNAPSHOT_PATH: str = ""
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MIN_SIZE: int = 1024
+    # Per-stage Server-Timing response header (stage histograms are kept regardless)
+    SERVER_TIMING: bool = True
+    # Fraction of primary searches run with ES profile: true (0 = never)
+    ES_PROFILE_SAMPLE_RATE: float = 0.0
+    # Logging: level (DEBUG adds per-request lines), text | json, share of DEBUG lines kept
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0
 
     model_config = {
         "env_file": os.path.join(os.path.dirname(os.path.abspath(__file__)), "../.env"),
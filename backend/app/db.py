@@ -1,10 +1,13 @@
 from pymongo import MongoClient
 from elasticsearch import Elasticsearch
 from app.config import settings
+from app.utils.log import get_logger
 import numpy as np
 if not hasattr(np, 'float_'):
     np.float_ = np.float64
 
+logger = get_logger(__name__)
+
 # MongoDB
 mongo_client = MongoClient(settings.MONGO_URI)
 db = mongo_client[settings.MONGO_DB]
@@ -31,6 +34,10 @@ def init_es_index():
                             "image_url": {"type": "keyword"},
                             "created_at": {"type": "date"},
                             "rating": {"type": "float"},
+                            # Denormalised from userRatings on every write
+                            "rating_avg": {"type": "float"},
+                            "rating_count": {"type": "integer"},
+                            "rating_sum": {"type": "float"},
                             "discount": {"type": "integer"},
                             "stock": {"type": "integer"},
                             "color": {"type": "keyword"},
@@ -39,9 +46,79 @@ def init_es_index():
                     }
                 }
             )
-            print(f"Index '{settings.ES_INDEX}' created.")
+            logger.info("Index '%s' created.", settings.ES_INDEX)
         except Exception as e:
-            print(f"Error creating index: {e}")
+            logger.error("Error creating index: %s", e)
     else:
-        print(f"Index '{settings.ES_INDEX}' already exists.")
+        logger.info("Index '%s' already exists.", settings.ES_INDEX)
+
+    init_suggest_index()
+
+
+def init_suggest_index():
+    """Ensures the autocomplete completion-suggester index exists.
+    Kept separate from the main index so typing-speed lookups hit a tiny FST
+    instead of running match_phrase_prefix over full product documents."""
+    if es_client.indices.exists(index=settings.ES_SUGGEST_INDEX):
+        return
+    try:
+        es_client.indices.create(
+            index=settings.ES_SUGGEST_INDEX,
+            body={
+                "settings": {"number_of_shards": 1, "number_of_replicas": 0},
+                "mappings": {
+                    "properties": {
+                        "suggest": {"type": "completion", "analyzer": "simple"},
+                        "name": {"type": "keyword", "index": False},
+                        "brand": {"type": "keyword", "index": False},
+                        "category": {"type": "keyword", "index": False},
+                        "price": {"type": "float", "index": False},
+                        "image_url": {"type": "keyword", "index": False},
+                    }
+                },
+            },
+        )
+        logger.info("Index '%s' created.", settings.ES_SUGGEST_INDEX)
+    except Exception as e:
+        logger.error("Error creating suggest index: %s", e)
+
+
+def rating_fields(product: dict) -> dict:
+    """Denormalised rating summary stored on every product document so reads,
+    sorts and boosts never recompute it. Until real user ratings exist the
+    manually-set `rating` stands in as the average."""
+    ratings = product.get("userRatings") or []
+    total = float(sum(r.get("rating") or 0 for r in ratings))
+    count = len(ratings)
+    avg = round(total / count, 2) if count else float(product.get("rating") or 0)
+    return {"rating_avg": avg, "rating_count": count, "rating_sum": total}
+
+
+def suggest_weight(product: dict) -> int:
+    """Completion weight — rating dominates, review volume breaks ties."""
+    summary = product if "rating_avg" in product else rating_fields(product)
+    return int(round(summary["rating_avg"] * 100)) + min(summary.get("rating_count") or 0, 99)
+
+
+def suggest_doc(product: dict) -> dict:
+    """Build the suggest-index document for a product.
+    Inputs are the brand, "brand name", and every word-suffix of the name so
+    "shoes" still completes "Nike Running Shoes" (completion only matches
+    from the start of an input)."""
+    name = (product.get("name") or "").lower().strip()
+    brand = (product.get("brand") or "").lower().strip()
+    words = name.split()
+    inputs = {" ".join(words[i:]) for i in range(len(words))}
+    if brand:
+        inputs.add(brand)
+        if name:
+            inputs.add(f"{brand} {name}")
+    return {
+        "suggest": {"input": sorted(inputs), "weight": suggest_weight(product)},
+        "name": product.get("name", ""),
+        "brand": product.get("brand", ""),
+        "category": product.get("category", ""),
+        "price": product.get("price", 0),
+        "image_url": product.get("image_url", ""),
+    }
 
@@ -0,0 +1,135 @@
+"""
+Response compression middleware — brotli when the client accepts it and the
+brotli package is installed, otherwise gzip.
+
+Only bodies of at least settings.COMPRESSION_MIN_SIZE bytes with a JSON/text
+content type are compressed. Responses that already carry a Content-Encoding
+(cached payloads passed through by utils.serialization) are left untouched.
+
+Timing middleware — per-stage request timings (see utils.timing) as a
+Server-Timing header and rolling latency histograms.
+"""
+
+import gzip
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils import timing
+from app.utils.serialization import accepts_encoding
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_GZIP_LEVEL = 6
+_BROTLI_QUALITY = 4  # fast enough to run per request
+_COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def _compress(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = Headers(scope=scope).get("accept-encoding", "")
+        if brotli is not None and accepts_encoding(accept, "br"):
+            coding = "br"
+        elif accepts_encoding(accept, "gzip"):
+            coding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message = {}
+        chunks: list = []
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 206, 304)
+                    or not content_type.startswith(_COMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            # Buffer the (small, non-streaming) API body, then decide
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            headers = MutableHeaders(raw=start["headers"])
+            if len(body) >= self.minimum_size:
+                body = _compress(body, coding)
+                headers["Content-Encoding"] = coding
+                headers.add_vary_header("Accept-Encoding")
+                if "etag" in headers:
+                    # Keep strong ETags distinct per representation
+                    headers["ETag"] = headers["etag"][:-1] + f'-{coding}"'
+            headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _endpoint_label(scope: Scope) -> str:
+    """"METHOD /route/template" — the route path, not the raw URL, so path
+    parameters don't explode the number of histograms."""
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', None) or 'unmatched'}"
+
+
+class TimingMiddleware:
+    def __init__(self, app: ASGIApp, header: bool = True) -> None:
+        self.app = app
+        self.header = header
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings, token = timing.begin_request()
+        start = time.perf_counter()
+
+        async def send_timed(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.header:
+                headers = MutableHeaders(raw=message["headers"])
+                total_ms = (time.perf_counter() - start) * 1000
+                headers.append("Server-Timing", timing.server_timing(timings, total_ms))
+                headers["Timing-Allow-Origin"] = "*"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            timing.end_request(token)
+            timing.record_request(_endpoint_label(scope), timings, (time.perf_counter() - start) * 1000)
@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
+from app.utils.projections import View
+
 
 class ProductBase(BaseModel):
     name: str
@@ -39,10 +41,30 @@ class ProductUpdate(BaseModel):
     discount: Optional[int] = None
 
 
+class RatingCreate(BaseModel):
+    """A single user rating appended via POST /products/{id}/ratings."""
+    rating: int = Field(..., ge=1, le=5)
+    userId: Optional[str] = None
+
+
+class ParseBatchRequest(BaseModel):
+    """Queries for POST /search/parse/batch."""
+    queries: List[str] = Field(..., min_length=1, max_length=1000)
+
+
+class SearchBatchRequest(BaseModel):
+    """Queries for POST /search/batch — each gets its first /search page."""
+    queries: List[str] = Field(..., min_length=1, max_length=50)
+    size: int = Field(default=100, ge=1, le=200)
+    view: View = "card"
+
+
 class ProductResponse(ProductBase):
     id: str
     created_at: Optional[datetime] = None
     userRatings: Optional[List[Dict[str, Any]]] = []
+    rating_avg: Optional[float] = 0.0
+    rating_count: Optional[int] = 0
 
     class Config:
         from_attributes = True
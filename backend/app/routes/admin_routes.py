@@ -1,12 +1,14 @@
 """
 Admin routes — protected by X-Admin-Key header.
-Includes: resync failed ES docs, cache stats, NLP status.
+Includes: resync failed ES docs, suggest-index rebuild, rating backfill, query
+materialization, cache stats, latency histograms, ES profiles, NLP status.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from app.dependencies import require_admin
 from app.services.product_service import ProductService
 from app.cache import cache
+from app.utils import timing
 
 router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
 
@@ -21,12 +23,57 @@ async def resync_failed_docs():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/rebuild-suggest")
+async def rebuild_suggest_index():
+    """Rebuild the autocomplete completion-suggester index from the main index."""
+    try:
+        result = ProductService.rebuild_suggest_index()
+        return {"status": "ok", **result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/backfill-ratings")
+async def backfill_ratings():
+    """Compute rating_avg / rating_count for products written before they existed."""
+    try:
+        result = ProductService.backfill_ratings()
+        return {"status": "ok", **result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/materialize")
+async def materialize_top_queries():
+    """Recompute every materialized head query now (normally done in the background)."""
+    try:
+        from app.services.materialization_service import MaterializationService
+        result = MaterializationService.tick(force=True)
+        return {"status": "ok", **result}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/cache-stats")
 async def cache_stats():
     """Return in-memory cache health."""
     return cache.stats()
 
 
+@router.get("/latency")
+async def latency_stats():
+    """Rolling latency histograms of this worker, per endpoint and per search
+    stage (parse, cache, es, es-took, es-fallback, map, analytics, encode)."""
+    return timing.latency_stats()
+
+
+@router.get("/es-profiles")
+async def es_profiles(limit: int = Query(default=10, ge=1, le=50)):
+    """Summaries of the most recent profiled ES searches (sampled at
+    ES_PROFILE_SAMPLE_RATE; empty while sampling is off)."""
+    return {"profiles": timing.recent_profiles(limit)}
+
+
 @router.post("/cache-clear")
 async def clear_cache():
     """Clear the entire in-memory cache (use after bulk product updates)."""
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
 from typing import List, Optional
-from app.models import ProductCreate, ProductUpdate, ProductResponse
+from app.models import (
+    ProductCreate, ProductUpdate, ProductResponse, RatingCreate, ParseBatchRequest, SearchBatchRequest,
+)
 from app.services.product_service import ProductService
 from app.dependencies import require_admin
+from app.config import settings
+from app.utils.cursor import InvalidCursor
+from app.utils.projections import View
+from app.utils.serialization import batch_body, page_response, page_results
 
 router = APIRouter()
 
@@ -14,6 +22,27 @@ def set_nlp_ready(value: bool):
     _nlp_ready = value
 
 
+# Pagination: the next page's cursor is returned in this header so list
+# endpoints keep their plain-array response body
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_CURSOR_QUERY = Query(
+    None, description=f"Opaque cursor from a previous page's {NEXT_CURSOR_HEADER} header"
+)
+
+
+_VIEW_QUERY = Query(
+    default="card", description="Response projection: card (lists), detail or full"
+)
+
+
+def _with_cursor_header(request: Request, response: Response, page: dict):
+    """Return a page's results with the next cursor header and the page's ETag
+    (304 on a matching If-None-Match); pre-encoded when FAST_JSON is on."""
+    headers = {NEXT_CURSOR_HEADER: page["next_cursor"]} if page["next_cursor"] else None
+    return page_response(request, response, page, headers)
+
+
 @router.post("/products", response_model=ProductResponse, status_code=201)
 async def create_product(product: ProductCreate, _=Depends(require_admin)):
     """Add a new product. Syncs to MongoDB + Elasticsearch."""
@@ -25,12 +54,49 @@ async def create_product(product: ProductCreate, _=Depends(require_admin)):
 
 @router.get("/search", response_model=List[dict])
 async def search_products(
+    request: Request,
+    response: Response,
     q: str = Query(None, min_length=1),
     size: int = Query(default=100, ge=1, le=200),
+    cursor: Optional[str] = _CURSOR_QUERY,
+    view: View = _VIEW_QUERY,
 ):
-    """NLP-powered product search. Falls back to plain text if NLP engine not ready."""
+    """NLP-powered product search. Falls back to plain text if NLP engine not ready.
+    Pass the X-Next-Cursor response header back as `cursor` to fetch the next page."""
     try:
-        return ProductService.search_products(q, size=size, nlp_ready=_nlp_ready)
+        page = ProductService.search_page(
+            q, size=size, nlp_ready=_nlp_ready, cursor=cursor, view=view
+        )
+        return _with_cursor_header(request, response, page)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/search/batch")
+async def search_products_batch(body: SearchBatchRequest):
+    """First /search page for several queries in one call (carousels, saved
+    searches, did-you-mean previews). Cached queries are served from the cache
+    and the rest share one Elasticsearch _msearch.
+    Returns {"results": [{"query", "next_cursor", "results"}]} in request order."""
+    try:
+        pages = await asyncio.to_thread(
+            ProductService.search_batch, body.queries, size=body.size, nlp_ready=_nlp_ready, view=body.view
+        )
+        if settings.FAST_JSON:
+            return Response(content=batch_body(pages), media_type="application/json")
+        return {
+            "results": [
+                {
+                    "query": page["query"],
+                    "next_cursor": page["next_cursor"],
+                    **({"error": page["error"]} if page.get("error") else {}),
+                    "results": page_results(page),
+                }
+                for page in pages
+            ]
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -39,11 +105,16 @@ async def search_products(
 async def search_products_with_meta(
     q: str = Query(..., min_length=1),
     size: int = Query(default=100, ge=1, le=200),
+    view: View = _VIEW_QUERY,
+    facets: bool = Query(default=False),
 ):
     """NLP search that also returns what the AI parsed (entities, sort intent, did_you_mean).
-    Used by SmartSearchBar to render entity chips with real data."""
+    Used by SmartSearchBar to render entity chips with real data.
+    ?facets=true adds brand/category/color/gender/price/discount facet counts."""
     try:
-        return ProductService.search_products_with_meta(q, size=size, nlp_ready=_nlp_ready)
+        return ProductService.search_products_with_meta(
+            q, size=size, nlp_ready=_nlp_ready, view=view, facets=facets
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -60,6 +131,18 @@ async def parse_search_query(q: str = Query(..., min_length=1)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/search/parse/batch")
+async def parse_search_queries(body: ParseBatchRequest):
+    """Parse many queries in one call (nlp.pipe batching, shared fuzzy scoring).
+    Results are in request order, each shaped like GET /search/parse."""
+    try:
+        from app.utils.query_parser import parse_queries
+        parsed = await asyncio.to_thread(parse_queries, body.queries)
+        return {"results": [{"query": q, "parsed": p} for q, p in zip(body.queries, parsed)]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/search/autocomplete")
 async def autocomplete(
     q: str = Query(..., min_length=1),
@@ -74,18 +157,27 @@ async def autocomplete(
 
 
 @router.get("/products", response_model=List[dict])
-async def get_products(limit: int = Query(default=200, ge=1, le=500)):
-    """Get all products (cached 5 min)."""
+async def get_products(
+    request: Request,
+    response: Response,
+    limit: int = Query(default=200, ge=1, le=500),
+    cursor: Optional[str] = _CURSOR_QUERY,
+    view: View = _VIEW_QUERY,
+):
+    """Get all products (first page cached 5 min). Paginate with X-Next-Cursor."""
     try:
-        return ProductService.get_all_products(limit=limit)
+        page = ProductService.get_products_page(limit=limit, cursor=cursor, view=view)
+        return _with_cursor_header(request, response, page)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/products/{product_id}", response_model=dict)
-async def get_product(product_id: str):
-    """Get a single product by ID."""
-    product = ProductService.get_product(product_id)
+async def get_product(product_id: str, view: View = Query(default="detail")):
+    """Get a single product by ID (detail view unless asked otherwise)."""
+    product = ProductService.get_product(product_id, view=view)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -105,6 +197,20 @@ async def update_product(product_id: str, updates: ProductUpdate, _=Depends(requ
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/products/{product_id}/ratings", status_code=201)
+async def add_rating(product_id: str, rating: RatingCreate):
+    """Append a user rating and return the product's updated rating summary."""
+    try:
+        result = ProductService.add_rating(product_id, rating)
+        if not result:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.delete("/products/{product_id}")
 async def delete_product(product_id: str, _=Depends(require_admin)):
     """Delete a product from MongoDB and Elasticsearch."""
@@ -119,31 +225,18 @@ async def delete_product(product_id: str, _=Depends(require_admin)):
 async def refresh_nlp():
     """Manually trigger reload of brands/categories from DB into NLP parser."""
     try:
-        from app.db import es_client, settings
-        from app.utils.query_parser import update_entities
-
-        res = es_client.search(
-            index=settings.ES_INDEX,
-            body={
-                "size": 0,
-                "aggs": {
-                    "unique_brands": {"terms": {"field": "brand", "size": 1000}},
-                    "unique_categories": {"terms": {"field": "category", "size": 100}},
-                },
-            },
-        )
-        brands = [b["key"] for b in res["aggregations"]["unique_brands"]["buckets"]]
-        categories = [c["key"] for c in res["aggregations"]["unique_categories"]["buckets"]]
+        from app.services.entity_service import EntityService
 
-        if brands or categories:
-            update_entities(new_brands=brands, new_categories=categories)
+        report = await asyncio.to_thread(EntityService.refresh_knowledge_base, synonyms=False)
 
         set_nlp_ready(True)
         return {
             "status": "success",
             "message": "NLP Knowledge Base Refreshed",
-            "brands": len(brands),
-            "categories": len(categories),
+            "brands": report["brands"],
+            "categories": report["categories"],
+            "pages": report["pages"],
+            "duration_ms": report["total_ms"],
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request
 from app.services.recommendation_service import RecommendationService
+from app.utils.projections import View
+from app.utils.serialization import payload_response
 
 router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
 
 @router.get("/similar/{product_id}")
 async def get_similar_products(
     product_id: str,
-    limit: int = Query(default=6, ge=1, le=20)
+    limit: int = Query(default=6, ge=1, le=20),
+    view: View = Query(default="card"),
 ):
     """Get products similar to the specified product."""
-    results = RecommendationService.get_similar_products(product_id, limit)
+    results = RecommendationService.get_similar_products(product_id, limit, view)
     return {
         "product_id": product_id,
         "similar_products": results,
@@ -19,10 +22,11 @@ async def get_similar_products(
 @router.get("/bought-together/{product_id}")
 async def get_frequently_bought_together(
     product_id: str,
-    limit: int = Query(default=4, ge=1, le=10)
+    limit: int = Query(default=4, ge=1, le=10),
+    view: View = Query(default="card"),
 ):
     """Get products frequently bought with the specified product."""
-    results = RecommendationService.get_frequently_bought_together(product_id, limit)
+    results = RecommendationService.get_frequently_bought_together(product_id, limit, view)
     return {
         "product_id": product_id,
         "frequently_bought_together": results,
@@ -30,10 +34,10 @@ async def get_frequently_bought_together(
     }
 
 @router.get("/trending")
-async def get_trending_products(limit: int = Query(default=10, ge=1, le=50)):
-    """Get currently trending products."""
-    results = RecommendationService.get_trending_products(limit)
-    return {
-        "trending_products": results,
-        "count": len(results)
-    }
+async def get_trending_products(
+    request: Request,
+    limit: int = Query(default=10, ge=1, le=50),
+    view: View = Query(default="card"),
+):
+    """Get currently trending products (cached 1 min, ETag / If-None-Match aware)."""
+    return payload_response(request, RecommendationService.get_trending_payload(limit, view))
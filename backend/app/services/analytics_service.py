@@ -119,6 +119,45 @@ class AnalyticsService:
             "click_through_rate": round(ctr, 2)
         }
     
+    @staticmethod
+    def get_top_prefixes(limit: int = 50, days: int = 7, max_len: int = 6) -> List[str]:
+        """Most frequently typed query prefixes (1..max_len chars), weighted by
+        how often each full query was searched. Used to pre-warm autocomplete."""
+        counts: Dict[str, int] = {}
+        for row in AnalyticsService.get_top_searches(days, limit=500):
+            query = row["query"]
+            for end in range(1, min(len(query), max_len) + 1):
+                prefix = query[:end].strip()
+                if prefix:
+                    counts[prefix] = counts.get(prefix, 0) + row["count"]
+        return sorted(counts, key=counts.get, reverse=True)[:limit]
+    
+    @staticmethod
+    def get_entity_popularity(days: int = 30) -> Dict[str, Dict[str, int]]:
+        """Count how often each brand / category was the parsed intent of a search.
+        Used to rank autocomplete suggestions."""
+        since = datetime.utcnow() - timedelta(days=days)
+
+        def _counts(field: str) -> list:
+            return [
+                {"$match": {f"parsed_query.{field}": {"$ne": None}}},
+                {"$group": {"_id": f"$parsed_query.{field}", "count": {"$sum": 1}}},
+            ]
+
+        pipeline = [
+            {"$match": {"timestamp": {"$gte": since}, "parsed_query": {"$ne": None}}},
+            {"$facet": {
+                "brands": _counts("brand"),
+                "categories": _counts("category"),
+            }}
+        ]
+
+        facets = next(search_logs.aggregate(pipeline), {})
+        return {
+            field: {row["_id"]: row["count"] for row in facets.get(field, [])}
+            for field in ("brands", "categories")
+        }
+    
     @staticmethod
     def get_hourly_distribution(days: int = 7) -> List[Dict[str, Any]]:
         """Get search distribution by hour of day."""
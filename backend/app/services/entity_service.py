@@ -0,0 +1,89 @@
+"""
+Entity loading for the NLP knowledge base.
+
+Brands and categories are read from Elasticsearch with composite aggregations,
+paged with `after_key`, so every distinct value is loaded however large the
+catalog is (a plain terms aggregation silently stops at its `size`). Each page
+is fed to the query parser as it arrives, so the knowledge base grows
+incrementally instead of waiting for the full scan.
+
+Used both at startup (main.py) and by POST /refresh-nlp.
+"""
+
+import time
+from typing import Any, Dict, Iterator, List
+
+from app.db import es_client, settings
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# Buckets per composite aggregation page
+_PAGE_SIZE = 1000
+
+# Product field → knowledge base entity type
+_ENTITY_FIELDS = {"brands": "brand", "categories": "category"}
+
+
+class EntityService:
+
+    @staticmethod
+    def iter_entity_pages(field: str, page_size: int = _PAGE_SIZE) -> Iterator[List[str]]:
+        """Yield every distinct value of `field`, one composite-aggregation page at a time."""
+        after = None
+        while True:
+            composite = {
+                "size": page_size,
+                "sources": [{"value": {"terms": {"field": field}}}],
+            }
+            if after:
+                composite["after"] = after
+            res = es_client.search(
+                index=settings.ES_INDEX,
+                body={"size": 0, "aggs": {"entities": {"composite": composite}}},
+            )
+            agg = res["aggregations"]["entities"]
+            values = [b["key"]["value"] for b in agg["buckets"] if b["key"]["value"]]
+            if values:
+                yield values
+            after = agg.get("after_key")
+            if not after or len(agg["buckets"]) < page_size:
+                return
+
+    @staticmethod
+    def load_entities() -> Dict[str, Any]:
+        """Page all brands and categories from ES into the query parser.
+        Returns counts per entity type, number of ES pages and duration."""
+        from app.utils.query_parser import update_entities
+
+        start = time.perf_counter()
+        report = {"brands": 0, "categories": 0, "pages": 0}
+        for entity_type, field in _ENTITY_FIELDS.items():
+            for values in EntityService.iter_entity_pages(field):
+                update_entities(**{f"new_{entity_type}": values})
+                report[entity_type] += len(values)
+                report["pages"] += 1
+        report["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return report
+
+    @staticmethod
+    def refresh_knowledge_base(synonyms: bool = True) -> Dict[str, Any]:
+        """Full knowledge base refresh: synonyms from MongoDB, entities from ES,
+        autocomplete popularity from the search logs, then a new on-disk
+        snapshot for the next worker to start from."""
+        from app.services.analytics_service import AnalyticsService
+        from app.utils.query_parser import load_synonyms_from_db, set_entity_popularity, save_snapshot
+
+        start = time.perf_counter()
+        if synonyms:
+            load_synonyms_from_db()
+        report = EntityService.load_entities()
+        # Rank autocomplete suggestions by how often users search for them
+        set_entity_popularity(AnalyticsService.get_entity_popularity())
+        report["snapshot"] = save_snapshot()
+        report["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(
+            "NLP knowledge base refreshed - %d brands, %d categories in %d pages (%s ms entities, %s ms total)",
+            report["brands"], report["categories"], report["pages"], report["duration_ms"], report["total_ms"],
+        )
+        return report
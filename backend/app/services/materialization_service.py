@@ -0,0 +1,196 @@
+"""
+Materialized results for head queries.
+
+A background loop (started from main.py once NLP is ready) reads the top N
+queries from search_logs and recomputes their first /search page into the
+`precomputed_results` collection. Pages are stored already encoded
+(utils.serialization.encode_page), so every worker — including one that just
+restarted — serves them and warms its response cache without touching ES.
+
+Product writes mark entries sharing one of their cache tags (category, brand,
+product, unscoped) dirty; dirty entries are never served and are recomputed on
+the next tick instead of waiting for the full refresh interval.
+
+Only the worker holding the lease in `materializer_lease` computes; the rest
+just pick up what it wrote.
+"""
+
+import asyncio
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from app.cache import cache
+from app.config import settings
+from app.db import db
+from app.services.analytics_service import AnalyticsService
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+precomputed_results = db["precomputed_results"]
+materializer_lease = db["materializer_lease"]
+
+# The shape the frontend requests (GET /search?q=...&size=100)
+_SIZE = 100
+_VIEW = "card"
+_CACHE_TTL = 120
+
+# Cache keys currently materialized (refreshed every tick), so misses on
+# non-head queries never pay a Mongo round trip
+_materialized_keys: set = set()
+# Cache key -> computed_at of the page this worker last pushed into its cache.
+# Compared for equality only, so it doesn't matter whose clock wrote it.
+_synced_versions: dict = {}
+_indexed = False
+_top_queries: list = []
+_next_full_refresh = datetime.min
+
+
+def _owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def get_materialized(key: str) -> Optional[dict]:
+    """The materialized page for a search cache key, unless missing or dirty."""
+    if key not in _materialized_keys:
+        return None
+    try:
+        return precomputed_results.find_one({"key": key, "dirty": False})
+    except Exception as e:
+        logger.warning("Materialized lookup failed: %s", e)
+        return None
+
+
+def mark_materialized_dirty(tags: Iterable[str]) -> int:
+    """Flag materialized queries depending on any of `tags` for early refresh."""
+    try:
+        return precomputed_results.update_many(
+            {"tags": {"$in": list(tags)}},
+            {"$set": {"dirty": True, "dirtied_at": datetime.utcnow()}},
+        ).modified_count
+    except Exception as e:
+        logger.warning("Failed to mark materialized queries dirty: %s", e)
+        return 0
+
+
+class MaterializationService:
+
+    @staticmethod
+    def _acquire_lease(ttl_seconds: int) -> bool:
+        now = datetime.utcnow()
+        try:
+            materializer_lease.find_one_and_update(
+                {"_id": "materializer", "$or": [{"owner": _owner()}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": _owner(), "expires_at": now + timedelta(seconds=ttl_seconds)}},
+                upsert=True,
+            )
+            return True
+        except DuplicateKeyError:
+            return False  # another worker holds it
+
+    @staticmethod
+    def refresh(top_n: int = 50, max_age: int = 300, force: bool = False) -> dict:
+        """Recompute materialized pages that are missing, dirty or older than
+        max_age for the current top_n queries; drop queries that left the list."""
+        from app.services.product_service import ProductService
+
+        global _top_queries, _next_full_refresh
+        now = datetime.utcnow()
+        if force or now >= _next_full_refresh:
+            _top_queries = [
+                q["query"] for q in AnalyticsService.get_top_searches(days=7, limit=top_n) if q.get("query")
+            ]
+            _next_full_refresh = now + timedelta(seconds=max_age)
+            dropped = precomputed_results.delete_many({"_id": {"$nin": _top_queries}}).deleted_count
+        else:
+            dropped = 0
+
+        existing = {
+            d["_id"]: d for d in precomputed_results.find({}, {"dirty": 1, "computed_at": 1})
+        }
+        stale_before = now - timedelta(seconds=max_age)
+        refreshed = failed = 0
+        for query in _top_queries:
+            doc = existing.get(query)
+            if doc and not force and not doc.get("dirty") and doc["computed_at"] > stale_before:
+                continue
+            started = datetime.utcnow()
+            try:
+                page = ProductService.materialize_search(query, size=_SIZE, view=_VIEW)
+                # Don't clear a dirty flag set by a write that landed mid-computation
+                precomputed_results.replace_one(
+                    {"_id": query, "$or": [
+                        {"dirtied_at": {"$exists": False}}, {"dirtied_at": {"$lt": started}},
+                    ]},
+                    {
+                        "key": page["key"],
+                        "entry": page["entry"],
+                        "tags": page["tags"],
+                        "parsed": page["parsed"],
+                        "results_count": page["results_count"],
+                        "dirty": False,
+                        "computed_at": datetime.utcnow(),
+                    },
+                    upsert=True,
+                )
+                refreshed += 1
+            except DuplicateKeyError:
+                pass  # dirtied meanwhile — next tick recomputes it
+            except Exception as e:
+                logger.warning("Materializing '%s' failed: %s", query, e)
+                failed += 1
+        return {"queries": len(_top_queries), "refreshed": refreshed, "failed": failed, "dropped": dropped}
+
+    @staticmethod
+    def sync_local() -> int:
+        """Refresh this worker's set of materialized keys and push pages
+        recomputed since the last sync (by any worker) into the response cache."""
+        global _materialized_keys, _synced_versions
+        docs = list(precomputed_results.find({}, {"key": 1, "computed_at": 1, "dirty": 1}))
+        _materialized_keys = {d["key"] for d in docs}
+
+        synced = {k: v for k, v in _synced_versions.items() if k in _materialized_keys}
+        changed = [
+            d["_id"] for d in docs if not d.get("dirty") and synced.get(d["key"]) != d.get("computed_at")
+        ]
+        warmed = 0
+        if changed:
+            for doc in precomputed_results.find(
+                {"_id": {"$in": changed}, "dirty": False},
+                {"key": 1, "entry": 1, "tags": 1, "computed_at": 1},
+            ):
+                cache.set(doc["key"], doc["entry"], ttl=_CACHE_TTL, tags=doc["tags"])
+                synced[doc["key"]] = doc.get("computed_at")
+                warmed += 1
+        _synced_versions = synced
+        return warmed
+
+    @staticmethod
+    def tick(force: bool = False) -> dict:
+        global _indexed
+        if not _indexed:
+            precomputed_results.create_index("key")
+            _indexed = True
+        result = {"leader": False}
+        lease_ttl = max(settings.MATERIALIZE_TICK * 3, 60)
+        if MaterializationService._acquire_lease(lease_ttl):
+            result = {"leader": True, **MaterializationService.refresh(
+                settings.MATERIALIZE_TOP_N, settings.MATERIALIZE_INTERVAL, force=force
+            )}
+        result["warmed"] = MaterializationService.sync_local()
+        return result
+
+    @staticmethod
+    async def run_forever() -> None:
+        while True:
+            try:
+                result = await asyncio.to_thread(MaterializationService.tick)
+                if result.get("refreshed") or result.get("dropped"):
+                    logger.info("Materializer: %s", result)
+            except Exception as e:
+                logger.error("Materializer tick failed: %s", e)
+            await asyncio.sleep(settings.MATERIALIZE_TICK)
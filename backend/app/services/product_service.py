@@ -2,23 +2,38 @@
 Product Service — handles create, search, get, update, delete with:
 - Dual-write safety (MongoDB primary + Elasticsearch secondary with retry)
 - sync_failures collection for divergence recovery
-- Result caching (2-minute TTL per query string)
-- Proper sorting and scoring
+- Result caching (2-minute TTL per query string), tag-invalidated on product writes
+- Cursor pagination (search_after + point-in-time) via opaque signed cursors
+- Named response projections (card / detail / full) via ES _source filtering
+- Proper sorting and scoring on precomputed rating_avg / rating_count
 - Sort-intent awareness (cheapest, best rated, newest, etc.)
-- Autocomplete suggestions from entity knowledge base
+- Multi-query search in one _msearch, with batched progressive fallback
+- Optional facet aggregations (post_filter semantics) computed with the hits
+- Per-stage request timing (utils.timing) and sampled ES query profiling
+- Autocomplete suggestions from entity knowledge base + completion-suggester index
 """
 
+import re
 import time
-import json
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from datetime import datetime
 
 from bson import ObjectId
+from pymongo import ReturnDocument
+from elasticsearch import helpers, NotFoundError
 from app import models
-from app.db import product_collection, es_client, db, settings
-from app.utils.query_parser import parse_query, get_autocomplete_suggestions
+from app.db import product_collection, es_client, db, settings, suggest_doc, rating_fields
+from app.utils.query_parser import parse_query, parse_queries, get_autocomplete_suggestions
+from app.utils.cursor import encode_cursor, decode_cursor, InvalidCursor
+from app.utils.projections import source_filter, get_source_params
+from app.utils.serialization import encode_page, page_results
+from app.utils import timing
 from app.services.analytics_service import AnalyticsService
+from app.services.materialization_service import get_materialized, mark_materialized_dirty
 from app.cache import cache, cache_key, cached
+from app.utils.log import get_logger, lazy_json
+
+logger = get_logger(__name__)
 
 # Collection that logs ES-index failures for later resync
 sync_failures = db["sync_failures"]
@@ -26,18 +41,22 @@ sync_failures = db["sync_failures"]
 # ---------------------------------------------------------------------------
 # Sort-intent → ES sort clause mapping
 # ---------------------------------------------------------------------------
+# Rating sorts use the denormalised average (unmapped_type: older indices may
+# lack it). Shared with recommendation_service.
+RATING_SORT = {"rating_avg": {"order": "desc", "missing": 0, "unmapped_type": "float"}}
+
 _SORT_INTENT_MAP = {
-    "price_asc":     [{"price": {"order": "asc"}},  {"rating": {"order": "desc", "missing": 0}}],
-    "price_desc":    [{"price": {"order": "desc"}}, {"rating": {"order": "desc", "missing": 0}}],
-    "rating_desc":   [{"rating": {"order": "desc", "missing": 0}}, {"price": {"order": "asc"}}],
-    "discount_desc": [{"discount": {"order": "desc", "missing": 0}}, {"rating": {"order": "desc", "missing": 0}}],
-    "newest":        [{"created_at": {"order": "desc", "missing": "_last"}}, {"rating": {"order": "desc", "missing": 0}}],
+    "price_asc":     [{"price": {"order": "asc"}},  RATING_SORT],
+    "price_desc":    [{"price": {"order": "desc"}}, RATING_SORT],
+    "rating_desc":   [RATING_SORT, {"price": {"order": "asc"}}],
+    "discount_desc": [{"discount": {"order": "desc", "missing": 0}}, RATING_SORT],
+    "newest":        [{"created_at": {"order": "desc", "missing": "_last"}}, RATING_SORT],
 }
 
 # Default sort — relevance score first, then rating, then discount, then price
 _DEFAULT_SORT = [
     {"_score": "desc"},
-    {"rating": {"order": "desc", "missing": 0}},
+    RATING_SORT,
     {"discount": {"order": "desc", "missing": 0}},
     {"price": {"order": "asc"}},
 ]
@@ -53,9 +72,10 @@ def _es_index_with_retry(doc_id: str, doc: dict, max_attempts: int = 3) -> bool:
         try:
             es_client.index(index=settings.ES_INDEX, id=doc_id, body=doc)
             es_client.indices.refresh(index=settings.ES_INDEX)
+            _index_suggestion(doc_id, doc)
             return True
         except Exception as e:
-            print(f"ES index attempt {attempt}/{max_attempts} failed for {doc_id}: {e}")
+            logger.warning("ES index attempt %d/%d failed for %s: %s", attempt, max_attempts, doc_id, e)
             if attempt < max_attempts:
                 time.sleep(0.5 * attempt)  # 0.5s, 1s back-off
 
@@ -67,22 +87,392 @@ def _es_index_with_retry(doc_id: str, doc: dict, max_attempts: int = 3) -> bool:
             upsert=True,
         )
     except Exception as db_err:
-        print(f"Failed to log sync failure: {db_err}")
+        logger.error("Failed to log sync failure: %s", db_err)
 
     return False
 
 
+def _index_suggestion(doc_id: str, doc: dict) -> None:
+    """Best-effort write to the autocomplete suggest index. The main index is the
+    source of truth; /admin/rebuild-suggest repairs any drift."""
+    try:
+        es_client.index(index=settings.ES_SUGGEST_INDEX, id=doc_id, body=suggest_doc(doc))
+    except Exception as e:
+        logger.warning("Suggest index write failed for %s: %s", doc_id, e)
+
+
+def _delete_suggestion(doc_id: str) -> None:
+    try:
+        es_client.delete(index=settings.ES_SUGGEST_INDEX, id=doc_id, ignore=[404])
+    except Exception as e:
+        logger.warning("Suggest index delete failed for %s: %s", doc_id, e)
+
+
+# Fields the suggest index needs from a product (weight + display)
+_SUGGEST_SOURCE_FIELDS = ["name", "brand", "category", "price", "image_url", "rating_avg", "rating_count"]
+
+# Fields autocomplete returns from the suggest index (suggest.input is kept only
+# in the cache, to filter a shorter prefix's hints down to a longer prefix)
+_AUTOCOMPLETE_SOURCE = ["name", "brand", "category", "price", "image_url", "suggest.input"]
+
+# Completion options requested per product hint wanted. Options are deduped by
+# product id in Python (skip_duplicates would collapse different products that
+# share an input text, e.g. the "shoes" suffix), so ask for some headroom.
+_AUTOCOMPLETE_OVERFETCH = 3
+
+# Autocomplete responses are shared by nearly every user typing the same
+# prefix, so even a short TTL absorbs most keystroke traffic
+_AUTOCOMPLETE_TTL = 30
+
+# The suggest field uses the "simple" analyzer (lowercased runs of letters).
+# Client-side prefix filtering only mirrors it exactly for letter-only text.
+_LETTER_RUNS = re.compile(r"[^\W\d_]+")
+
+
+def _analyzed(text: str) -> str:
+    return " ".join(_LETTER_RUNS.findall(text.lower()))
+
+
+def _autocomplete_cache_key(prefix: str, limit: int) -> str:
+    return f"autocomplete:{cache_key(prefix, limit)}"
+
+
+def _derive_product_hints(prefix: str, limit: int) -> Optional[dict]:
+    """Answer product hints for `prefix` from a cached shorter prefix.
+
+    Only used when provably identical to asking ES: the shorter prefix's hint
+    list must be complete (ES returned fewer than `limit` options, so it holds
+    EVERY match) and both the prefix and the cached inputs must be text the
+    simple analyzer leaves unchanged. Every match for `prefix` also matches the
+    shorter prefix, so filtering that list by startswith loses nothing and
+    keeps ES's weight order."""
+    if _analyzed(prefix) != prefix:
+        return None
+    for end in range(len(prefix) - 1, 0, -1):
+        entry = cache.get(_autocomplete_cache_key(prefix[:end], limit))
+        if entry is None:
+            continue
+        if not entry["complete"]:
+            return None
+        products, inputs = [], []
+        for hint, hint_inputs in zip(entry["response"]["products"], entry["inputs"]):
+            if any(_analyzed(i) != i.lower() for i in hint_inputs):
+                return None
+            if any(i.lower().startswith(prefix) for i in hint_inputs):
+                products.append(hint)
+                inputs.append(hint_inputs)
+        return {"products": products, "inputs": inputs, "complete": True}
+    return None
+
+
+# How long an idle point-in-time stays open between page requests
+_PIT_KEEP_ALIVE = "2m"
+
+
+def _first_page_cursor(body: Optional[dict], results: list, page_size: int) -> Optional[str]:
+    """Cursor for the page after a regular (non-PIT) first page, or None when
+    the first page already holds every hit. Page 2 opens the point-in-time and
+    starts at `from`; later pages continue with search_after."""
+    if body is None or len(results) < page_size:
+        return None
+    return encode_cursor({
+        "body": {k: body[k] for k in ("query", "post_filter", "sort", "min_score", "_source") if k in body},
+        "size": page_size,
+        "pit": None,
+        "from": page_size,
+        "search_after": None,
+    })
+
+
+def _fetch_cursor_page(token: str) -> dict:
+    """Fetch the page a cursor points at. Returns {"results", "next_cursor"}."""
+    state = decode_cursor(token)
+    pit_id = state.get("pit")
+    try:
+        if pit_id is None:
+            pit_id = es_client.open_point_in_time(
+                index=settings.ES_INDEX, keep_alive=_PIT_KEEP_ALIVE
+            )["id"]
+        body = dict(state["body"])
+        body["size"] = state["size"]
+        body["pit"] = {"id": pit_id, "keep_alive": _PIT_KEEP_ALIVE}
+        if state.get("search_after") is not None:
+            body["search_after"] = state["search_after"]
+        else:
+            body["from"] = state["from"]
+        with timing.stage("es"):
+            res = es_client.search(body=body)
+        timing.add("es-took", res.get("took", 0))
+    except NotFoundError:
+        raise InvalidCursor("Cursor expired — restart from the first page")
+
+    hits = res["hits"]["hits"]
+    pit_id = res.get("pit_id", pit_id)
+    next_cursor = None
+    if len(hits) < state["size"]:
+        try:
+            es_client.close_point_in_time(body={"id": pit_id})
+        except Exception as e:
+            logger.warning("Failed to close point-in-time: %s", e)
+    else:
+        # PIT searches carry an implicit _shard_doc tiebreaker in "sort",
+        # so search_after from the last hit is a stable position
+        next_cursor = encode_cursor({
+            "body": state["body"],
+            "size": state["size"],
+            "pit": pit_id,
+            "from": None,
+            "search_after": hits[-1]["sort"],
+        })
+    with timing.stage("map"):
+        results = [_map_hit(h) for h in hits]
+    return {"results": results, "next_cursor": next_cursor}
+
+
+def _search_cache_key(query: str, size: int, view: str, facets: bool = False) -> str:
+    if facets:
+        return f"search:{cache_key(query.lower().strip(), size, view, 'facets')}"
+    return f"search:{cache_key(query.lower().strip(), size, view)}"
+
+
+def _all_products_key(view: str) -> str:
+    return f"all_products:{view}"
+
+
+# ---------------------------------------------------------------------------
+# Cache tags — entries name what they depend on, so a product write drops only
+# the entries it can affect instead of clearing the whole cache
+# ---------------------------------------------------------------------------
+CATALOG_TAG = "catalog"            # catalog pages + trending: any write can reorder them
+_UNSCOPED_TAG = "search:unscoped"  # searches not narrowed by a category/brand filter
+_SUGGEST_TAG = "suggest"           # autocomplete product hints
+
+
+def _search_tags(body: Optional[dict], results: list) -> list:
+    """Tags for a cached search page: the category/brand term filters that
+    scoped it (or the unscoped tag) plus every product on the page."""
+    body = body or {}
+    filters = (
+        (body.get("query") or {}).get("bool", {}).get("filter", [])
+        + (body.get("post_filter") or {}).get("bool", {}).get("filter", [])
+    )
+    tags = [
+        f"{field}:{clause['term'][field]}"
+        for clause in filters
+        for field in ("category", "brand")
+        if field in clause.get("term", {})
+    ]
+    # Facet counts ignore their own filter, so a write outside the scope can change them
+    if not tags or "aggs" in body:
+        tags.append(_UNSCOPED_TAG)
+    tags.extend(f"product:{p['id']}" for p in results)
+    return tags
+
+
+def _invalidate_product(product_id: str, *docs: Optional[dict]) -> None:
+    """Drop every cache entry a write to this product can affect. Pass the
+    document before and after the write so old and new category/brand count."""
+    tags = {f"product:{product_id}", CATALOG_TAG, _UNSCOPED_TAG, _SUGGEST_TAG}
+    for doc in docs:
+        for field in ("category", "brand"):
+            if doc and doc.get(field):
+                tags.add(f"{field}:{doc[field]}")
+    dropped = cache.invalidate_tags(sorted(tags))
+    dirty = mark_materialized_dirty(sorted(tags))
+    logger.info("Cache: invalidated %d entries, %d materialized queries for product %s", dropped, dirty, product_id)
+
+
+def _scope_fields(product_id: str) -> Optional[dict]:
+    """Current category/brand of a product (for invalidation before a write)."""
+    try:
+        return product_collection.find_one({"_id": ObjectId(product_id)}, {"category": 1, "brand": 1})
+    except Exception:
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Search bodies
+# ---------------------------------------------------------------------------
+
+def _fallback_bodies(
+    must_clauses: list, filter_clauses: list, should_clauses: list, sort_clause: list, size: int, view: str
+) -> List[dict]:
+    """ES bodies for each progressive-fallback level, in the order they are
+    tried (see ProductService._progressive_fallback)."""
+
+    def _body(filters, override_must=None, include_should=True):
+        active_must = override_must if override_must is not None else must_clauses
+        active_should = should_clauses if include_should else []
+        has_kw = bool(active_must) and any("multi_match" in m for m in active_must)
+        return {
+            "size": min(size, 200),
+            "min_score": 0.1 if has_kw else 0,
+            "query": {
+                "bool": {
+                    "must": active_must if active_must else [{"match_all": {}}],
+                    "filter": filters,
+                    "should": active_should,
+                    "minimum_should_match": 0,
+                }
+            },
+            "sort": sort_clause,
+            "_source": source_filter(view),
+        }
+
+    # Split filter_clauses by type
+    category_f = [f for f in filter_clauses if "term" in f and "category" in f.get("term", {})]
+    price_f    = [f for f in filter_clauses if "range" in f and "price" in f.get("range", {})]
+    discount_f = [f for f in filter_clauses if "range" in f and "discount" in f.get("range", {})]
+    stock_f    = [f for f in filter_clauses if "range" in f and "stock" in f.get("range", {})]
+
+    match_all_must = [{"match_all": {}}]
+
+    bodies = [
+        # Level 1: drop nothing (just retry in case it was a transient issue)
+        _body(filter_clauses),
+        # Level 2: drop brand (keep category + price + discount + stock)
+        _body(category_f + price_f + discount_f + stock_f),
+        # Level 3: drop price too (keep category + discount + stock)
+        _body(category_f + discount_f + stock_f),
+    ]
+    if category_f:
+        # Level 4: drop discount/stock filters (show full category range)
+        # This is the crucial one: "50% off jackets" with no 50%+ jackets → show all jackets
+        bodies.append(_body(category_f))
+        # Level 5: keyword may be a bad typo — use match_all + category
+        bodies.append(_body(category_f, override_must=match_all_must, include_should=False))
+    else:
+        # Level 6: absolute last resort — no category specified, show anything relevant
+        bodies.append(_body([], override_must=match_all_must, include_should=False))
+    return bodies
+
+
+# ---------------------------------------------------------------------------
+# Facets — aggregations computed in the same request as the hits
+# ---------------------------------------------------------------------------
+_PRICE_FACET_INTERVAL = 1000
+_DISCOUNT_FACET_STEPS = (10, 20, 30, 50)
+
+_FACET_AGGS = {
+    "brand":    {"terms": {"field": "brand", "size": 20}},
+    "category": {"terms": {"field": "category", "size": 20}},
+    "color":    {"terms": {"field": "color", "size": 20}},
+    "gender":   {"terms": {"field": "gender", "size": 10}},
+    "price":    {"histogram": {"field": "price", "interval": _PRICE_FACET_INTERVAL, "min_doc_count": 1}},
+    "discount": {"range": {"field": "discount", "ranges": [
+        {"key": f"{n}%+", "from": n} for n in _DISCOUNT_FACET_STEPS
+    ]}},
+}
+
+
+def _facet_field(clause: dict) -> Optional[str]:
+    """The facet a filter clause narrows (category, brand, price, discount), or None."""
+    for kind in ("term", "range"):
+        for field in clause.get(kind, {}):
+            if field in ("category", "brand", "price", "discount"):
+                return field
+    return None
+
+
+def _with_facets(body: dict) -> dict:
+    """A copy of a search body that also returns facet aggregations.
+
+    Facet filters move from the query to post_filter: the hits are unchanged,
+    while each facet is computed over the query plus every facet filter except
+    its own — "nike shoes" still counts the other brands' shoes under brand.
+    Filters without a facet (stock) stay in the query."""
+    query_bool = body["query"]["bool"]
+    facet_filters = [c for c in query_bool["filter"] if _facet_field(c)]
+    body = {**body, "query": {"bool": {
+        **query_bool, "filter": [c for c in query_bool["filter"] if not _facet_field(c)],
+    }}}
+    if facet_filters:
+        body["post_filter"] = {"bool": {"filter": facet_filters}}
+    body["aggs"] = {
+        name: {
+            "filter": {"bool": {"filter": [c for c in facet_filters if _facet_field(c) != name]}},
+            "aggs": {"values": agg},
+        }
+        for name, agg in _FACET_AGGS.items()
+    }
+    return body
+
+
+def _parse_facets(aggs: Optional[dict]) -> dict:
+    """Facet aggregations → {"brand": [{"value", "count"}], ..., "price":
+    [{"from", "to", "count"}], "discount": [{"value", "from", "count"}]}."""
+    facets = {}
+    for name in _FACET_AGGS:
+        buckets = ((aggs or {}).get(name) or {}).get("values", {}).get("buckets", [])
+        if name == "price":
+            facets[name] = [
+                {"from": b["key"], "to": b["key"] + _PRICE_FACET_INTERVAL, "count": b["doc_count"]}
+                for b in buckets
+            ]
+        elif name == "discount":
+            facets[name] = [
+                {"value": b["key"], "from": b["from"], "count": b["doc_count"]}
+                for b in buckets if b["doc_count"]
+            ]
+        else:
+            facets[name] = [{"value": b["key"], "count": b["doc_count"]} for b in buckets]
+    return facets
+
+
+def _msearch(bodies: List[dict]) -> List[Optional[dict]]:
+    """Run search bodies against the product index in ONE _msearch round trip.
+    Returns each search's response in order, None for a search that failed.
+    A failure of the request as a whole raises."""
+    if not bodies:
+        return []
+    lines = []
+    for body in bodies:
+        lines.append({"index": settings.ES_INDEX})
+        lines.append(body)
+    response = es_client.msearch(body=lines)
+    timing.add("es-took", response.get("took", 0))
+    responses = []
+    for res in response["responses"]:
+        if "error" in res:
+            logger.warning("msearch item error: %s", res["error"])
+            responses.append(None)
+        else:
+            responses.append(res)
+    return responses
+
+
+# Appends one rating to the ES copy. Mongo is the source of truth for the
+# summary; the count guard stops an out-of-order update from rolling it back.
+_APPEND_RATING_SCRIPT = """
+if (ctx._source.userRatings == null) { ctx._source.userRatings = []; }
+ctx._source.userRatings.add(params.entry);
+if (ctx._source.rating_count == null || ctx._source.rating_count < params.rating_count) {
+  ctx._source.rating_avg = params.rating_avg;
+  ctx._source.rating_count = params.rating_count;
+  ctx._source.rating_sum = params.rating_sum;
+}
+"""
+
+# Recomputes the summary from userRatings for documents indexed before it existed
+_BACKFILL_RATINGS_SCRIPT = """
+def rs = ctx._source.userRatings;
+int c = rs == null ? 0 : rs.size();
+double s = 0;
+if (rs != null) { for (r in rs) { if (r.rating != null) { s += r.rating; } } }
+ctx._source.rating_count = c;
+ctx._source.rating_sum = s;
+ctx._source.rating_avg = c > 0 ? Math.round(s / c * 100) / 100.0
+    : (ctx._source.rating != null ? ctx._source.rating : 0);
+"""
+
+
 def _map_hit(hit: dict) -> dict:
-    """Normalize an ES hit into a consistent frontend-ready dict."""
+    """Project an ES hit into a frontend-ready dict. Rating summaries are
+    precomputed at write time; `rating` is exposed as the real average."""
     data = hit["_source"].copy()
     data["id"] = hit["_id"]
-    # Computed average rating from userRatings array
-    user_ratings = data.get("userRatings", [])
-    if user_ratings:
-        avg = sum(r.get("rating", 0) for r in user_ratings) / len(user_ratings)
-        data.setdefault("rating", round(avg, 1))
-    else:
-        data.setdefault("rating", data.get("rating", 0.0))
+    if "rating_avg" in data:
+        data["rating"] = data["rating_avg"]
     return data
 
 
@@ -124,6 +514,7 @@ class ProductService:
                 product_dict["synonyms"] = auto_syns
 
         product_dict["created_at"] = datetime.utcnow()
+        product_dict.update(rating_fields(product_dict))
 
         # 1. MongoDB (primary)
         result = product_collection.insert_one(product_dict)
@@ -134,8 +525,8 @@ class ProductService:
         es_doc["mongo_id"] = str_id
         _es_index_with_retry(str_id, es_doc)
 
-        # Invalidate product-list cache
-        cache.delete("all_products")
+        # Invalidate cached pages this product can appear in
+        _invalidate_product(str_id, product_dict)
 
         return models.ProductResponse(id=str_id, **product_dict)
 
@@ -150,9 +541,11 @@ class ProductService:
         sort_clause: list,
         parsed: dict,
         size: int,
-    ) -> list:
+        view: str = "card",
+    ) -> tuple[list, Optional[dict]]:
         """
         Relax filters stepwise when 0 results are returned.
+        Returns (hits, ES body that produced them) — the body seeds pagination.
         KEY RULE: category filter is NEVER dropped (prevents cross-category false positives).
         If a user asks for "jackets", we ONLY show jackets at every level.
 
@@ -164,106 +557,281 @@ class ProductService:
           Level 5: category + match_all (keyword typo) (drop keyword must, keep category)
           Level 6: match_all everywhere                (absolute last resort — only when NO category)
         """
-
-        def _run_query(filters, override_must=None, include_should=True):
-            active_must = override_must if override_must is not None else must_clauses
-            active_should = should_clauses if include_should else []
-            has_kw = bool(active_must) and any("multi_match" in m for m in active_must)
-            body = {
-                "size": min(size, 200),
-                "min_score": 0.1 if has_kw else 0,
-                "query": {
-                    "bool": {
-                        "must": active_must if active_must else [{"match_all": {}}],
-                        "filter": filters,
-                        "should": active_should,
-                        "minimum_should_match": 0,
-                    }
-                },
-                "sort": sort_clause,
-            }
+        for level, body in enumerate(
+            _fallback_bodies(must_clauses, filter_clauses, should_clauses, sort_clause, size, view), start=1
+        ):
             try:
-                res = es_client.search(index=settings.ES_INDEX, body=body)
-                hits = [_map_hit(h) for h in res["hits"]["hits"]]
-                if hits:
-                    print(f"Fallback L{_run_query._level}: {len(hits)} results, {len(filters)} filters")
-                _run_query._level += 1
-                return hits
+                with timing.stage("es-fallback"):
+                    res = es_client.search(index=settings.ES_INDEX, body=body)
+                timing.add("es-took", res.get("took", 0))
             except Exception as e:
-                print(f"Fallback query error: {e}")
-                return []
+                logger.warning("Fallback query error: %s", e)
+                continue
+            with timing.stage("map"):
+                hits = [_map_hit(h) for h in res["hits"]["hits"]]
+            if hits:
+                logger.debug("Fallback L%d: %d results, %d filters", level, len(hits), len(body["query"]["bool"]["filter"]))
+                return hits, body
 
-        _run_query._level = 1
+        return [], None
 
-        # Split filter_clauses by type
-        category_f = [f for f in filter_clauses if "term" in f and "category" in f.get("term", {})]
-        brand_f    = [f for f in filter_clauses if "term" in f and "brand" in f.get("term", {})]
-        price_f    = [f for f in filter_clauses if "range" in f and "price" in f.get("range", {})]
-        discount_f = [f for f in filter_clauses if "range" in f and "discount" in f.get("range", {})]
-        stock_f    = [f for f in filter_clauses if "range" in f and "stock" in f.get("range", {})]
+    # ------------------------------------------------------------------
+    # SEARCH  (now sort-intent aware)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def search_products(
+        query: str, size: int = 100, nlp_ready: bool = True, view: str = "card"
+    ) -> List[dict]:
+        return page_results(ProductService.search_page(query, size=size, nlp_ready=nlp_ready, view=view))
 
-        match_all_must = [{"match_all": {}}]
-        has_category = bool(category_f)
+    @staticmethod
+    def search_page(
+        query: str,
+        size: int = 100,
+        nlp_ready: bool = True,
+        cursor: Optional[str] = None,
+        view: str = "card",
+    ) -> dict:
+        """One page of search results: {"results": [...], "next_cursor": str | None}.
+        Cache hits return the encoded entry instead (see utils.serialization.encode_page);
+        use page_results() for the list.
+        With a cursor, the query, page size and view come from the cursor itself."""
+        if cursor:
+            return _fetch_cursor_page(cursor)
+        if not query or not query.strip():
+            return {"results": [], "next_cursor": None}
 
-        # Level 1: drop nothing (just retry in case it was a transient issue)
-        hits = _run_query(filter_clauses)
-        if hits:
-            return hits
+        # Cache key per (query, size, view)
+        key = _search_cache_key(query, size, view)
+        cached_page = ProductService._cached_search_page(key, query, nlp_ready)
+        if cached_page is not None:
+            return cached_page
 
-        # Level 2: drop brand (keep category + price + discount + stock)
-        hits = _run_query(category_f + price_f + discount_f + stock_f)
-        if hits:
-            return hits
+        results, effective_body, parsed = ProductService._execute_search(query, size, nlp_ready, view)
+        return ProductService._store_search_page(key, query, size, nlp_ready, results, effective_body, parsed)
 
-        # Level 3: drop price too (keep category + discount + stock)
-        hits = _run_query(category_f + discount_f + stock_f)
-        if hits:
-            return hits
+    @staticmethod
+    def _cached_search_page(key: str, query: str, nlp_ready: bool, log: bool = True) -> Optional[dict]:
+        """A first search page from the response cache or the materializer, or None."""
+        with timing.stage("cache"):
+            cached_page = cache.get(key)
+        if cached_page is not None:
+            logger.debug("Cache HIT: search %r", query)
+            return cached_page
+
+        # Head queries are kept precomputed by the background materializer
+        materialized = get_materialized(key)
+        if materialized is not None:
+            logger.debug("Materialized HIT: search %r", query)
+            try:
+                if log:
+                    with timing.stage("analytics"):
+                        AnalyticsService.log_search(
+                            query, materialized["results_count"], materialized["parsed"] if nlp_ready else None
+                        )
+            except Exception as e:
+                logger.warning("Analytics error: %s", e)
+            cache.set(key, materialized["entry"], ttl=120, tags=materialized["tags"])
+            return materialized["entry"]
+        return None
 
-        # Level 4: drop discount/stock filters (show full category range)
-        # This is the crucial one: "50% off jackets" with no 50%+ jackets → show all jackets
-        if category_f:
-            hits = _run_query(category_f)
-            if hits:
-                return hits
+    @staticmethod
+    def _store_search_page(
+        key: str, query: str, size: int, nlp_ready: bool,
+        results: list, effective_body: Optional[dict], parsed: dict, log: bool = True,
+        facets: Optional[dict] = None,
+    ) -> dict:
+        """Log a freshly executed search and cache its first page."""
+        # Analytics logging (non-blocking)
+        try:
+            if log:
+                with timing.stage("analytics"):
+                    AnalyticsService.log_search(query, len(results), parsed if nlp_ready else None)
+        except Exception as e:
+            logger.warning("Analytics error: %s", e)
 
-        # Level 5: keyword may be a bad typo — use match_all + category
-        if category_f:
-            hits = _run_query(category_f, override_must=match_all_must, include_should=False)
-            if hits:
-                return hits
+        page = {
+            "results": results,
+            "next_cursor": _first_page_cursor(effective_body, results, min(size, 200)),
+        }
 
-        # Level 6: absolute last resort — no category specified, show anything relevant
-        if not has_category:
-            hits = _run_query([], override_must=match_all_must, include_should=False)
-            if hits:
-                return hits
+        # Cache for 2 minutes
+        with timing.stage("encode"):
+            entry = encode_page(page)
+        if facets is not None:
+            entry["facets"] = facets
+        cache.set(key, entry, ttl=120, tags=_search_tags(effective_body, results))
+        return {**entry, "results": page["results"]}
 
-        return []
+    @staticmethod
+    def search_batch(
+        queries: List[str],
+        size: int = 100,
+        nlp_ready: bool = True,
+        view: str = "card",
+        parsed: Optional[dict] = None,
+        speculative: Iterable[str] = (),
+        facets: bool = False,
+    ) -> List[dict]:
+        """First result pages for several queries: [{"query", **page}] in request
+        order (pages as returned by search_page; use page_results() for the list).
+
+        Cached and materialized queries are answered locally. The rest are parsed
+        in one batch and sent to ES in ONE _msearch; queries that come back empty
+        then get every progressive-fallback level in one more _msearch, and the
+        first level with hits wins — the same result as _progressive_fallback,
+        in two round trips instead of up to seven per query.
+
+        `parsed` maps query text to an already parsed query (not parsed again).
+        Queries in `speculative` are run and cached but not logged as searches.
+        With `facets`, every page also carries "facets" (see _with_facets),
+        from the same response as its hits; faceted pages are cached apart."""
+        parsed = parsed or {}
+        speculative = set(speculative)
+        pages, pending = {}, {}
+        for query in queries:
+            if not query or not query.strip():
+                continue
+            key = _search_cache_key(query, size, view, facets)
+            if key in pages or key in pending:
+                continue
+            cached_page = ProductService._cached_search_page(
+                key, query, nlp_ready, log=query not in speculative
+            )
+            if cached_page is not None:
+                pages[key] = cached_page
+            else:
+                pending[key] = query
+
+        if pending:
+            keys = list(pending)
+            texts = [pending[k] for k in keys]
+            parsed_list = [parsed.get(q) for q in texts]
+            if nlp_ready:
+                unparsed = [i for i, p in enumerate(parsed_list) if p is None]
+                with timing.stage("parse"):
+                    for i, p in zip(unparsed, parse_queries([texts[i] for i in unparsed])):
+                        parsed_list[i] = p
+            plans = [
+                ProductService._plan_search(q, size, nlp_ready, view, parsed=p)
+                for q, p in zip(texts, parsed_list)
+            ]
+            bodies = [_with_facets(plan["body"]) if facets else plan["body"] for plan in plans]
+            with timing.stage("es"):
+                responses = _msearch([timing.maybe_profile(body) for body in bodies])
+            for text, res in zip(texts, responses):
+                if res:
+                    timing.record_profile(text, res)
+            with timing.stage("map"):
+                results = [[_map_hit(h) for h in res["hits"]["hits"]] if res else [] for res in responses]
+            aggs = [res.get("aggregations") if res else None for res in responses]
+
+            # ── Batched progressive fallback ──────────────────────────────────
+            fallback = [
+                (i, level, body)
+                for i, plan in enumerate(plans)
+                if responses[i] is not None and not results[i] and plan["filter"]
+                for level, body in enumerate(_fallback_bodies(
+                    plan["must"], plan["filter"], plan["should"], plan["sort"], size, view
+                ), start=1)
+            ]
+            if facets:
+                fallback = [(i, level, _with_facets(body)) for i, level, body in fallback]
+            if fallback:
+                try:
+                    with timing.stage("es-fallback"):
+                        fallback_responses = _msearch([body for _, _, body in fallback])
+                except Exception as e:
+                    logger.warning("Fallback msearch error: %s", e)
+                    fallback_responses = [None] * len(fallback)
+                for i in {i for i, _, _ in fallback}:
+                    bodies[i] = None
+                for (i, level, body), res in zip(fallback, fallback_responses):
+                    if results[i] or res is None or not res["hits"]["hits"]:
+                        continue
+                    with timing.stage("map"):
+                        results[i] = [_map_hit(h) for h in res["hits"]["hits"]]
+                    bodies[i] = body
+                    aggs[i] = res.get("aggregations")
+                    logger.debug("Fallback L%d: %d results for %r", level, len(results[i]), texts[i])
+
+            for i, key in enumerate(keys):
+                if responses[i] is None:
+                    # Not cached: the next request retries it
+                    pages[key] = {"results": [], "next_cursor": None, "error": "search failed"}
+                    continue
+                pages[key] = ProductService._store_search_page(
+                    key, texts[i], size, nlp_ready, results[i], bodies[i], plans[i]["parsed"],
+                    log=texts[i] not in speculative,
+                    facets=_parse_facets(aggs[i]) if facets else None,
+                )
+
+        empty = {"results": [], "next_cursor": None}
+        if facets:
+            empty["facets"] = _parse_facets(None)
+        return [
+            {"query": q, **(pages[_search_cache_key(q, size, view, facets)] if q and q.strip() else empty)}
+            for q in queries
+        ]
 
-    # ------------------------------------------------------------------
-    # SEARCH  (now sort-intent aware)
-    # ------------------------------------------------------------------
     @staticmethod
-    def search_products(query: str, size: int = 100, nlp_ready: bool = True) -> List[dict]:
-        if not query or not query.strip():
-            return []
+    def materialize_search(query: str, size: int = 100, view: str = "card") -> dict:
+        """Compute a search page for the materializer — no cache read, no search
+        logging. Returns {"key", "entry", "tags", "parsed", "results_count"}."""
+        results, effective_body, parsed = ProductService._execute_search(query, size, True, view)
+        page = {
+            "results": results,
+            "next_cursor": _first_page_cursor(effective_body, results, min(size, 200)),
+        }
+        return {
+            "key": _search_cache_key(query, size, view),
+            "entry": encode_page(page),
+            "tags": _search_tags(effective_body, results),
+            "parsed": parsed,
+            "results_count": len(results),
+        }
 
-        # Cache key per (query, size)
-        ck = cache_key(query.lower().strip(), size)
-        cached_result = cache.get(f"search:{ck}")
-        if cached_result is not None:
-            print(f"Cache HIT: search '{query}'")
-            return cached_result
+    @staticmethod
+    def _execute_search(
+        query: str, size: int, nlp_ready: bool, view: str
+    ) -> tuple[list, Optional[dict], dict]:
+        """Parse the query and run it against ES with progressive fallback.
+        Returns (results, effective ES body, parsed query)."""
+        plan = ProductService._plan_search(query, size, nlp_ready, view)
+
+        logger.debug("ES query: %s", lazy_json(plan["body"]))
+        with timing.stage("es"):
+            res = es_client.search(index=settings.ES_INDEX, body=timing.maybe_profile(plan["body"]))
+        timing.add("es-took", res.get("took", 0))
+        timing.record_profile(query, res)
+        with timing.stage("map"):
+            results = [_map_hit(h) for h in res["hits"]["hits"]]
+        effective_body = plan["body"]
 
+        # ── Progressive fallback — only when 0 results ────────────────────────
+        # IMPORTANT: We never drop category. It is the most critical intent signal.
+        if not results and plan["filter"]:
+            results, effective_body = ProductService._progressive_fallback(
+                plan["must"], plan["filter"], plan["should"], plan["sort"], plan["parsed"], size, view
+            )
+
+        return results, effective_body, plan["parsed"]
+
+    @staticmethod
+    def _plan_search(
+        query: str, size: int, nlp_ready: bool, view: str, parsed: Optional[dict] = None
+    ) -> dict:
+        """Parse the query (unless already parsed) and build its ES body.
+        Returns {"body", "parsed", "must", "filter", "should", "sort"}."""
         must_clauses = []
         filter_clauses = []   # hard: category, brand, price, discount, stock
         should_clauses = []   # soft: color, gender (boost ranking, don't eliminate results)
 
-        if nlp_ready:
-            parsed = parse_query(query)
-            print(f"NLP Parsed: {json.dumps(parsed, default=str)}")
-        else:
+        if parsed is None and nlp_ready:
+            with timing.stage("parse"):
+                parsed = parse_query(query)
+            logger.debug("NLP parsed: %s", lazy_json(parsed))
+        elif parsed is None:
             parsed = {
                 "keywords": [query.strip()],
                 "category": None, "brand": None,
@@ -344,136 +912,210 @@ class ProductService:
                 }
             },
             "sort": sort_clause,
+            "_source": source_filter(view),
+        }
+        return {
+            "body": search_body,
+            "parsed": parsed,
+            "must": must_clauses,
+            "filter": filter_clauses,
+            "should": should_clauses,
+            "sort": sort_clause,
         }
-
-        print(f"ES Query: {json.dumps(search_body, default=str)}")
-        res = es_client.search(index=settings.ES_INDEX, body=search_body)
-        results = [_map_hit(h) for h in res["hits"]["hits"]]
-
-        # ── Progressive fallback — only when 0 results ────────────────────────
-        # IMPORTANT: We never drop category. It is the most critical intent signal.
-        if not results and filter_clauses:
-            results = ProductService._progressive_fallback(
-                must_clauses, filter_clauses, should_clauses, sort_clause, parsed, size
-            )
-
-        # Analytics logging (non-blocking)
-        try:
-            AnalyticsService.log_search(query, len(results), parsed if nlp_ready else None)
-        except Exception as e:
-            print(f"Analytics error: {e}")
-
-        # Cache for 2 minutes
-        cache.set(f"search:{ck}", results, ttl=120)
-        return results
 
     # ------------------------------------------------------------------
     # SEARCH WITH METADATA (returns dict with results + did_you_mean)
     # ------------------------------------------------------------------
     @staticmethod
-    def search_products_with_meta(query: str, size: int = 100, nlp_ready: bool = True) -> dict:
-        """Like search_products but also returns parsed metadata for the frontend."""
+    def search_products_with_meta(
+        query: str, size: int = 100, nlp_ready: bool = True, view: str = "card", facets: bool = False,
+    ) -> dict:
+        """Like search_products but also returns parsed metadata for the frontend.
+
+        When the parser suggests a did-you-mean correction, the corrected query
+        runs speculatively in the same _msearch as the original; its results come
+        back inline under "corrected" and are cached under the corrected query's
+        own key, so clicking the suggestion is a cache hit.
+
+        With `facets`, the response (and "corrected") also carries facet counts
+        for brand, category, color, gender, price and discount, each computed
+        over the parsed query minus that facet's own filter."""
         if not query or not query.strip():
-            return {"results": [], "parsed": {}, "did_you_mean": None}
-
-        parsed = parse_query(query) if nlp_ready else {
-            "keywords": [query.strip()], "category": None, "brand": None,
-            "color": None, "gender": None, "price_min": None, "price_max": None,
-            "sort_by": None, "is_sale": False, "in_stock": False,
-            "min_discount": None, "did_you_mean": None,
-        }
+            empty = {"results": [], "parsed": {}, "did_you_mean": None, "corrected": None}
+            if facets:
+                empty["facets"] = _parse_facets(None)
+            return empty
+
+        with timing.stage("parse"):
+            parsed = parse_query(query) if nlp_ready else {
+                "keywords": [query.strip()], "category": None, "brand": None,
+                "color": None, "gender": None, "price_min": None, "price_max": None,
+                "sort_by": None, "is_sale": False, "in_stock": False,
+                "min_discount": None, "did_you_mean": None,
+            }
+        did_you_mean = parsed.get("did_you_mean")
+        speculative = [did_you_mean] if did_you_mean else []
 
-        results = ProductService.search_products(query, size=size, nlp_ready=nlp_ready)
-        return {
+        pages = ProductService.search_batch(
+            [query] + speculative, size=size, nlp_ready=nlp_ready, view=view,
+            parsed={query: parsed}, speculative=speculative, facets=facets,
+        )
+        if pages[0].get("error"):
+            raise RuntimeError(f"Search failed for '{query}'")
+        results = page_results(pages[0])
+
+        corrected = None
+        if did_you_mean and not pages[1].get("error"):
+            corrected_results = page_results(pages[1])
+            corrected = {
+                "query": did_you_mean,
+                "results": corrected_results,
+                "total": len(corrected_results),
+            }
+            if facets:
+                corrected["facets"] = pages[1]["facets"]
+        response = {
             "results": results,
             "parsed": {k: v for k, v in parsed.items() if k != "did_you_mean"},
-            "did_you_mean": parsed.get("did_you_mean"),
+            "did_you_mean": did_you_mean,
             "total": len(results),
+            "corrected": corrected,
         }
+        if facets:
+            response["facets"] = pages[0]["facets"]
+        return response
 
     # ------------------------------------------------------------------
     # AUTOCOMPLETE
     # ------------------------------------------------------------------
     @staticmethod
     def autocomplete(prefix: str, limit: int = 6) -> dict:
-        """Return autocomplete suggestions: entity matches + recent ES product names."""
+        """Return autocomplete suggestions: entity matches + recent ES product names.
+        Responses are cached per (prefix, limit) for _AUTOCOMPLETE_TTL seconds."""
         prefix = prefix.strip().lower()
         if not prefix:
             return {"suggestions": [], "products": []}
 
-        # 1. Entity-level suggestions from NLP knowledge base
+        ck = _autocomplete_cache_key(prefix, limit)
+        cached_entry = cache.get(ck)
+        if cached_entry is not None:
+            return cached_entry["response"]
+
+        # 1. Entity-level suggestions from NLP knowledge base (in-process index)
         entity_suggestions = get_autocomplete_suggestions(prefix, limit=limit)
 
-        # 2. Product name prefix matches from ES
+        # 2. Product hints — from a cached shorter prefix when provably complete,
+        #    otherwise from the completion-suggester index (FST lookup, ordered
+        #    by popularity weight)
+        hints = _derive_product_hints(prefix, limit)
+        if hints is None:
+            hints = ProductService._fetch_product_hints(prefix, limit)
+
+        response = {
+            "suggestions": entity_suggestions,
+            "products": hints["products"],
+        }
+        if hints["complete"] is not None:  # None = ES error, don't cache
+            cache.set(ck, {"response": response, **hints}, ttl=_AUTOCOMPLETE_TTL, tags=[_SUGGEST_TAG])
+        return response
+
+    @staticmethod
+    def _fetch_product_hints(prefix: str, limit: int) -> dict:
+        size = limit * _AUTOCOMPLETE_OVERFETCH
         try:
             es_res = es_client.search(
-                index=settings.ES_INDEX,
+                index=settings.ES_SUGGEST_INDEX,
                 body={
-                    "size": limit,
-                    "query": {
-                        "bool": {
-                            "should": [
-                                {"match_phrase_prefix": {"name": {"query": prefix, "max_expansions": 10}}},
-                                {"prefix": {"brand": {"value": prefix}}},
-                            ]
+                    "_source": _AUTOCOMPLETE_SOURCE,
+                    "suggest": {
+                        "products": {
+                            "prefix": prefix,
+                            "completion": {"field": "suggest", "size": size},
                         }
                     },
-                    "_source": ["name", "brand", "category", "price", "image_url"],
-                    "sort": [{"rating": {"order": "desc", "missing": 0}}],
                 },
             )
-            product_hints = [
-                {
-                    "id": h["_id"],
-                    "name": h["_source"].get("name", ""),
-                    "brand": h["_source"].get("brand", ""),
-                    "category": h["_source"].get("category", ""),
-                    "price": h["_source"].get("price", 0),
-                    "image": h["_source"].get("image_url", ""),
-                }
-                for h in es_res["hits"]["hits"]
-            ]
         except Exception as e:
-            print(f"Autocomplete ES error: {e}")
-            product_hints = []
-
+            logger.warning("Autocomplete ES error: %s", e)
+            return {"products": [], "inputs": [], "complete": None}
+
+        raw_options = es_res["suggest"]["products"][0]["options"]
+        # First (highest-weight) option per product, in ES order
+        unique = {}
+        for opt in raw_options:
+            unique.setdefault(opt["_id"], opt)
+        options = list(unique.values())
         return {
-            "suggestions": entity_suggestions,
-            "products": product_hints,
+            "products": [
+                {
+                    "id": opt["_id"],
+                    "name": opt["_source"].get("name", ""),
+                    "brand": opt["_source"].get("brand", ""),
+                    "category": opt["_source"].get("category", ""),
+                    "price": opt["_source"].get("price", 0),
+                    "image": opt["_source"].get("image_url", ""),
+                }
+                for opt in options[:limit]
+            ],
+            "inputs": [opt["_source"].get("suggest", {}).get("input", []) for opt in options[:limit]],
+            # ES returned fewer options than asked for and none were cut off
+            # => this is every product matching the prefix
+            "complete": len(raw_options) < size and len(options) <= limit,
         }
 
+    @staticmethod
+    def prewarm_autocomplete(top_n: int = 50, limit: int = 6) -> int:
+        """Fill the autocomplete cache for the most-searched prefixes.
+        Shortest prefixes go first so longer ones can be derived from them."""
+        prefixes = AnalyticsService.get_top_prefixes(top_n)
+        for prefix in sorted(prefixes, key=len):
+            ProductService.autocomplete(prefix, limit=limit)
+        return len(prefixes)
+
     # ------------------------------------------------------------------
     # GET ALL
     # ------------------------------------------------------------------
     @staticmethod
-    def get_all_products(limit: int = 200) -> List[dict]:
-        cached_result = cache.get("all_products")
-        if cached_result is not None:
-            print("Cache HIT: all_products")
-            return cached_result
+    def get_all_products(limit: int = 200, view: str = "card") -> List[dict]:
+        return page_results(ProductService.get_products_page(limit=limit, view=view))
 
-        res = es_client.search(
-            index=settings.ES_INDEX,
-            body={
-                "query": {"match_all": {}},
-                "size": min(limit, 500),
-                "sort": [
-                    {"rating": {"order": "desc", "missing": 0}},
-                    {"discount": {"order": "desc", "missing": 0}},
-                ],
-            },
-        )
+    @staticmethod
+    def get_products_page(
+        limit: int = 200, cursor: Optional[str] = None, view: str = "card"
+    ) -> dict:
+        """One page of the catalog: {"results": [...], "next_cursor": str | None}."""
+        if cursor:
+            return _fetch_cursor_page(cursor)
+
+        ck = _all_products_key(view)
+        cached_page = cache.get(ck)
+        if cached_page is not None:
+            logger.debug("Cache HIT: %s", ck)
+            return cached_page
+
+        body = {
+            "query": {"match_all": {}},
+            "size": min(limit, 500),
+            "sort": [
+                RATING_SORT,
+                {"discount": {"order": "desc", "missing": 0}},
+            ],
+            "_source": source_filter(view),
+        }
+        res = es_client.search(index=settings.ES_INDEX, body=body)
         results = [_map_hit(h) for h in res["hits"]["hits"]]
-        cache.set("all_products", results, ttl=300)  # 5 min
-        return results
+        page = {"results": results, "next_cursor": _first_page_cursor(body, results, body["size"])}
+        entry = encode_page(page)
+        cache.set(ck, entry, ttl=300, tags=[CATALOG_TAG])  # 5 min
+        return {**entry, "results": results}
 
     # ------------------------------------------------------------------
     # GET ONE
     # ------------------------------------------------------------------
     @staticmethod
-    def get_product(product_id: str) -> Optional[dict]:
+    def get_product(product_id: str, view: str = "detail") -> Optional[dict]:
         try:
-            hit = es_client.get(index=settings.ES_INDEX, id=product_id)
+            hit = es_client.get(index=settings.ES_INDEX, id=product_id, **get_source_params(view))
             return _map_hit(hit)
         except Exception:
             # Fallback to MongoDB
@@ -499,13 +1141,23 @@ class ProductService:
             if update_data.get(field):
                 update_data[field] = update_data[field].lower().strip()
 
+        if "rating" in update_data:
+            # A manual rating only stands in for the average until users rate
+            try:
+                current = product_collection.find_one({"_id": ObjectId(product_id)}, {"rating_count": 1}) or {}
+                if not current.get("rating_count"):
+                    update_data["rating_avg"] = float(update_data["rating"])
+            except Exception as e:
+                logger.warning("Mongo rating lookup failed: %s", e)
+
+        previous = _scope_fields(product_id)
         try:
             product_collection.update_one(
                 {"_id": ObjectId(product_id)},
                 {"$set": {**update_data, "updated_at": datetime.utcnow()}},
             )
         except Exception as e:
-            print(f"Mongo update failed: {e}")
+            logger.error("Mongo update failed: %s", e)
 
         try:
             es_client.update(
@@ -515,30 +1167,119 @@ class ProductService:
             )
             es_client.indices.refresh(index=settings.ES_INDEX)
         except Exception as e:
-            print(f"ES update failed: {e}")
+            logger.error("ES update failed: %s", e)
+
+        updated = ProductService.get_product(product_id)
+        _invalidate_product(product_id, previous, updated)
+        if updated:
+            _index_suggestion(product_id, updated)
+        return updated
+
+    # ------------------------------------------------------------------
+    # RATINGS
+    # ------------------------------------------------------------------
+    @staticmethod
+    def add_rating(product_id: str, rating: models.RatingCreate) -> Optional[dict]:
+        """Append a user rating: atomic Mongo $push/$inc, then an ES partial
+        update carrying the new rating_avg / rating_count."""
+        try:
+            oid = ObjectId(product_id)
+        except Exception:
+            return None
+
+        entry = {
+            "userId": rating.userId or f"user{int(time.time() * 1000)}",
+            "rating": rating.rating,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+        doc = product_collection.find_one_and_update(
+            {"_id": oid},
+            {"$push": {"userRatings": entry}, "$inc": {"rating_count": 1, "rating_sum": rating.rating}},
+            projection={"rating_count": 1, "rating_sum": 1, "userRatings.rating": 1, "category": 1, "brand": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is None:
+            return None
+
+        if doc["rating_count"] == len(doc.get("userRatings", [])):
+            summary = {
+                "rating_avg": round(doc["rating_sum"] / doc["rating_count"], 2),
+                "rating_count": doc["rating_count"],
+                "rating_sum": float(doc["rating_sum"]),
+            }
+            match = {"_id": oid, "rating_count": summary["rating_count"]}
+        else:
+            # Document predates the counters — rebuild them from the array
+            summary = rating_fields(doc)
+            match = {"_id": oid}
+        # Guarded by count so a slower concurrent writer can't overwrite a newer average
+        product_collection.update_one(match, {"$set": summary})
+
+        try:
+            es_client.update(
+                index=settings.ES_INDEX,
+                id=product_id,
+                body={"script": {
+                    "source": _APPEND_RATING_SCRIPT,
+                    "lang": "painless",
+                    "params": {"entry": entry, **summary},
+                }},
+                retry_on_conflict=3,
+            )
+        except Exception as e:
+            logger.error("ES rating update failed for %s: %s", product_id, e)
 
-        cache.delete("all_products")
-        return ProductService.get_product(product_id)
+        _invalidate_product(product_id, doc)
+        return {"product_id": product_id, "rating": entry, **summary}
+
+    @staticmethod
+    def backfill_ratings() -> dict:
+        """Compute rating_avg / rating_count / rating_sum for products written
+        before they were maintained, in Mongo and ES."""
+        mongo_res = product_collection.update_many({}, [
+            {"$set": {
+                "rating_count": {"$size": {"$ifNull": ["$userRatings", []]}},
+                "rating_sum": {"$sum": "$userRatings.rating"},
+            }},
+            {"$set": {
+                "rating_avg": {"$cond": [
+                    {"$gt": ["$rating_count", 0]},
+                    {"$round": [{"$divide": ["$rating_sum", "$rating_count"]}, 2]},
+                    {"$ifNull": ["$rating", 0]},
+                ]},
+            }},
+        ])
+        es_res = es_client.update_by_query(
+            index=settings.ES_INDEX,
+            body={"script": {"source": _BACKFILL_RATINGS_SCRIPT, "lang": "painless"}},
+            conflicts="proceed",
+            refresh=True,
+        )
+        # Every product's rating may have changed — nothing cached is safe to keep
+        cache.clear()
+        return {"mongo_updated": mongo_res.modified_count, "es_updated": es_res.get("updated", 0)}
 
     # ------------------------------------------------------------------
     # DELETE
     # ------------------------------------------------------------------
     @staticmethod
     def delete_product(product_id: str) -> bool:
+        previous = _scope_fields(product_id)
         success = False
         try:
             product_collection.delete_one({"_id": ObjectId(product_id)})
             success = True
         except Exception as e:
-            print(f"Mongo delete failed: {e}")
+            logger.error("Mongo delete failed: %s", e)
 
         try:
             es_client.delete(index=settings.ES_INDEX, id=product_id)
             es_client.indices.refresh(index=settings.ES_INDEX)
         except Exception as e:
-            print(f"ES delete failed: {e}")
+            logger.error("ES delete failed: %s", e)
+        _delete_suggestion(product_id)
 
-        cache.delete("all_products")
+        _invalidate_product(product_id, previous)
         return success
 
     # ------------------------------------------------------------------
@@ -553,9 +1294,36 @@ class ProductService:
             doc = f.get("doc", {})
             if _es_index_with_retry(mongo_id, doc, max_attempts=2):
                 sync_failures.delete_one({"mongo_id": mongo_id})
+                _invalidate_product(mongo_id, doc)
                 resynced += 1
             else:
                 still_failed += 1
-
-        cache.delete("all_products")
         return {"resynced": resynced, "still_failed": still_failed}
+
+    # ------------------------------------------------------------------
+    # REBUILD SUGGEST INDEX
+    # ------------------------------------------------------------------
+    @staticmethod
+    def rebuild_suggest_index() -> dict:
+        """Re-populate the autocomplete suggest index from the main index
+        (first deploy, or after bulk loads that bypassed create_product)."""
+        start = time.time()
+        actions = (
+            {
+                "_index": settings.ES_SUGGEST_INDEX,
+                "_id": hit["_id"],
+                "_source": suggest_doc(hit["_source"]),
+            }
+            for hit in helpers.scan(
+                es_client,
+                index=settings.ES_INDEX,
+                query={"query": {"match_all": {}}, "_source": _SUGGEST_SOURCE_FIELDS},
+            )
+        )
+        indexed, errors = helpers.bulk(es_client, actions, raise_on_error=False)
+        es_client.indices.refresh(index=settings.ES_SUGGEST_INDEX)
+        return {
+            "indexed": indexed,
+            "errors": len(errors),
+            "took_ms": round((time.time() - start) * 1000),
+        }
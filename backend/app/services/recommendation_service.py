@@ -5,15 +5,25 @@ Provides similar products and trending items using Elasticsearch queries.
 
 from typing import List, Dict, Any
 from app.db import es_client, settings, product_collection
+from app.utils.projections import source_filter
+from app.utils.serialization import encode_payload
+from app.cache import cache
+from app.services.product_service import CATALOG_TAG, RATING_SORT
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
+
+# Fields needed from the source product to find its neighbours
+_SOURCE_FIELDS = ["name", "description", "category", "brand", "price"]
 
 
 class RecommendationService:
 
     @staticmethod
-    def get_similar_products(product_id: str, limit: int = 6) -> List[Dict[str, Any]]:
+    def get_similar_products(product_id: str, limit: int = 6, view: str = "card") -> List[Dict[str, Any]]:
         """Get similar products based on category, brand, and description."""
         try:
-            source = es_client.get(index=settings.ES_INDEX, id=product_id)
+            source = es_client.get(index=settings.ES_INDEX, id=product_id, _source_includes=_SOURCE_FIELDS)
             source_doc = source["_source"]
 
             search_body = {
@@ -38,8 +48,9 @@ class RecommendationService:
                 },
                 "sort": [
                     {"_score": "desc"},
-                    {"rating": {"order": "desc", "missing": 0}},
+                    RATING_SORT,
                 ],
+                "_source": source_filter(view),
             }
 
             res = es_client.search(index=settings.ES_INDEX, body=search_body)
@@ -54,14 +65,14 @@ class RecommendationService:
             return results[:limit]
 
         except Exception as e:
-            print(f"Error getting similar products: {e}")
+            logger.error("Error getting similar products: %s", e)
             return []
 
     @staticmethod
-    def get_frequently_bought_together(product_id: str, limit: int = 4) -> List[Dict[str, Any]]:
+    def get_frequently_bought_together(product_id: str, limit: int = 4, view: str = "card") -> List[Dict[str, Any]]:
         """Get complementary products — same category, different price point."""
         try:
-            source = es_client.get(index=settings.ES_INDEX, id=product_id)
+            source = es_client.get(index=settings.ES_INDEX, id=product_id, _source_includes=_SOURCE_FIELDS)
             source_doc = source["_source"]
             source_price = float(source_doc.get("price", 0))
 
@@ -82,7 +93,8 @@ class RecommendationService:
                         ],
                     }
                 },
-                "sort": [{"rating": {"order": "desc", "missing": 0}}],
+                "sort": [RATING_SORT],
+                "_source": source_filter(view),
             }
 
             res = es_client.search(index=settings.ES_INDEX, body=search_body)
@@ -96,11 +108,24 @@ class RecommendationService:
             return results[:limit]
 
         except Exception as e:
-            print(f"Error getting frequently bought together: {e}")
+            logger.error("Error getting frequently bought together: %s", e)
             return []
 
     @staticmethod
-    def get_trending_products(limit: int = 10) -> List[Dict[str, Any]]:
+    def get_trending_payload(limit: int = 10, view: str = "card") -> dict:
+        """The /recommendations/trending body as a cached encoded payload (1 min)."""
+        ck = f"trending:{limit}:{view}"
+        entry = cache.get(ck)
+        if entry is None:
+            results = RecommendationService.get_trending_products(limit, view)
+            entry = encode_payload({"trending_products": results, "count": len(results)})
+            if results:  # don't pin an ES outage for a minute
+                # Tagged like the catalog pages: any product write can reorder it
+                cache.set(ck, entry, ttl=60, tags=[CATALOG_TAG])
+        return entry
+
+    @staticmethod
+    def get_trending_products(limit: int = 10, view: str = "card") -> List[Dict[str, Any]]:
         """Get trending products — boosted by rating and discount using field_value_factor."""
         try:
             search_body = {
@@ -112,7 +137,7 @@ class RecommendationService:
                             {
                                 # Boost by rating (0–5 scale)
                                 "field_value_factor": {
-                                    "field": "rating",
+                                    "field": "rating_avg",
                                     "factor": 1.5,
                                     "modifier": "sqrt",
                                     "missing": 1,
@@ -132,6 +157,7 @@ class RecommendationService:
                         "boost_mode": "multiply",
                     }
                 },
+                "_source": source_filter(view),
             }
 
             res = es_client.search(index=settings.ES_INDEX, body=search_body)
@@ -144,7 +170,7 @@ class RecommendationService:
             return results
 
         except Exception as e:
-            print(f"Error getting trending products: {e}")
+            logger.error("Error getting trending products: %s", e)
             # Hard fallback — sort by rating desc
             try:
                 fallback = es_client.search(
@@ -152,7 +178,8 @@ class RecommendationService:
                     body={
                         "size": limit,
                         "query": {"match_all": {}},
-                        "sort": [{"rating": {"order": "desc", "missing": 0}}],
+                        "sort": [RATING_SORT],
+                        "_source": source_filter(view),
                     },
                 )
                 results = []
@@ -1,4 +1,7 @@
 import requests
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
 
 # Fallback dictionary for common e-commerce terms
 # Datamuse can return weird synonyms (slang, etc.), so we have curated product synonyms
@@ -39,7 +42,7 @@ def fetch_auto_synonyms(word: str, max_results=10) -> list:
             if synonyms:
                 return synonyms
     except Exception as e:
-        print(f"Warning: Failed to fetch auto-synonyms for '{word}': {e}")
+        logger.warning("Failed to fetch auto-synonyms for '%s': %s", word, e)
     
     return []
 
@@ -0,0 +1,45 @@
+"""
+Opaque pagination cursors.
+
+A cursor carries everything needed to fetch the next page without server-side
+state: the effective ES query/sort, page size, point-in-time id and the
+search_after position. It is HMAC-signed so clients can page through results
+but cannot smuggle their own query bodies into Elasticsearch.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+
+from app.config import settings
+
+
+class InvalidCursor(ValueError):
+    """Raised for tampered, malformed or expired cursors."""
+
+
+def _sign(payload: bytes) -> str:
+    key = settings.CURSOR_SECRET.encode()
+    return hmac.new(key, payload, hashlib.sha256).hexdigest()[:32]
+
+
+def encode_cursor(state: dict) -> str:
+    payload = base64.urlsafe_b64encode(
+        json.dumps(state, separators=(",", ":"), default=str).encode()
+    ).rstrip(b"=")
+    return f"{payload.decode()}.{_sign(payload)}"
+
+
+def decode_cursor(token: str) -> dict:
+    try:
+        payload, signature = token.rsplit(".", 1)
+    except ValueError:
+        raise InvalidCursor("Malformed cursor")
+    if not hmac.compare_digest(signature, _sign(payload.encode())):
+        raise InvalidCursor("Invalid cursor signature")
+    try:
+        padded = payload + "=" * (-len(payload) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded))
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
@@ -0,0 +1,109 @@
+"""
+On-disk snapshot of the compiled NLP knowledge base.
+
+Building the knowledge base on boot means a synonym read from MongoDB, a terms
+aggregation over Elasticsearch and a spaCy pass over every category — seconds
+during which search runs without entity extraction. The compiled state
+(entities, lemmas, synonyms, popularity and the derived fuzzy / autocomplete
+indexes) is instead written to a versioned JSON snapshot, which a new worker
+loads in milliseconds before refreshing from the databases in the background.
+
+The snapshot is plain JSON — loading it can't run code — and by default lives
+in this user's private cart-<uid>-<namespace> directory (see app.cache.shm).
+A file that is not a regular file owned by this user, or that other users can
+write, is refused. Sets and tuples come back as lists; the caller restores the
+knowledge base types.
+
+The header line is stamped with a format version and the spaCy model version;
+a snapshot written by a different format or model is ignored (its lemmas would
+not match what the running pipeline produces) and rebuilt on the next refresh.
+"""
+
+import json
+import os
+import stat
+import tempfile
+import time
+from typing import Optional
+
+from app.config import settings
+from app.utils.log import get_logger
+from app.utils.serialization import loads
+
+logger = get_logger(__name__)
+
+FORMAT_VERSION = 3
+_MAGIC = "cart-nlp-kb"
+_FILENAME = "nlp_kb.json"
+
+
+def snapshot_path() -> str:
+    if settings.NLP_SNAPSHOT_PATH:
+        return settings.NLP_SNAPSHOT_PATH
+    from app.cache import cache_namespace
+    from app.cache.shm import shm_path
+    return shm_path(_FILENAME, tempfile.gettempdir(), cache_namespace())
+
+
+def _encode(value):
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def save(state: dict, model_version: str, path: str = "") -> str:
+    """Atomically write `state` to the snapshot file (tmp file + rename, so a
+    concurrently loading worker sees either the old or the new snapshot)."""
+    path = path or snapshot_path()
+    header = {
+        "magic": _MAGIC,
+        "format": FORMAT_VERSION,
+        "model": model_version,
+        "created_at": time.time(),
+    }
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".kb-", dir=directory)  # mode 0600
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(header) + "\n")
+            json.dump(state, f, default=_encode, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return path
+
+
+def _check_owner(fd: int, path: str) -> None:
+    st = os.fstat(fd)
+    if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o022:
+        raise PermissionError(
+            f"{path} must be a regular file owned by uid {os.getuid()} and not writable by other users"
+        )
+
+
+def load(model_version: str, path: str = "") -> Optional[dict]:
+    """Snapshot state, or None when there is no usable snapshot."""
+    try:
+        path = path or snapshot_path()
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        with os.fdopen(fd, "rb") as f:
+            _check_owner(fd, path)
+            header = loads(f.readline())
+            if (
+                not isinstance(header, dict)
+                or header.get("magic") != _MAGIC
+                or header.get("format") != FORMAT_VERSION
+                or header.get("model") != model_version
+            ):
+                logger.warning("NLP snapshot %s is stale or incompatible — ignoring", path)
+                return None
+            state = loads(f.read())
+        return state if isinstance(state, dict) else None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Failed to load NLP snapshot %s: %s", path, e)
+        return None
@@ -0,0 +1,127 @@
+"""
+Structured, leveled logging for the app.
+
+Modules log through `logger = get_logger(__name__)`, a child of the "cart"
+logger (third-party loggers such as the ES client's are left alone):
+
+- Levels come from settings.LOG_LEVEL (INFO in production). Per-request lines
+  are DEBUG and use %-style arguments, so below DEBUG no record is created and
+  nothing is formatted; wrap dict payloads in `lazy_json` so they are only
+  serialized when the line is actually written.
+- settings.LOG_DEBUG_SAMPLE_RATE keeps that fraction of DEBUG lines, for
+  turning on request-level debugging under production traffic.
+- Records go through a QueueHandler; a QueueListener thread formats them and
+  does the blocking write, so logging never waits on stdout.
+- LOG_FORMAT=json writes one JSON object per line, with any `extra={...}`
+  fields as keys (text mode appends them as key=value).
+"""
+
+import atexit
+import logging
+import queue
+import random
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+from app.config import settings
+from app.utils.serialization import dumps
+
+_ROOT = "cart"
+_TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Attributes every LogRecord has — anything else came in through `extra`
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+class lazy_json:
+    """Log argument serialized to JSON only if the record is formatted."""
+
+    __slots__ = ("obj",)
+
+    def __init__(self, obj) -> None:
+        self.obj = obj
+
+    def __str__(self) -> str:
+        return dumps(self.obj).decode()
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {k: v for k, v in vars(record).items() if k not in _RECORD_FIELDS}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **_extra_fields(record),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return dumps(entry).decode()
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class _SampledDebugFilter(logging.Filter):
+    """Keep a `rate` fraction of DEBUG records; every other level passes."""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or self.rate >= 1 or random.random() < self.rate
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread (the stock
+    prepare() formats the message in the logging thread)."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_logging() -> None:
+    """Attach the queue handler to the "cart" logger (once per process)."""
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        stream = logging.StreamHandler(sys.stdout)
+        if settings.LOG_FORMAT.lower() == "json":
+            stream.setFormatter(JsonFormatter())
+        else:
+            stream.setFormatter(TextFormatter(_TEXT_FORMAT))
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        handler = _DeferredQueueHandler(log_queue)
+        handler.addFilter(_SampledDebugFilter(settings.LOG_DEBUG_SAMPLE_RATE))
+        listener = QueueListener(log_queue, stream)
+        listener.start()
+        atexit.register(listener.stop)
+
+        root = logging.getLogger(_ROOT)
+        root.setLevel(settings.LOG_LEVEL.upper())
+        root.addHandler(handler)
+        root.propagate = False
+        _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a module: "app.services.product_service" → "cart.services.product_service"."""
+    setup_logging()
+    return logging.getLogger(f"{_ROOT}.{name.removeprefix('app.')}")
@@ -0,0 +1,39 @@
+"""
+Named response projections backed by Elasticsearch _source filtering.
+
+- card   : what product lists/grids render (default for list endpoints)
+- detail : everything a product page needs — all fields except the embedding
+- full   : the raw document
+"""
+
+from typing import Literal, Union
+
+View = Literal["card", "detail", "full"]
+
+PROJECTIONS: dict = {
+    "card": {
+        "includes": [
+            "name", "brand", "category", "price", "image_url", "color", "gender",
+            "rating", "rating_avg", "rating_count",
+            "discount", "stock", "created_at", "isNew", "isSale",
+        ]
+    },
+    "detail": {"excludes": ["product_vector"]},
+    "full": {},
+}
+
+
+def source_filter(view: str) -> Union[dict, bool]:
+    """Value for an ES search body's "_source" key."""
+    return PROJECTIONS[view] or True
+
+
+def get_source_params(view: str) -> dict:
+    """Keyword arguments for es_client.get() / mget() source filtering."""
+    projection = PROJECTIONS[view]
+    params = {}
+    if projection.get("includes"):
+        params["_source_includes"] = projection["includes"]
+    if projection.get("excludes"):
+        params["_source_excludes"] = projection["excludes"]
+    return params
@@ -1,14 +1,34 @@
 import spacy
 import re
 import json
+import heapq
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import islice
+from typing import NamedTuple
+import numpy as np
 from rapidfuzz import process, fuzz
+from app.utils.log import get_logger
 
-nlp = spacy.load("en_core_web_sm")
+logger = get_logger(__name__)
+
+# parse_query only needs lemmas plus lexical flags (is_punct, like_num, is_stop,
+# is_space). The dependency parser and NER are the most expensive components of
+# en_core_web_sm and contribute nothing here, so they are never loaded.
+# tok2vec stays because the tagger listens to it, and the rule lemmatizer needs
+# the POS tags produced by tagger + attribute_ruler.
+_UNUSED_PIPES = ["parser", "ner", "senter"]
+
+nlp = spacy.load("en_core_web_sm", exclude=_UNUSED_PIPES)
+
+# Batch size for nlp.pipe() during bulk lemmatisation (entity refresh, startup)
+_PIPE_BATCH_SIZE = 256
 
 # ---------------------------------------------------------------------------
-# Synonym Map — loaded from MongoDB on startup, seeded with sensible defaults
+# Default synonym map — seeds the knowledge base, merged with MongoDB on startup
 # ---------------------------------------------------------------------------
-SYNONYM_MAP = {
+DEFAULT_SYNONYM_MAP = {
     "categories": {
         "shoes": ["footwear", "sneakers", "kicks", "trainers", "runners", "sports shoes",
                   "running shoes", "shoe", "joggers", "loafers"],
@@ -122,8 +142,8 @@ COLORS = [
 GENDERS = ["men", "women", "boys", "girls", "unisex", "male", "female",
            "mens", "womens", "kids", "children", "child", "man", "woman"]
 
-# Canonical brand list
-BRANDS = [
+# Canonical brand list (seed — the live list is current_kb().brands)
+DEFAULT_BRANDS = [
     "nike", "adidas", "puma", "reebok", "campus", "sparx", "bata", "woodland",
     "apple", "samsung", "oneplus", "xiaomi", "realme", "vivo", "oppo", "motorola",
     "sony", "boat", "jbl", "noise", "boult",
@@ -134,8 +154,8 @@ BRANDS = [
     "red tape", "h&m", "zara", "crocs", "levis", "levi's",
 ]
 
-# Canonical category list
-RAW_CATEGORIES = [
+# Canonical category list (seed — the live list is current_kb().raw_categories)
+DEFAULT_RAW_CATEGORIES = [
     "shoes", "phone", "earphone", "shirts", "watches", "laptop",
     "sandals", "boots", "heels", "flats", "slippers", "sneakers",
     "pants", "jeans", "jackets", "dresses",
@@ -159,137 +179,527 @@ PRICE_PATTERNS = [
 DISCOUNT_PATTERN = r"\b(\d{1,2})\s*(?:%|percent(?:age)?)\s*(?:off|discount)\b"
 
 # ---------------------------------------------------------------------------
-# Entity knowledge base helpers
+# Compiled patterns — built once at import so parse_query never goes through
+# re's pattern cache, and combined so a query is scanned as few times as
+# possible:
+#   - multiword synonyms: applied in order, each on the previous one's output
+#     (replacements chain: "head smartphone" -> "head phone" -> "earphone"),
+#     behind a combined gate so a query without any of them is scanned once
+#   - sale + in-stock: one alternation with a named group per intent
+#   - sort intent / price: the FIRST listed pattern that matches anywhere wins,
+#     which an alternation (leftmost match wins) can't express. A combined
+#     gate answers "does any of them match?" in one scan, and only queries
+#     that pass it go through the ordered per-pattern searches.
+# ---------------------------------------------------------------------------
+
+_MULTIWORD_RES = [(re.compile(p, re.IGNORECASE), r) for p, r in MULTIWORD_SYNONYM_PATTERNS]
+_MULTIWORD_GATE = re.compile("|".join(p for p, _ in MULTIWORD_SYNONYM_PATTERNS), re.IGNORECASE)
+
+_SORT_INTENT_RES = [
+    (sort_key, re.compile(p, re.IGNORECASE))
+    for sort_key, patterns in SORT_INTENT_PATTERNS.items() for p in patterns
+]
+_SORT_INTENT_GATE = re.compile("|".join(p.pattern for _, p in _SORT_INTENT_RES), re.IGNORECASE)
+
+_SALE_STOCK_RE = re.compile(f"(?P<is_sale>{SALE_PATTERN})|(?P<in_stock>{STOCK_PATTERN})", re.IGNORECASE)
+_DISCOUNT_RE = re.compile(DISCOUNT_PATTERN, re.IGNORECASE)
+
+_PRICE_RES = [(re.compile(p), op) for p, op in PRICE_PATTERNS]
+_PRICE_GATE = re.compile("|".join(p for p, _ in PRICE_PATTERNS))
+
+# ---------------------------------------------------------------------------
+# Entity knowledge base
+#
+# Everything parse_query / autocomplete know about entities lives in ONE
+# immutable KnowledgeBase object behind the module-level `_KB` reference.
+# Writers (update_entities, add_synonyms, ...) build a new object from the
+# current one under _KB_LOCK and publish it with a single reference
+# assignment (RCU-style). Readers take no locks: they read `_KB` once and use
+# that object for the whole parse, so they always see a consistent view even
+# while an update is being published.
 # ---------------------------------------------------------------------------
 
+class KnowledgeBase(NamedTuple):
+    brands: tuple                 # canonical brands, append-only order
+    raw_categories: tuple         # canonical categories, append-only order
+    categories: tuple             # lemmas of every category token
+    category_lemmas: dict         # raw category -> lemma of its first token
+    lemma_to_category: dict       # lemma -> first raw category with that lemma
+    brand_set: frozenset
+    raw_category_set: frozenset
+    category_lemma_set: frozenset
+    synonyms: dict                # {"categories"|"brands": {key: tuple(synonyms)}}
+    synonym_index: dict           # synonym -> canonical key (categories first)
+    popularity: dict              # {"brands": {name: count}, "categories": {...}}
+    fuzzy_choices: tuple
+    fuzzy_slices: dict            # field -> (start, end) in fuzzy_choices
+    prefix_texts: tuple           # sorted autocomplete texts
+    prefix_types: tuple
+    prefix_scores: tuple
+
+
 def _lemmatize_list(word_list):
-    return list(set(token.lemma_ for token in nlp(" ".join(word_list))))
+    """Lemmatise every entry with nlp.pipe batching.
+    Returns (lemma set as list, {entry: lemma of its first token})."""
+    lemmas = set()
+    head_lemmas = {}
+    for word, doc in zip(word_list, nlp.pipe(word_list, batch_size=_PIPE_BATCH_SIZE)):
+        if not len(doc):
+            continue
+        lemmas.update(token.lemma_ for token in doc)
+        head_lemmas[word] = doc[0].lemma_
+    return list(lemmas), head_lemmas
+
+
+def _build_lemma_index(raw_categories, head_lemmas: dict) -> dict:
+    """Map lemma -> first raw category (in raw_categories order) with that lemma."""
+    index = {}
+    for raw_cat in raw_categories:
+        lemma = head_lemmas.get(raw_cat)
+        if lemma is not None:
+            index.setdefault(lemma, raw_cat)
+    return index
+
+
+@lru_cache(maxsize=4096)
+def _lemma(word: str) -> str:
+    """Lemma of the first token of a single word (cached — tokens repeat a lot)."""
+    doc = nlp(word)
+    return doc[0].lemma_ if len(doc) else word
+
+
+def _build_fuzzy_index(categories, raw_categories, brands) -> tuple[tuple, dict]:
+    """Concatenate every fuzzy-matchable entity list into one choices array so a
+    single cdist call can score query tokens against all of them.
+    Returns (choices, {field: (start, end)})."""
+    choices, slices = [], {}
+    for field, values in (
+        ("colors", COLORS),
+        ("categories", categories),
+        ("raw_categories", raw_categories),
+        ("brands", brands),
+    ):
+        slices[field] = (len(choices), len(choices) + len(values))
+        choices.extend(values)
+    return tuple(choices), slices
+
+
+def _build_prefix_index(brands, raw_categories, popularity: dict) -> tuple[tuple, tuple, tuple]:
+    """Sorted autocomplete index over categories + brands for bisect lookups.
+    A text that is both a category and a brand is indexed once, as a category.
+    Returns parallel tuples (texts, types, popularity scores)."""
+    entries = {b: "brand" for b in brands}
+    entries.update({c: "category" for c in raw_categories})
+    texts = sorted(entries)
+    types = [entries[t] for t in texts]
+    scores = [
+        popularity["categories" if typ == "category" else "brands"].get(t, 0)
+        for t, typ in zip(texts, types)
+    ]
+    return tuple(texts), tuple(types), tuple(scores)
+
+
+def _insert_prefix_entries(kb: KnowledgeBase, entries: dict) -> tuple[tuple, tuple, tuple]:
+    """kb's autocomplete index plus {text: type} entries (categories win over
+    brands for the same text, as in _build_prefix_index) — bisect inserts into
+    copies instead of a full rebuild."""
+    texts, types, scores = list(kb.prefix_texts), list(kb.prefix_types), list(kb.prefix_scores)
+    for text, typ in entries.items():
+        score = kb.popularity["categories" if typ == "category" else "brands"].get(text, 0)
+        i = bisect_left(texts, text)
+        if i < len(texts) and texts[i] == text:
+            if typ == "category" and types[i] != "category":
+                types[i], scores[i] = typ, score
+            continue
+        texts.insert(i, text)
+        types.insert(i, typ)
+        scores.insert(i, score)
+    return tuple(texts), tuple(types), tuple(scores)
 
 
-CATEGORIES = _lemmatize_list(RAW_CATEGORIES)
+def _build_synonym_index(synonyms: dict) -> dict:
+    """synonym -> canonical key, first key wins (categories before brands)."""
+    index = {}
+    for field in ("categories", "brands"):
+        for key, values in synonyms.get(field, {}).items():
+            for value in values:
+                index.setdefault(value, key)
+    return index
+
+
+def _freeze_synonyms(synonyms: dict) -> dict:
+    return {field: {k: tuple(v) for k, v in data.items()} for field, data in synonyms.items()}
+
+
+def _compile_knowledge_base(brands, raw_categories, synonyms: dict, popularity: dict) -> KnowledgeBase:
+    """Build a KnowledgeBase from scratch (lemmatises every category)."""
+    brands = tuple(dict.fromkeys(brands))
+    raw_categories = tuple(dict.fromkeys(raw_categories))
+    categories, category_lemmas = _lemmatize_list(list(raw_categories))
+    categories = tuple(categories)
+    synonyms = _freeze_synonyms(synonyms)
+    fuzzy_choices, fuzzy_slices = _build_fuzzy_index(categories, raw_categories, brands)
+    prefix_texts, prefix_types, prefix_scores = _build_prefix_index(brands, raw_categories, popularity)
+    return KnowledgeBase(
+        brands=brands,
+        raw_categories=raw_categories,
+        categories=categories,
+        category_lemmas=category_lemmas,
+        lemma_to_category=_build_lemma_index(raw_categories, category_lemmas),
+        brand_set=frozenset(brands),
+        raw_category_set=frozenset(raw_categories),
+        category_lemma_set=frozenset(categories),
+        synonyms=synonyms,
+        synonym_index=_build_synonym_index(synonyms),
+        popularity=popularity,
+        fuzzy_choices=fuzzy_choices,
+        fuzzy_slices=fuzzy_slices,
+        prefix_texts=prefix_texts,
+        prefix_types=prefix_types,
+        prefix_scores=prefix_scores,
+    )
+
+
+# Search-log popularity starts empty; pushed in via set_entity_popularity()
+_KB = _compile_knowledge_base(
+    DEFAULT_BRANDS, DEFAULT_RAW_CATEGORIES, DEFAULT_SYNONYM_MAP, {"brands": {}, "categories": {}}
+)
+# Serialises writers (read-copy-update); readers never take it
+_KB_LOCK = threading.Lock()
+
+
+def current_kb() -> KnowledgeBase:
+    """The knowledge base snapshot in effect right now. Hold on to the returned
+    object for the duration of an operation rather than calling this again."""
+    return _KB
+
+
+def _publish(kb: KnowledgeBase) -> None:
+    global _KB
+    _KB = kb
+
+
+def set_entity_popularity(popularity: dict) -> None:
+    """Install search-log popularity counts and rebuild the autocomplete index."""
+    popularity = {
+        "brands": dict(popularity.get("brands", {})),
+        "categories": dict(popularity.get("categories", {})),
+    }
+    with _KB_LOCK:
+        kb = _KB
+        prefix_texts, prefix_types, prefix_scores = _build_prefix_index(
+            kb.brands, kb.raw_categories, popularity
+        )
+        _publish(kb._replace(
+            popularity=popularity,
+            prefix_texts=prefix_texts,
+            prefix_types=prefix_types,
+            prefix_scores=prefix_scores,
+        ))
+
+
+def _new_entities(values, known: frozenset) -> list:
+    """Normalised values not yet in `known`, deduplicated, in input order."""
+    normalized = (v.lower().strip() for v in values or () if v)
+    return [v for v in dict.fromkeys(normalized) if v and v not in known]
 
 
 def update_entities(new_brands=None, new_categories=None):
-    global BRANDS, RAW_CATEGORIES, CATEGORIES
-    if new_brands:
-        normalized = [b.lower().strip() for b in new_brands if b]
-        BRANDS = list(set(BRANDS + normalized))
-    if new_categories:
-        normalized = [c.lower().strip() for c in new_categories if c]
-        RAW_CATEGORIES = list(set(RAW_CATEGORIES + normalized))
-        CATEGORIES = _lemmatize_list(RAW_CATEGORIES)
+    """Register brands / categories with the parser. Already-known entities
+    cost a set lookup; only genuinely new categories go through spaCy, and the
+    lemma, fuzzy and autocomplete indexes are extended rather than rebuilt."""
+    with _KB_LOCK:
+        kb = _KB
+        brands = _new_entities(new_brands, kb.brand_set)
+        categories = _new_entities(new_categories, kb.raw_category_set)
+        if not brands and not categories:
+            return
+
+        changes = {}
+        if brands:
+            changes["brands"] = kb.brands + tuple(brands)
+            changes["brand_set"] = kb.brand_set.union(brands)
+        if categories:
+            lemmas, head_lemmas = _lemmatize_list(categories)
+            lemma_index = dict(kb.lemma_to_category)
+            for raw_cat in categories:
+                if raw_cat in head_lemmas:
+                    lemma_index.setdefault(head_lemmas[raw_cat], raw_cat)
+            changes["categories"] = kb.categories + tuple(
+                lem for lem in lemmas if lem not in kb.category_lemma_set
+            )
+            changes["category_lemmas"] = {**kb.category_lemmas, **head_lemmas}
+            changes["lemma_to_category"] = lemma_index
+            changes["raw_categories"] = kb.raw_categories + tuple(categories)
+            changes["category_lemma_set"] = kb.category_lemma_set.union(lemmas)
+            changes["raw_category_set"] = kb.raw_category_set.union(categories)
+        kb = kb._replace(**changes)
+
+        fuzzy_choices, fuzzy_slices = _build_fuzzy_index(kb.categories, kb.raw_categories, kb.brands)
+        prefix_texts, prefix_types, prefix_scores = _insert_prefix_entries(kb, {
+            **{b: "brand" for b in brands},
+            **{c: "category" for c in categories},
+        })
+        _publish(kb._replace(
+            fuzzy_choices=fuzzy_choices,
+            fuzzy_slices=fuzzy_slices,
+            prefix_texts=prefix_texts,
+            prefix_types=prefix_types,
+            prefix_scores=prefix_scores,
+        ))
+
+
+def _merge_synonyms(additions: dict) -> bool:
+    """Publish a knowledge base with {field: {key: [synonyms]}} merged into the
+    synonym map. Returns True if anything was actually added."""
+    with _KB_LOCK:
+        kb = _KB
+        synonyms = dict(kb.synonyms)
+        changed = False
+        for field, data in additions.items():
+            merged = dict(synonyms.get(field, {}))
+            for key, values in data.items():
+                current = merged.get(key, ())
+                new = [v for v in dict.fromkeys(values) if v not in current]
+                if new:
+                    merged[key] = current + tuple(new)
+                    changed = True
+            synonyms[field] = merged
+        if changed:
+            _publish(kb._replace(synonyms=synonyms, synonym_index=_build_synonym_index(synonyms)))
+        return changed
 
 
 def add_synonyms(field: str, key: str, new_synonyms: list):
     from app.db import synonym_collection
 
-    if field not in SYNONYM_MAP:
-        SYNONYM_MAP[field] = {}
-
     key = key.lower()
-    current = SYNONYM_MAP[field].get(key, [])
-    updated = list(set(current + [s.lower() for s in new_synonyms]))
-
-    if len(updated) > len(current):
-        SYNONYM_MAP[field][key] = updated
+    values = [s.lower() for s in new_synonyms]
+    if _merge_synonyms({field: {key: values}}):
         try:
             synonym_collection.update_one(
                 {"_id": field},
-                {"$addToSet": {f"data.{key}": {"$each": [s.lower() for s in new_synonyms]}}},
+                {"$addToSet": {f"data.{key}": {"$each": values}}},
                 upsert=True,
             )
         except Exception as e:
-            print(f"Failed to persist synonyms: {e}")
+            logger.warning("Failed to persist synonyms: %s", e)
 
 
 def load_synonyms_from_db():
     from app.db import synonym_collection
     try:
-        for doc in synonym_collection.find({}):
-            _id = doc["_id"]
-            data = doc.get("data", {})
-            # Merge (don't overwrite hardcoded defaults)
-            for k, v in data.items():
-                existing = SYNONYM_MAP.get(_id, {}).get(k, [])
-                SYNONYM_MAP.setdefault(_id, {})[k] = list(set(existing + v))
-        print(f"Synonyms loaded from DB for: {list(SYNONYM_MAP.keys())}")
+        # Merge (don't overwrite hardcoded defaults)
+        additions = {doc["_id"]: doc.get("data", {}) for doc in synonym_collection.find({})}
+        _merge_synonyms(additions)
+        logger.info("Synonyms loaded from DB for: %s", list(_KB.synonyms.keys()))
     except Exception as e:
-        print(f"Error loading synonyms from DB: {e}")
+        logger.error("Error loading synonyms from DB: %s", e)
+
+
+# ---------------------------------------------------------------------------
+# Knowledge base snapshot — see app/utils/kb_snapshot.py
+# ---------------------------------------------------------------------------
+
+# Lemmas in a snapshot are only valid for the pipeline that produced them
+_MODEL_VERSION = f"{nlp.meta.get('name')}-{nlp.meta.get('version')}/spacy-{spacy.__version__}"
+
+
+def save_snapshot(path: str = "") -> str | None:
+    """Write the compiled knowledge base to the on-disk snapshot."""
+    from app.utils import kb_snapshot
+    try:
+        return kb_snapshot.save(_KB._asdict(), _MODEL_VERSION, path)
+    except Exception as e:
+        logger.warning("Failed to save NLP snapshot: %s", e)
+        return None
+
+
+def _kb_from_snapshot(state: dict) -> KnowledgeBase:
+    """Rebuild the knowledge base from snapshot JSON (tuples and sets come back as lists)."""
+    kb = KnowledgeBase(**state)
+    return kb._replace(
+        **{f: tuple(getattr(kb, f)) for f in (
+            "brands", "raw_categories", "categories", "fuzzy_choices",
+            "prefix_texts", "prefix_types", "prefix_scores",
+        )},
+        **{f: frozenset(getattr(kb, f)) for f in ("brand_set", "raw_category_set", "category_lemma_set")},
+        synonyms=_freeze_synonyms(kb.synonyms),
+        fuzzy_slices={field: tuple(bounds) for field, bounds in kb.fuzzy_slices.items()},
+    )
+
+
+def load_snapshot(path: str = "") -> bool:
+    """Install a previously saved knowledge base without touching ES, MongoDB
+    or spaCy. Returns False when no compatible snapshot exists."""
+    from app.utils import kb_snapshot
+    state = kb_snapshot.load(_MODEL_VERSION, path)
+    if state is None:
+        return False
+    try:
+        kb = _kb_from_snapshot(state)
+    except (TypeError, KeyError, AttributeError) as e:
+        logger.warning("NLP snapshot does not match the knowledge base layout: %s", e)
+        return False
+    with _KB_LOCK:
+        _publish(kb)
+    return True
 
 
 # ---------------------------------------------------------------------------
 # Low-level helpers
 # ---------------------------------------------------------------------------
 
-def _fuzzy_match(token: str, choices: list, threshold: int = 72) -> str | None:
-    if not choices or not token:
+class FuzzyScores:
+    """fuzz.ratio scores of every query token against every entity list,
+    computed with ONE multi-threaded rapidfuzz cdist call. Shared by entity
+    extraction and did-you-mean so no entity list is scanned twice."""
+
+    def __init__(self, tokens, kb: KnowledgeBase | None = None):
+        kb = kb or _KB
+        self.choices = kb.fuzzy_choices
+        self.slices = kb.fuzzy_slices
+        unique = list(dict.fromkeys(t for t in tokens if t))
+        self._rows = {t: i for i, t in enumerate(unique)}
+        if unique and self.choices:
+            self._matrix = process.cdist(
+                unique, self.choices, scorer=fuzz.ratio, dtype=np.float64, workers=-1
+            )
+        else:
+            self._matrix = None
+
+    def best(self, token: str, field: str, threshold: int) -> str | None:
+        """Best choice from `field` for `token` if it scores >= threshold
+        (same semantics as process.extractOne)."""
+        row = self._rows.get(token)
+        start, end = self.slices[field]
+        if row is None or self._matrix is None or start == end:
+            return None
+        scores = self._matrix[row, start:end]
+        idx = int(scores.argmax())
+        if scores[idx] >= threshold:
+            return self.choices[start + idx]
         return None
-    result = process.extractOne(token, choices, scorer=fuzz.ratio)
-    if result and result[1] >= threshold:
-        return result[0]
-    return None
 
 
-def _resolve_synonym(token: str) -> str:
+def _resolve_synonym(token: str, kb: KnowledgeBase) -> str:
     """Replace token with canonical key if it appears in any synonym list."""
-    for field in ("categories", "brands"):
-        if field not in SYNONYM_MAP:
-            continue
-        for key, synonyms in SYNONYM_MAP[field].items():
-            if token in synonyms:
-                return key
-    return token
+    return kb.synonym_index.get(token, token)
 
 
 def _apply_multiword_synonyms(query: str) -> str:
-    for pattern, replacement in MULTIWORD_SYNONYM_PATTERNS:
-        query = re.sub(pattern, replacement, query, flags=re.IGNORECASE)
+    if not _MULTIWORD_GATE.search(query):
+        return query
+    for pattern, replacement in _MULTIWORD_RES:
+        query = pattern.sub(replacement, query)
     return query
 
 
 def _extract_sort_intent(query: str) -> tuple[str | None, str]:
     """Detect sort intent and strip those words from the query.
     Returns (sort_by, cleaned_query)."""
-    for sort_key, patterns in SORT_INTENT_PATTERNS.items():
-        for pattern in patterns:
-            m = re.search(pattern, query, re.IGNORECASE)
-            if m:
-                cleaned = query[: m.start()].rstrip() + " " + query[m.end():].lstrip()
-                return sort_key, cleaned.strip()
+    if not _SORT_INTENT_GATE.search(query):
+        return None, query
+    for sort_key, pattern in _SORT_INTENT_RES:
+        m = pattern.search(query)
+        if m:
+            cleaned = query[: m.start()].rstrip() + " " + query[m.end():].lstrip()
+            return sort_key, cleaned.strip()
     return None, query
 
 
-def get_spelling_suggestion(token: str) -> str | None:
+def _extract_price(query: str, result: dict) -> str:
+    """Fill price_min / price_max from the first matching price pattern and
+    return the query with the matched text removed."""
+    if not _PRICE_GATE.search(query):
+        return query
+    for pattern, op in _PRICE_RES:
+        m = pattern.search(query)
+        if m:
+            if op == "between":
+                result["price_min"] = int(m.group(1))
+                result["price_max"] = int(m.group(2))
+            else:
+                val = int(m.group(1))
+                if op in ("<", "<="):
+                    result["price_max"] = val
+                elif op in (">", ">="):
+                    result["price_min"] = val
+            # Remove matched price text so it doesn't pollute keywords
+            return query[: m.start()] + query[m.end():]
+    return query
+
+
+def _extract_intents(query: str, result: dict) -> str:
+    """Sort, sale, stock, discount and price intents (regex only, before
+    spaCy). Fills `result` and returns the query with consumed text removed."""
+    # ---- 0. Sort intent (before price, so "cheapest" doesn't get swallowed) ----
+    sort_intent, query = _extract_sort_intent(query)
+    result["sort_by"] = sort_intent
+
+    # Map price_asc sort to also imply "show cheapest" — don't set price_max
+    # (just influence ES sort order later)
+
+    # ---- 0.5 / 0.6 Sale / discount and in-stock intent (one scan) ----
+    for m in _SALE_STOCK_RE.finditer(query):
+        if m.group("is_sale") is not None:
+            result["is_sale"] = True
+        else:
+            result["in_stock"] = True
+
+    # ---- 0.7 Percentage discount pattern: "50% off" ----
+    disc_match = _DISCOUNT_RE.search(query)
+    if disc_match:
+        result["min_discount"] = int(disc_match.group(1))
+        query = query[: disc_match.start()] + query[disc_match.end():]
+
+    # ---- 1. Extract price ranges first (regex, before spaCy tokenisation) ----
+    return _extract_price(query, result)
+
+
+def get_spelling_suggestion(token: str, scores: FuzzyScores | None = None) -> str | None:
     """Return a spelling suggestion for a misspelled brand or category token."""
+    if scores is None:
+        scores = FuzzyScores([token])
     # Check brands first
-    brand_match = _fuzzy_match(token, BRANDS, threshold=60)
+    brand_match = scores.best(token, "brands", threshold=60)
     if brand_match and brand_match != token:
         return brand_match
     # Then categories
-    cat_match = _fuzzy_match(token, RAW_CATEGORIES, threshold=60)
+    cat_match = scores.best(token, "raw_categories", threshold=60)
     if cat_match and cat_match != token:
         return cat_match
     return None
 
 
-def build_did_you_mean(original_query: str, parsed: dict) -> str | None:
+def _did_you_mean_tokens(original_query: str) -> list[str]:
+    return [t for t in original_query.lower().split() if len(t) >= 3]
+
+
+def build_did_you_mean(original_query: str, parsed: dict,
+                       scores: FuzzyScores | None = None) -> str | None:
     """If the parsed result found entities via fuzzy matching, build a
     'Did you mean …?' suggestion string to show the user."""
     corrections = []
-    tokens = original_query.lower().split()
+    tokens = _did_you_mean_tokens(original_query)
+    if scores is None:
+        scores = FuzzyScores(tokens)
     for token in tokens:
-        if len(token) < 3:
-            continue
-        suggestion = get_spelling_suggestion(token)
+        suggestion = get_spelling_suggestion(token, scores)
         if suggestion and suggestion.lower() != token.lower():
             corrections.append((token, suggestion))
 
     if not corrections:
         return None
+    return _apply_corrections(original_query, corrections)
 
+
+def _apply_corrections(original_query: str, corrections: list[tuple[str, str]]) -> str | None:
+    """Replace each (token, suggestion) in turn, every occurrence, case-insensitively.
+    Later corrections see the output of earlier ones. None if nothing changed."""
     result = original_query
-    for original, corrected in corrections:
-        result = re.sub(re.escape(original), corrected, result, flags=re.IGNORECASE)
+    for token, suggestion in corrections:
+        result = re.sub(re.escape(token), suggestion, result, flags=re.IGNORECASE)
     return result if result.lower() != original_query.lower() else None
 
 
@@ -297,7 +707,8 @@ def build_did_you_mean(original_query: str, parsed: dict) -> str | None:
 # Main parser
 # ---------------------------------------------------------------------------
 
-def parse_query(query: str) -> dict:
+def _prepare_query(query: str) -> tuple[str, str, dict]:
+    """Regex stage of a parse. Returns (raw_query, text left for spaCy, result)."""
     raw_query = query.lower().strip()
     query = _apply_multiword_synonyms(raw_query)
 
@@ -317,45 +728,26 @@ def parse_query(query: str) -> dict:
         "did_you_mean": None,
     }
 
-    # ---- 0. Sort intent (before price, so "cheapest" doesn't get swallowed) ----
-    sort_intent, query = _extract_sort_intent(query)
-    result["sort_by"] = sort_intent
-
-    # Map price_asc sort to also imply "show cheapest" — don't set price_max
-    # (just influence ES sort order later)
+    # ---- 0–1. Sort, sale, stock, discount and price intents (regex) ----
+    query = _extract_intents(query, result)
+    return raw_query, query, result
 
-    # ---- 0.5 Sale / discount intent ----
-    if re.search(SALE_PATTERN, query, re.IGNORECASE):
-        result["is_sale"] = True
 
-    # ---- 0.6 In-stock intent ----
-    if re.search(STOCK_PATTERN, query, re.IGNORECASE):
-        result["in_stock"] = True
-
-    # ---- 0.7 Percentage discount pattern: "50% off" ----
-    disc_match = re.search(DISCOUNT_PATTERN, query, re.IGNORECASE)
-    if disc_match:
-        result["min_discount"] = int(disc_match.group(1))
-        query = query[: disc_match.start()] + query[disc_match.end():]
+def _fuzzy_tokens(raw_query: str, doc, kb: KnowledgeBase) -> list[str]:
+    """Every token fuzzy matching may score for this query: the did-you-mean
+    tokens plus each candidate token (synonym-resolved) and its lemma."""
+    tokens = _did_you_mean_tokens(raw_query)
+    for token in doc:
+        raw = token.text.lower()
+        if token.is_punct or token.like_num or raw in STOP_WORDS or token.is_space:
+            continue
+        norm = _resolve_synonym(raw, kb)
+        tokens.extend((norm, _lemma(norm)))
+    return tokens
 
-    # ---- 1. Extract price ranges first (regex, before spaCy tokenisation) ----
-    for pattern, op in PRICE_PATTERNS:
-        m = re.search(pattern, query)
-        if m:
-            if op == "between":
-                result["price_min"] = int(m.group(1))
-                result["price_max"] = int(m.group(2))
-            else:
-                val = int(m.group(1))
-                if op in ("<", "<="):
-                    result["price_max"] = val
-                elif op in (">", ">="):
-                    result["price_min"] = val
-            # Remove matched price text so it doesn't pollute keywords
-            query = query[: m.start()] + query[m.end():]
-            break
 
-    doc = nlp(query)
+def _parse_doc(raw_query: str, doc, result: dict, kb: KnowledgeBase, scores: FuzzyScores) -> dict:
+    """Entity extraction over the spaCy doc (steps 2–7) into `result`."""
     used_tokens = set()  # track which token indices have been consumed
 
     for i, token in enumerate(doc):
@@ -369,8 +761,8 @@ def parse_query(query: str) -> dict:
         if token.is_punct or token.like_num or raw in STOP_WORDS or token.is_space:
             continue
 
-        norm = _resolve_synonym(raw)
-        norm_lemma = _resolve_synonym(lemma)
+        norm = _resolve_synonym(raw, kb)
+        norm_lemma = _resolve_synonym(lemma, kb)
 
         # ---- 2. Color (exact) ----
         if result["color"] is None:
@@ -378,7 +770,7 @@ def parse_query(query: str) -> dict:
                 result["color"] = norm if norm in COLORS else norm_lemma
                 used_tokens.add(i)
                 continue
-            col = _fuzzy_match(norm, COLORS, threshold=85)  # tight — avoid 'god'→'gold'
+            col = scores.best(norm, "colors", threshold=85)  # tight — avoid 'god'→'gold'
             if col:
                 result["color"] = col
                 used_tokens.add(i)
@@ -401,53 +793,46 @@ def parse_query(query: str) -> dict:
         # ---- 4. Category ----
         if result["category"] is None:
             # Direct match against raw categories (exact only at this point)
-            if norm in RAW_CATEGORIES:
+            if norm in kb.raw_category_set:
                 result["category"] = norm
                 used_tokens.add(i)
                 continue
-            if norm_lemma in RAW_CATEGORIES:
+            if norm_lemma in kb.raw_category_set:
                 result["category"] = norm_lemma
                 used_tokens.add(i)
                 continue
 
-            # Lemma-level exact match
-            cat_lemma = nlp(norm)[0].lemma_
-            cat_matched = False
-            for raw_cat in RAW_CATEGORIES:
-                if nlp(raw_cat)[0].lemma_ == cat_lemma:
-                    result["category"] = raw_cat
-                    used_tokens.add(i)
-                    cat_matched = True
-                    break
-            if cat_matched:
+            # Lemma-level exact match (category lemmas are precomputed)
+            raw_cat = kb.lemma_to_category.get(_lemma(norm))
+            if raw_cat:
+                result["category"] = raw_cat
+                used_tokens.add(i)
                 continue
 
         # ---- 5. Brand — EXACT match comes before fuzzy category ----
         # This ensures known brand tokens (e.g. "boat") are never mis-classified
         # as a fuzzy category match (e.g. "boots").
         if result["brand"] is None:
-            if norm in BRANDS:
+            if norm in kb.brand_set:
                 result["brand"] = norm
                 used_tokens.add(i)
                 continue
 
         # ---- 4b. Fuzzy category (only if not an exact brand) ----
         if result["category"] is None and result["brand"] is None:
-            cat_lemma = nlp(norm)[0].lemma_
+            cat_lemma = _lemma(norm)
             # Raise threshold to 80 to avoid false positives like boat→boots
-            fuzzy_cat_lemma = _fuzzy_match(cat_lemma, CATEGORIES, threshold=80)
+            fuzzy_cat_lemma = scores.best(cat_lemma, "categories", threshold=80)
             if fuzzy_cat_lemma:
-                for raw_cat in RAW_CATEGORIES:
-                    if nlp(raw_cat)[0].lemma_ == fuzzy_cat_lemma:
-                        result["category"] = raw_cat
-                        used_tokens.add(i)
-                        break
-                if result["category"]:
+                raw_cat = kb.lemma_to_category.get(fuzzy_cat_lemma)
+                if raw_cat:
+                    result["category"] = raw_cat
+                    used_tokens.add(i)
                     continue
 
         # ---- 5b. Fuzzy brand (for typos like "nikey", "addidas") ----
         if result["brand"] is None:
-            br = _fuzzy_match(norm, BRANDS, threshold=72)
+            br = scores.best(norm, "brands", threshold=72)
             if br:
                 result["brand"] = br
                 used_tokens.add(i)
@@ -471,50 +856,94 @@ def parse_query(query: str) -> dict:
     result["keywords"] = clean_kw
 
     # ---- 7. Did-you-mean (spelling hint for frontend) ----
-    result["did_you_mean"] = build_did_you_mean(raw_query, result)
+    result["did_you_mean"] = build_did_you_mean(raw_query, result, scores)
 
     return result
 
 
+def parse_query(query: str) -> dict:
+    # One knowledge base snapshot for the whole parse — concurrent updates
+    # publish a new object and never change this one
+    kb = _KB
+    raw_query, query, result = _prepare_query(query)
+    doc = nlp(query)
+    # Score every candidate token against every entity list in one cdist call
+    scores = FuzzyScores(_fuzzy_tokens(raw_query, doc, kb), kb)
+    return _parse_doc(raw_query, doc, result, kb, scores)
+
+
+# Queries sharing one fuzzy-score matrix in parse_queries — bounds the cdist
+# matrix (unique tokens x entity choices) for very large batches
+_PARSE_CHUNK_SIZE = 500
+
+
+def parse_queries(queries: list[str], batch_size: int = _PIPE_BATCH_SIZE,
+                  n_process: int = 1) -> list[dict]:
+    """parse_query over many queries (log re-parsing, cache pre-warming) with
+    identical results, in order.
+
+    spaCy runs over the whole batch with nlp.pipe — n_process > 1 spreads it
+    over worker processes, worth it from tens of thousands of queries — and
+    each chunk of queries shares one fuzzy-score matrix, so a token repeated
+    across queries is scored once."""
+    kb = _KB
+    prepared = [_prepare_query(q) for q in queries]
+    docs = nlp.pipe((text for _, text, _ in prepared), batch_size=batch_size, n_process=n_process)
+    results = []
+    for start in range(0, len(prepared), _PARSE_CHUNK_SIZE):
+        chunk = prepared[start:start + _PARSE_CHUNK_SIZE]
+        chunk_docs = list(islice(docs, len(chunk)))
+        scores = FuzzyScores(
+            [t for (raw_query, _, _), doc in zip(chunk, chunk_docs) for t in _fuzzy_tokens(raw_query, doc, kb)],
+            kb,
+        )
+        results.extend(
+            _parse_doc(raw_query, doc, result, kb, scores)
+            for (raw_query, _, result), doc in zip(chunk, chunk_docs)
+        )
+    return results
+
+
 # ---------------------------------------------------------------------------
 # Autocomplete helper — returns prefix suggestions from entity lists
 # ---------------------------------------------------------------------------
 
+# Fuzzy fallback is skipped for very short prefixes — "n" fuzzy-matches
+# almost everything and costs a full scan on every keystroke
+AUTOCOMPLETE_FUZZY_MIN_PREFIX = 3
+
+
 def get_autocomplete_suggestions(prefix: str, limit: int = 5) -> list[dict]:
     """Return structured autocomplete suggestions based on a partial query prefix.
-    Each suggestion has a `text` and `type` (brand | category | query)."""
+    Each suggestion has a `text` and `type` (brand | category | query).
+
+    Prefix matches come from the sorted entity index (bisect, O(log n + k)) and
+    are ranked by search-log popularity, categories before brands on ties."""
     prefix = prefix.lower().strip()
     if len(prefix) < 1:
         return []
 
-    suggestions = []
-    seen = set()
-
-    # 1. Category matches
-    for cat in RAW_CATEGORIES:
-        if cat.startswith(prefix) and cat not in seen:
-            suggestions.append({"text": cat, "type": "category"})
-            seen.add(cat)
-
-    # 2. Brand matches
-    for brand in BRANDS:
-        if brand.startswith(prefix) and brand not in seen:
-            suggestions.append({"text": brand, "type": "brand"})
-            seen.add(brand)
-
-    # 3. Fuzzy fallbacks if not enough results
-    if len(suggestions) < limit:
-        fuzzy_cats = process.extract(prefix, RAW_CATEGORIES, scorer=fuzz.partial_ratio, limit=limit)
-        for cat, score, _ in fuzzy_cats:
-            if score >= 60 and cat not in seen:
-                suggestions.append({"text": cat, "type": "category"})
-                seen.add(cat)
-
-        fuzzy_brands = process.extract(prefix, BRANDS, scorer=fuzz.partial_ratio, limit=limit)
-        for brand, score, _ in fuzzy_brands:
-            if score >= 60 and brand not in seen:
-                suggestions.append({"text": brand, "type": "brand"})
-                seen.add(brand)
+    kb = _KB
+    texts, types, scores = kb.prefix_texts, kb.prefix_types, kb.prefix_scores
+
+    # 1. Prefix matches — every entry in [lo, hi) starts with `prefix`
+    lo = bisect_left(texts, prefix)
+    hi = bisect_left(texts, prefix + "\uffff", lo)
+    ranked = heapq.nsmallest(
+        limit, range(lo, hi),
+        key=lambda i: (-scores[i], types[i] != "category", texts[i]),
+    )
+    suggestions = [{"text": texts[i], "type": types[i]} for i in ranked]
+
+    # 2. Fuzzy fallback if not enough results and the prefix is long enough
+    if len(suggestions) < limit and len(prefix) >= AUTOCOMPLETE_FUZZY_MIN_PREFIX:
+        seen = {texts[i] for i in ranked}
+        for text, score, i in process.extract(prefix, texts, scorer=fuzz.partial_ratio, limit=limit * 2):
+            if score >= 60 and text not in seen:
+                suggestions.append({"text": text, "type": types[i]})
+                seen.add(text)
+                if len(suggestions) >= limit:
+                    break
 
     return suggestions[:limit]
 
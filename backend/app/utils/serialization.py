@@ -0,0 +1,211 @@
+"""
+Fast JSON encoding for large list responses.
+
+FastAPI's default path runs every result through jsonable_encoder and then
+json.dumps — a Python-level walk over each nested value. List endpoints instead
+encode results once with orjson when a page is built and cache the bytes, so a
+cache hit is served without any re-encoding.
+
+Cached payloads are optionally compressed (settings.CACHE_COMPRESSION: gzip,
+zstd or none). Compressed bytes are passed straight through with a
+Content-Encoding header when the client accepts that coding, and only
+decompressed for clients that don't.
+
+Every cached payload carries a content version, served as a strong ETag, so a
+matching If-None-Match is answered with 304 straight from the cache — with or
+without settings.FAST_JSON.
+"""
+
+import gzip
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback keeps the app working without orjson
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+_GZIP_LEVEL = 6
+_ZSTD_LEVEL = 3
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)  # ObjectId and friends
+
+
+def dumps(obj) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+# ---------------------------------------------------------------------------
+# Compression
+# ---------------------------------------------------------------------------
+
+def _cache_coding() -> Optional[str]:
+    coding = settings.CACHE_COMPRESSION.lower()
+    if coding == "zstd" and zstandard is None:
+        return "gzip"
+    return coding if coding in ("gzip", "zstd") else None
+
+
+def compress(data: bytes, coding: Optional[str]) -> bytes:
+    if coding == "gzip":
+        # mtime=0 keeps the output deterministic for identical payloads
+        return gzip.compress(data, compresslevel=_GZIP_LEVEL, mtime=0)
+    if coding == "zstd":
+        return zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(data)
+    return data
+
+
+def decompress(data: bytes, coding: Optional[str]) -> bytes:
+    if coding == "gzip":
+        return gzip.decompress(data)
+    if coding == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+def accepts_encoding(accept_encoding: str, coding: str) -> bool:
+    """True when an Accept-Encoding header allows `coding` (q=0 refuses it)."""
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip() in (coding, "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+# ---------------------------------------------------------------------------
+# Cached payloads
+# ---------------------------------------------------------------------------
+
+def encode_payload(obj) -> dict:
+    """Cache entry for a response body: (compressed) JSON bytes plus a content
+    version used as the ETag."""
+    raw = dumps(obj)
+    coding = _cache_coding()
+    return {
+        "encoded": compress(raw, coding),
+        "encoding": coding,
+        "raw_size": len(raw),
+        "version": hashlib.blake2b(raw, digest_size=10).hexdigest(),
+    }
+
+
+def decode_payload(entry: dict):
+    return loads(decompress(entry["encoded"], entry["encoding"]))
+
+
+def encode_page(page: dict) -> dict:
+    """Turn a {"results", "next_cursor"} page into its cache entry: the results
+    as an encoded payload, without the per-product dicts."""
+    return {**encode_payload(page["results"]), "next_cursor": page["next_cursor"]}
+
+
+def page_results(page: dict) -> list:
+    """The results list of a page, decoding a cache entry when necessary."""
+    if "results" in page:
+        return page["results"]
+    return decode_payload(page)
+
+
+def batch_body(pages: list) -> bytes:
+    """{"results": [{"query", "next_cursor", "results"}, ...]} for a batch of
+    pages. Each page's cached JSON bytes are spliced in as they are instead of
+    being decoded and re-encoded."""
+    parts = []
+    for page in pages:
+        raw = decompress(page["encoded"], page["encoding"]) if "encoded" in page else dumps(page["results"])
+        part = b'{"query":' + dumps(page["query"]) + b',"next_cursor":' + dumps(page["next_cursor"])
+        if page.get("error"):
+            part += b',"error":' + dumps(page["error"])
+        parts.append(part + b',"results":' + raw + b"}")
+    return b'{"results":[' + b",".join(parts) + b"]}"
+
+
+def page_body(page: dict, accept_encoding: str = "") -> tuple[bytes, Optional[str]]:
+    """(body bytes, Content-Encoding) for a page — cached compressed bytes go
+    out untouched when the client accepts their coding."""
+    if "encoded" not in page:
+        return dumps(page["results"]), None
+    coding = page["encoding"]
+    if coding is None or accepts_encoding(accept_encoding, coding):
+        return page["encoded"], coding
+    return decompress(page["encoded"], coding), None
+
+
+def _etag(version: str, coding: Optional[str]) -> str:
+    # Each content-coding is a different representation, so it gets its own tag
+    return f'"{version}-{coding}"' if coding else f'"{version}"'
+
+
+def _etag_matches(if_none_match: str, version: str) -> bool:
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        tag = tag.removeprefix("W/").strip('"')
+        if tag.partition("-")[0] == version:
+            return True
+    return False
+
+
+def _not_modified(request: Request, version: Optional[str], etag: str, headers: dict) -> Optional[Response]:
+    """304 when If-None-Match names `version`, else None."""
+    if version and _etag_matches(request.headers.get("if-none-match", ""), version):
+        return Response(status_code=304, headers={**headers, "ETag": etag})
+    return None
+
+
+def payload_response(request: Request, entry: dict, headers: Optional[dict] = None) -> Response:
+    """JSON Response for an encoded payload (or uncached page) with ETag and
+    Content-Encoding passthrough; 304 when If-None-Match names its version."""
+    headers = {"Vary": "Accept-Encoding", **(headers or {})}
+    version = entry.get("version")
+    not_modified = _not_modified(request, version, _etag(version, entry.get("encoding")), headers)
+    if not_modified is not None:
+        return not_modified
+
+    content, coding = page_body(entry, request.headers.get("accept-encoding", ""))
+    if coding:
+        headers["Content-Encoding"] = coding
+    if version:
+        headers["ETag"] = _etag(version, coding)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def page_response(request: Request, response: Response, page: dict, headers: Optional[dict] = None):
+    """Body of a list endpoint for a page. With FAST_JSON the page's cached bytes
+    go out as they are (payload_response); otherwise the results list is returned
+    for FastAPI to encode, with `headers` and the ETag set on `response`. Either
+    way a matching If-None-Match gets a 304."""
+    if settings.FAST_JSON:
+        return payload_response(request, page, headers)
+    headers = headers or {}
+    version = page.get("version")
+    not_modified = _not_modified(request, version, _etag(version, None), headers)
+    if not_modified is not None:
+        return not_modified
+    response.headers.update(headers)
+    if version:
+        response.headers["ETag"] = _etag(version, None)
+    return page_results(page)
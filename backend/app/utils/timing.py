@@ -0,0 +1,223 @@
+"""
+Per-request stage timing, rolling latency histograms and sampled ES profiling.
+
+Search code marks where its time goes with `stage(name)` (parse, cache, es,
+es-fallback, map, analytics, encode) and reports Elasticsearch's own "took"
+with `add("es-took", ms)`. TimingMiddleware (app.middleware) gives every
+request a fresh set of timings, writes them to a Server-Timing header —
+"app" is the request time not spent waiting on ES — and folds them into
+rolling histograms per endpoint and per stage, served by GET /admin/latency.
+
+Histograms are per worker: fixed latency buckets over a window of time slices,
+so old traffic ages out without keeping individual samples.
+
+With settings.ES_PROFILE_SAMPLE_RATE > 0, that fraction of primary searches
+run with `profile: true`; summaries of the most recent profiles are kept for
+GET /admin/es-profiles.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from app.config import settings
+
+# Upper bounds of the latency buckets, milliseconds (last bucket is open-ended)
+_BOUNDS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Rolling window: _WINDOW_SLICES slices of _SLICE_SECONDS each (5 minutes)
+_SLICE_SECONDS = 30
+_WINDOW_SLICES = 10
+
+# Stages that are time spent waiting on Elasticsearch
+_ES_STAGES = ("es", "es-fallback")
+
+# ES profile summaries kept for the admin endpoint
+_PROFILE_KEEP = 50
+# Top-level query nodes listed per shard in a profile summary
+_PROFILE_TOP_QUERIES = 5
+
+# Stage timings of the current request (None outside a request). The dict is
+# shared by reference with threads started via asyncio.to_thread.
+_TIMINGS: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+# ---------------------------------------------------------------------------
+# Stage timing
+# ---------------------------------------------------------------------------
+
+def begin_request() -> tuple[Dict[str, float], object]:
+    """Start collecting timings for a request. Returns (timings, reset token)."""
+    timings: Dict[str, float] = {}
+    return timings, _TIMINGS.set(timings)
+
+
+def end_request(token) -> None:
+    _TIMINGS.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Add the time spent in the block to stage `name` of the current request.
+    A no-op outside a request (background jobs, startup)."""
+    timings = _TIMINGS.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def add(name: str, ms: float) -> None:
+    """Add an externally measured duration (e.g. ES "took") to the current request."""
+    timings = _TIMINGS.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + ms
+
+
+def server_timing(timings: Dict[str, float], total_ms: float) -> str:
+    """Server-Timing header value: each stage, "app" (total minus ES wait) and total."""
+    es_ms = sum(timings.get(s, 0.0) for s in _ES_STAGES)
+    metrics = [*timings.items(), ("app", max(total_ms - es_ms, 0.0)), ("total", total_ms)]
+    return ", ".join(f"{name};dur={ms:.2f}" for name, ms in metrics)
+
+
+# ---------------------------------------------------------------------------
+# Rolling latency histograms
+# ---------------------------------------------------------------------------
+
+class LatencyHistogram:
+    """Bucketed latencies over a rolling window of time slices."""
+
+    def __init__(self) -> None:
+        # slice number → [count per bucket..., sum of ms]
+        self._slices: Dict[int, list] = {}
+
+    def _expire(self, current: int) -> None:
+        for old in [s for s in self._slices if s <= current - _WINDOW_SLICES]:
+            del self._slices[old]
+
+    def record(self, ms: float, now: float) -> None:
+        current = int(now // _SLICE_SECONDS)
+        self._expire(current)
+        counts = self._slices.get(current)
+        if counts is None:
+            counts = self._slices[current] = [0] * (len(_BOUNDS_MS) + 2)
+        bucket = next((i for i, bound in enumerate(_BOUNDS_MS) if ms <= bound), len(_BOUNDS_MS))
+        counts[bucket] += 1
+        counts[-1] += ms
+
+    def snapshot(self, now: float) -> dict:
+        self._expire(int(now // _SLICE_SECONDS))
+        merged = [0] * (len(_BOUNDS_MS) + 2)
+        for counts in self._slices.values():
+            merged = [a + b for a, b in zip(merged, counts)]
+        buckets, total_ms = merged[:-1], merged[-1]
+        count = sum(buckets)
+        labels = [f"le_{bound}ms" for bound in _BOUNDS_MS] + [f"gt_{_BOUNDS_MS[-1]}ms"]
+        return {
+            "count": count,
+            "mean_ms": round(total_ms / count, 2) if count else None,
+            "p50_ms": _percentile(buckets, count, 0.50),
+            "p95_ms": _percentile(buckets, count, 0.95),
+            "p99_ms": _percentile(buckets, count, 0.99),
+            "buckets": {label: n for label, n in zip(labels, buckets) if n},
+        }
+
+
+def _percentile(buckets: list, count: int, q: float) -> Optional[float]:
+    """Upper bound of the bucket holding the q-th percentile (None if empty;
+    the open-ended last bucket reports its lower bound)."""
+    if not count:
+        return None
+    seen = 0
+    for bound, n in zip(_BOUNDS_MS, buckets):
+        seen += n
+        if seen >= q * count:
+            return bound
+    return _BOUNDS_MS[-1]
+
+
+_HISTOGRAMS: Dict[str, Dict[str, LatencyHistogram]] = {"endpoints": {}, "stages": {}}
+_HISTOGRAMS_LOCK = threading.Lock()
+
+
+def record_request(endpoint: str, timings: Dict[str, float], total_ms: float) -> None:
+    """Fold one finished request into the endpoint and stage histograms."""
+    now = time.time()
+    with _HISTOGRAMS_LOCK:
+        for group, name, ms in [
+            ("endpoints", endpoint, total_ms),
+            *(("stages", name, ms) for name, ms in timings.items()),
+        ]:
+            histogram = _HISTOGRAMS[group].get(name)
+            if histogram is None:
+                histogram = _HISTOGRAMS[group][name] = LatencyHistogram()
+            histogram.record(ms, now)
+
+
+def latency_stats() -> dict:
+    """Rolling histograms of this worker: {"window_seconds", "endpoints", "stages"}."""
+    now = time.time()
+    with _HISTOGRAMS_LOCK:
+        return {
+            "window_seconds": _SLICE_SECONDS * _WINDOW_SLICES,
+            **{
+                group: {name: h.snapshot(now) for name, h in sorted(histograms.items())}
+                for group, histograms in _HISTOGRAMS.items()
+            },
+        }
+
+
+# ---------------------------------------------------------------------------
+# ES profile sampling
+# ---------------------------------------------------------------------------
+_PROFILES: deque = deque(maxlen=_PROFILE_KEEP)
+
+
+def maybe_profile(body: dict) -> dict:
+    """`body`, or a copy with ES profiling on for a sampled fraction of searches."""
+    rate = settings.ES_PROFILE_SAMPLE_RATE
+    if rate > 0 and random.random() < rate:
+        return {**body, "profile": True}
+    return body
+
+
+def _nanos_ms(nodes: list) -> float:
+    return round(sum(n.get("time_in_nanos", 0) for n in nodes) / 1e6, 3)
+
+
+def record_profile(query: str, res: dict) -> None:
+    """Keep a summary of a profiled search response (no-op without a profile)."""
+    profile = res.get("profile")
+    if not profile:
+        return
+    shards = []
+    for shard in profile.get("shards", []):
+        searches = shard.get("searches", [])
+        queries = [q for s in searches for q in s.get("query", [])]
+        shards.append({
+            "id": shard.get("id"),
+            "query_ms": _nanos_ms(queries),
+            "rewrite_ms": round(sum(s.get("rewrite_time", 0) for s in searches) / 1e6, 3),
+            "collector_ms": _nanos_ms([c for s in searches for c in s.get("collector", [])]),
+            "aggregations_ms": _nanos_ms(shard.get("aggregations", [])),
+            "top_queries": [
+                {"type": q.get("type"), "description": q.get("description", "")[:200],
+                 "ms": round(q.get("time_in_nanos", 0) / 1e6, 3)}
+                for q in sorted(queries, key=lambda q: -q.get("time_in_nanos", 0))[:_PROFILE_TOP_QUERIES]
+            ],
+        })
+    _PROFILES.append({"query": query, "at": time.time(), "took_ms": res.get("took"), "shards": shards})
+
+
+def recent_profiles(limit: int = _PROFILE_KEEP) -> list:
+    """Most recent profile summaries first."""
+    return list(_PROFILES)[::-1][:limit]
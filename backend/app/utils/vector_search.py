@@ -9,6 +9,9 @@ import numpy as np
 if not hasattr(np, 'float_'):
     np.float_ = np.float64
 from typing import List, Dict, Any
+from app.utils.log import get_logger
+
+logger = get_logger(__name__)
 
 # Load model once (cached)
 _model = None
@@ -16,9 +19,9 @@ _model = None
 def get_model():
     global _model
     if _model is None:
-        print("Loading Sentence Transformer model...")
+        logger.info("Loading Sentence Transformer model...")
         _model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("Model loaded successfully!")
+        logger.info("Model loaded successfully!")
     return _model
 
 def generate_embedding(text: str) -> List[float]:
@@ -0,0 +1,94 @@
+"""
+Benchmark: product-hint autocomplete latency against a live Elasticsearch.
+
+Compares the old query shape (match_phrase_prefix + prefix on the main index,
+sorted by rating) with the completion suggester on the dedicated suggest index.
+
+Target: completion-suggester lookups should stay under 10 ms p95 (ES "took")
+and under 25 ms p95 round trip from this process, so /search/autocomplete
+comfortably meets its < 100 ms per-keystroke budget.
+
+Run from the backend directory with ES seeded (python seed_fast.py):
+    python benchmarks/bench_autocomplete.py [rounds]
+"""
+
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db import es_client, settings
+
+TARGET_TOOK_P95_MS = 10
+TARGET_ROUND_TRIP_P95_MS = 25
+
+# Every prefix of a few typical queries, as typed keystroke by keystroke
+PREFIXES = [q[:i] for q in ("nike running", "samsung galaxy", "wireless earbuds", "levis jeans")
+            for i in range(1, len(q) + 1)]
+LIMIT = 6
+
+
+def _old_body(prefix: str) -> dict:
+    return {
+        "size": LIMIT,
+        "query": {
+            "bool": {
+                "should": [
+                    {"match_phrase_prefix": {"name": {"query": prefix, "max_expansions": 10}}},
+                    {"prefix": {"brand": {"value": prefix}}},
+                ]
+            }
+        },
+        "_source": ["name", "brand", "category", "price", "image_url"],
+        "sort": [{"rating": {"order": "desc", "missing": 0}}],
+    }
+
+
+def _suggest_body(prefix: str) -> dict:
+    return {
+        "_source": ["name", "brand", "category", "price", "image_url"],
+        "suggest": {
+            "products": {
+                "prefix": prefix,
+                "completion": {"field": "suggest", "size": LIMIT, "skip_duplicates": True},
+            }
+        },
+    }
+
+
+def _measure(index: str, body_fn, rounds: int) -> tuple[list, list]:
+    took, round_trip = [], []
+    for _ in range(rounds):
+        for prefix in PREFIXES:
+            start = time.perf_counter()
+            res = es_client.search(index=index, body=body_fn(prefix), request_cache=False)
+            round_trip.append((time.perf_counter() - start) * 1000)
+            took.append(res["took"])
+    return took, round_trip
+
+
+def _p95(samples: list) -> float:
+    samples = sorted(samples)
+    return samples[int(len(samples) * 0.95) - 1]
+
+
+def _report(label: str, took: list, round_trip: list) -> None:
+    print(f"{label:<26} took p50 {statistics.median(took):5.1f} ms  p95 {_p95(took):5.1f} ms   "
+          f"round trip p50 {statistics.median(round_trip):5.1f} ms  p95 {_p95(round_trip):5.1f} ms")
+
+
+def run(rounds: int = 10) -> None:
+    print(f"{len(PREFIXES)} prefixes x {rounds} rounds, limit={LIMIT}\n")
+    _report("match_phrase_prefix", *_measure(settings.ES_INDEX, _old_body, rounds))
+    took, round_trip = _measure(settings.ES_SUGGEST_INDEX, _suggest_body, rounds)
+    _report("completion suggester", took, round_trip)
+
+    ok = _p95(took) <= TARGET_TOOK_P95_MS and _p95(round_trip) <= TARGET_ROUND_TRIP_P95_MS
+    print(f"\nTarget: took p95 <= {TARGET_TOOK_P95_MS} ms, round trip p95 <= "
+          f"{TARGET_ROUND_TRIP_P95_MS} ms -> {'MET' if ok else 'MISSED'}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,78 @@
+"""
+Benchmark: encoding a 200-item card-view result list.
+
+Compares FastAPI's default response path (jsonable_encoder + JSONResponse's
+json.dumps) with orjson, and with the pre-encoded bytes cached alongside a
+page (what a cache hit costs with FAST_JSON on).
+
+Run from the backend directory:
+    python benchmarks/bench_json_encoding.py [rounds]
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.utils.serialization import dumps, encode_page
+
+ITEMS = 200
+
+
+def _product(i: int) -> dict:
+    rating_count = random.randint(0, 40)
+    return {
+        "id": f"{i:024x}",
+        "name": f"Product {i} running shoes",
+        "brand": random.choice(["nike", "adidas", "puma", "samsung", "boat"]),
+        "category": random.choice(["shoes", "phone", "earbuds", "jacket"]),
+        "price": round(random.uniform(199, 90000), 2),
+        "image_url": f"https://images.example.com/{i}.jpg",
+        "color": random.choice(["red", "black", "blue", None]),
+        "gender": random.choice(["men", "women", "unisex"]),
+        "rating": round(random.uniform(1, 5), 2),
+        "rating_avg": round(random.uniform(1, 5), 2),
+        "rating_count": rating_count,
+        "discount": random.randint(0, 60),
+        "stock": random.randint(0, 300),
+        "created_at": datetime.utcnow() - timedelta(days=random.randint(0, 365)),
+        "isNew": random.random() < 0.1,
+        "isSale": random.random() < 0.3,
+    }
+
+
+def _time(fn, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<38} mean {statistics.mean(samples):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+def run(rounds: int = 200) -> None:
+    results = [_product(i) for i in range(ITEMS)]
+    page = encode_page({"results": results, "next_cursor": None})
+    print(f"{ITEMS} items, {len(page['encoded']) / 1024:.1f} KB encoded, {rounds} rounds\n")
+
+    _report("jsonable_encoder + JSONResponse", _time(
+        lambda: JSONResponse(content=jsonable_encoder(results)).body, rounds))
+    _report("orjson (cache miss)", _time(lambda: dumps(results), rounds))
+    _report("pre-encoded bytes (cache hit)", _time(lambda: page.get("encoded"), rounds))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
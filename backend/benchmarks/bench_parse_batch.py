@@ -0,0 +1,61 @@
+"""
+Benchmark: parse_query one string at a time vs parse_queries over the same
+batch (nlp.pipe + shared fuzzy scoring), e.g. for re-parsing search_logs.
+
+Checks both give identical results, then reports queries per second.
+
+Run from the backend directory:
+    python benchmarks/bench_parse_batch.py [n_queries] [n_process]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import query_parser
+
+BASE_QUERIES = [
+    "red nike shoes for men under 3000",
+    "sheos for men",
+    "earbuds below ₹500",
+    "smartphone under Rs 15000",
+    "blue laptop for women between 40000 and 80000",
+    "suggest me some good watches",
+    "cheapest adidas shoes",
+    "best rated samsung phones",
+    "50% off jackets",
+    "latest earphones on sale",
+    "samusng phone",
+    "boat earphones in stock",
+]
+
+
+def _queries(n: int) -> list[str]:
+    """n queries with realistic repetition (logs repeat heads a lot) plus a
+    varying price so not every string is a duplicate."""
+    return [f"{BASE_QUERIES[i % len(BASE_QUERIES)]} {'under ' + str(500 + i % 97 * 100) if i % 3 else ''}".strip()
+            for i in range(n)]
+
+
+def run(n: int = 10000, n_process: int = 1) -> None:
+    queries = _queries(n)
+
+    start = time.perf_counter()
+    single = [query_parser.parse_query(q) for q in queries]
+    single_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = query_parser.parse_queries(queries, n_process=n_process)
+    batch_s = time.perf_counter() - start
+
+    same = sum(a == b for a, b in zip(single, batched))
+    print(f"{n} queries: {same}/{n} identical")
+    print(f"parse_query loop   {single_s:7.2f} s   {n / single_s:9.0f} q/s")
+    print(f"parse_queries      {batch_s:7.2f} s   {n / batch_s:9.0f} q/s   (n_process={n_process})")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1)
@@ -0,0 +1,236 @@
+"""
+Benchmark: parse_query as it was (full en_core_web_sm pipeline, one nlp() call
+per category per token, every category re-lemmatised on each entity update)
+vs the current parser (minimal pipeline — tok2vec + tagger + attribute_ruler +
+lemmatizer, parser and NER excluded — with a precomputed lemma index).
+
+The "before" side is a port of the old code (_legacy_parse_query,
+_legacy_lemmatize_list); the regex stage comes from bench_query_regex.
+
+Run from the backend directory:
+    python benchmarks/bench_query_parser.py [rounds]
+"""
+
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import spacy
+from rapidfuzz import process, fuzz
+
+from app.utils import query_parser
+from bench_query_regex import _legacy_regex_stage
+
+QUERIES = [
+    "red nike shoes for men under 3000",
+    "sheos for men",
+    "earbuds below ₹500",
+    "smartphone under Rs 15000",
+    "blue laptop for women between 40000 and 80000",
+    "suggest me some good watches",
+    "cheapest adidas shoes",
+    "best rated samsung phones",
+    "50% off jackets",
+    "latest earphones on sale",
+    "samusng phone",
+    "boat earphones in stock",
+    "head smartphone",
+    "watche watches",
+]
+
+
+# ---------------------------------------------------------------------------
+# The parser as it was before the lemma index (ported, not imported)
+# ---------------------------------------------------------------------------
+
+_LEGACY_GENDER_MAP = {
+    "man": "men", "male": "men",
+    "woman": "women", "female": "women",
+    "child": "kids", "children": "kids",
+    "boys": "men", "girls": "women",
+}
+
+
+def _legacy_lemmatize_list(nlp, word_list):
+    return list(set(token.lemma_ for token in nlp(" ".join(word_list))))
+
+
+def _legacy_fuzzy_match(token, choices, threshold=72):
+    if not choices or not token:
+        return None
+    result = process.extractOne(token, choices, scorer=fuzz.ratio)
+    if result and result[1] >= threshold:
+        return result[0]
+    return None
+
+
+def _legacy_resolve_synonym(token, synonym_map):
+    for field in ("categories", "brands"):
+        for key, synonyms in synonym_map.get(field, {}).items():
+            if token in synonyms:
+                return key
+    return token
+
+
+def _legacy_did_you_mean(original_query, brands, raw_categories):
+    corrections = []
+    for token in original_query.lower().split():
+        if len(token) < 3:
+            continue
+        suggestion = _legacy_fuzzy_match(token, brands, threshold=60)
+        if not suggestion or suggestion == token:
+            suggestion = _legacy_fuzzy_match(token, raw_categories, threshold=60)
+        if suggestion and suggestion.lower() != token.lower():
+            corrections.append((token, suggestion))
+    if not corrections:
+        return None
+    result = original_query
+    for original, corrected in corrections:
+        result = re.sub(re.escape(original), corrected, result, flags=re.IGNORECASE)
+    return result if result.lower() != original_query.lower() else None
+
+
+def _legacy_parse_query(query, nlp, brands, raw_categories, categories, synonym_map):
+    """parse_query before the lemma index: every category is run through
+    nlp() again for each token that might be a category."""
+    raw_query = query.lower().strip()
+    intents, query = _legacy_regex_stage(raw_query)
+    result = {
+        "keywords": [], "category": None, "brand": None, "color": None, "gender": None,
+        "price_min": intents["price_min"], "price_max": intents["price_max"],
+        "sort_by": intents["sort_by"], "is_sale": intents["is_sale"],
+        "in_stock": intents["in_stock"], "min_discount": intents["min_discount"],
+        "did_you_mean": None,
+    }
+    colors, genders, stop_words = query_parser.COLORS, query_parser.GENDERS, query_parser.STOP_WORDS
+
+    for token in nlp(query):
+        raw = token.text.lower()
+        lemma = token.lemma_.lower()
+        if token.is_punct or token.like_num or raw in stop_words or token.is_space:
+            continue
+        norm = _legacy_resolve_synonym(raw, synonym_map)
+        norm_lemma = _legacy_resolve_synonym(lemma, synonym_map)
+
+        if result["color"] is None:
+            if norm in colors or norm_lemma in colors:
+                result["color"] = norm if norm in colors else norm_lemma
+                continue
+            col = _legacy_fuzzy_match(norm, colors, threshold=85)
+            if col:
+                result["color"] = col
+                continue
+
+        if result["gender"] is None and (norm in genders or norm_lemma in genders):
+            g = norm if norm in genders else norm_lemma
+            result["gender"] = _LEGACY_GENDER_MAP.get(g, g)
+            continue
+
+        if result["category"] is None:
+            if norm in raw_categories:
+                result["category"] = norm
+                continue
+            if norm_lemma in raw_categories:
+                result["category"] = norm_lemma
+                continue
+            cat_lemma = nlp(norm)[0].lemma_
+            matched = next((c for c in raw_categories if nlp(c)[0].lemma_ == cat_lemma), None)
+            if matched:
+                result["category"] = matched
+                continue
+
+        if result["brand"] is None and norm in brands:
+            result["brand"] = norm
+            continue
+
+        if result["category"] is None and result["brand"] is None:
+            cat_lemma = nlp(norm)[0].lemma_
+            fuzzy_cat_lemma = _legacy_fuzzy_match(cat_lemma, categories, threshold=80)
+            if fuzzy_cat_lemma:
+                matched = next((c for c in raw_categories if nlp(c)[0].lemma_ == fuzzy_cat_lemma), None)
+                if matched:
+                    result["category"] = matched
+                    continue
+
+        if result["brand"] is None:
+            br = _legacy_fuzzy_match(norm, brands, threshold=72)
+            if br:
+                result["brand"] = br
+                continue
+
+        if len(raw) > 1 and not token.is_stop:
+            result["keywords"].append(lemma if lemma else raw)
+
+    resolved = {result["category"], result["brand"], result["color"], result["gender"]} - {None}
+    result["keywords"] = [
+        kw for kw in dict.fromkeys(result["keywords"]) if kw not in resolved and kw not in stop_words
+    ]
+    result["did_you_mean"] = _legacy_did_you_mean(raw_query, brands, raw_categories)
+    return result
+
+
+def _time_per_query(fn, rounds: int) -> list[float]:
+    """Return per-query latencies in milliseconds over `rounds` passes."""
+    samples = []
+    for _ in range(rounds):
+        for q in QUERIES:
+            start = time.perf_counter()
+            fn(q)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<34} mean {statistics.mean(samples):7.3f} ms   "
+          f"median {statistics.median(samples):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+def run(rounds: int = 20) -> None:
+    full_nlp = spacy.load("en_core_web_sm")
+    minimal_nlp = query_parser.nlp
+    print(f"Full pipeline    : {full_nlp.pipe_names}")
+    print(f"Minimal pipeline : {minimal_nlp.pipe_names}\n")
+
+    # Raw pipeline cost
+    _report("nlp() full", _time_per_query(full_nlp, rounds))
+    _report("nlp() minimal", _time_per_query(minimal_nlp, rounds))
+
+    # End-to-end: the old parser (full pipeline, per-category nlp() loop) vs
+    # parse_query (minimal pipeline, lemma index; lemma cache cleared first)
+    kb = query_parser.current_kb()
+    brands, raw_categories = list(kb.brands), list(kb.raw_categories)
+    synonym_map = {field: dict(entries) for field, entries in kb.synonyms.items()}
+    categories = _legacy_lemmatize_list(full_nlp, raw_categories)
+
+    def legacy(q):
+        return _legacy_parse_query(q, full_nlp, brands, raw_categories, categories, synonym_map)
+
+    same = sum(legacy(q) == query_parser.parse_query(q) for q in QUERIES)
+    print(f"{same}/{len(QUERIES)} queries parse identically\n")
+
+    _report("parse_query (before)", _time_per_query(legacy, rounds))
+    query_parser._lemma.cache_clear()
+    _report("parse_query (now)", _time_per_query(query_parser.parse_query, rounds))
+
+    # Entity refresh: the old update_entities re-lemmatised every category in
+    # one nlp() call over the joined text; now only the new page goes through
+    # nlp.pipe with the minimal pipeline
+    words = raw_categories * 20
+    start = time.perf_counter()
+    _legacy_lemmatize_list(full_nlp, words)
+    legacy_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    query_parser._lemmatize_list(words)
+    piped_ms = (time.perf_counter() - start) * 1000
+    print(f"\nLemmatise {len(words)} categories: before (full pipeline, joined text) {legacy_ms:.1f} ms, "
+          f"now (minimal pipeline, nlp.pipe) {piped_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
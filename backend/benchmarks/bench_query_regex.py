@@ -0,0 +1,147 @@
+"""
+Micro-benchmark: the regex stage of parse_query (multiword synonyms, sort /
+sale / stock / discount / price intents) — one re.search / re.sub per string
+pattern vs the precompiled, combined patterns in query_parser.
+
+Also checks both produce identical results on every benchmark query —
+including multiword synonyms that chain ("head smartphone" -> "earphone") —
+and that did-you-mean applies its corrections exactly as before, repeated
+replacements included ("watche watches" -> "watches watchess").
+
+Run from the backend directory:
+    python benchmarks/bench_query_regex.py [rounds]
+"""
+
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import query_parser as qp
+
+QUERIES = [
+    "red nike shoes for men under 3000",
+    "sheos for men",
+    "earbuds below ₹500",
+    "smartphone under Rs 15000",
+    "blue laptop for women between 40000 and 80000",
+    "suggest me some good watches",
+    "cheapest adidas shoes",
+    "best rated samsung phones",
+    "50% off jackets",
+    "latest earphones on sale",
+    "samusng phone",
+    "boat earphones in stock",
+    "running shoes",
+    "wireless head phones above 2000",
+    "premium smart watch for women",
+    "back pack upto 1500",
+    "flip flops at least 300 available now",
+    "t-shirts most discounted",
+    "formal shirt",
+    "levis jeans 32 waist",
+    "head smartphone",
+    "ear smart phones under 999",
+    "smart watches",
+    "earphones earbuds headphones",
+]
+
+# (query, did-you-mean corrections in token order)
+DID_YOU_MEAN_CASES = [
+    ("samusng phone", [("samusng", "Samsung")]),
+    ("watche watches", [("watche", "watches")]),
+    ("sandal sandals", [("sandal", "sandals")]),
+    ("sandl andals", [("sandl", "sandals"), ("andals", "sandals")]),
+    ("Nikee SHOES", [("nikee", "Nike")]),
+    ("shoes", [("shoes", "Shoes")]),
+]
+
+
+def _legacy_regex_stage(query: str) -> tuple[dict, str]:
+    """The regex stage as it was: every pattern is a string run through re.*"""
+    for pattern, replacement in qp.MULTIWORD_SYNONYM_PATTERNS:
+        query = re.sub(pattern, replacement, query, flags=re.IGNORECASE)
+    result = {"sort_by": None, "is_sale": False, "in_stock": False,
+              "min_discount": None, "price_min": None, "price_max": None}
+    for sort_key, patterns in qp.SORT_INTENT_PATTERNS.items():
+        m = next((m for m in (re.search(p, query, re.IGNORECASE) for p in patterns) if m), None)
+        if m:
+            result["sort_by"] = sort_key
+            query = (query[: m.start()].rstrip() + " " + query[m.end():].lstrip()).strip()
+            break
+    if re.search(qp.SALE_PATTERN, query, re.IGNORECASE):
+        result["is_sale"] = True
+    if re.search(qp.STOCK_PATTERN, query, re.IGNORECASE):
+        result["in_stock"] = True
+    disc_match = re.search(qp.DISCOUNT_PATTERN, query, re.IGNORECASE)
+    if disc_match:
+        result["min_discount"] = int(disc_match.group(1))
+        query = query[: disc_match.start()] + query[disc_match.end():]
+    for pattern, op in qp.PRICE_PATTERNS:
+        m = re.search(pattern, query)
+        if m:
+            if op == "between":
+                result["price_min"], result["price_max"] = int(m.group(1)), int(m.group(2))
+            elif op in ("<", "<="):
+                result["price_max"] = int(m.group(1))
+            else:
+                result["price_min"] = int(m.group(1))
+            query = query[: m.start()] + query[m.end():]
+            break
+    return result, query
+
+
+def _legacy_corrections(original_query: str, corrections: list) -> str | None:
+    result = original_query
+    for original, corrected in corrections:
+        result = re.sub(re.escape(original), corrected, result, flags=re.IGNORECASE)
+    return result if result.lower() != original_query.lower() else None
+
+
+def _compiled_regex_stage(query: str) -> tuple[dict, str]:
+    result = {"sort_by": None, "is_sale": False, "in_stock": False,
+              "min_discount": None, "price_min": None, "price_max": None}
+    query = qp._extract_intents(qp._apply_multiword_synonyms(query), result)
+    return result, query
+
+
+def _time_per_query(fn, rounds: int) -> list[float]:
+    """Per-query latencies in microseconds over `rounds` passes."""
+    samples = []
+    for _ in range(rounds):
+        for q in QUERIES:
+            start = time.perf_counter()
+            fn(q.lower())
+            samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<28} mean {statistics.mean(samples):7.2f} us   "
+          f"median {statistics.median(samples):7.2f} us   p95 {p95:7.2f} us")
+
+
+def run(rounds: int = 500) -> None:
+    mismatches = [q for q in QUERIES if _legacy_regex_stage(q.lower()) != _compiled_regex_stage(q.lower())]
+    for q in mismatches:
+        print(f"MISMATCH {q!r}: {_legacy_regex_stage(q.lower())} != {_compiled_regex_stage(q.lower())}")
+    print(f"{len(QUERIES) - len(mismatches)}/{len(QUERIES)} queries identical")
+    dym_mismatches = [
+        (q, c) for q, c in DID_YOU_MEAN_CASES if _legacy_corrections(q, c) != qp._apply_corrections(q, c)
+    ]
+    for q, c in dym_mismatches:
+        print(f"MISMATCH did-you-mean {q!r}: {_legacy_corrections(q, c)!r} != {qp._apply_corrections(q, c)!r}")
+    print(f"{len(DID_YOU_MEAN_CASES) - len(dym_mismatches)}/{len(DID_YOU_MEAN_CASES)} "
+          f"did-you-mean cases identical\n")
+
+    _report("string patterns (re.*)", _time_per_query(_legacy_regex_stage, rounds))
+    _report("precompiled + combined", _time_per_query(_compiled_regex_stage, rounds))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -13,6 +13,11 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.routes import product_routes, analytics_routes, recommendation_routes
 from app.routes import admin_routes
 from app.db import init_es_index
+from app.config import settings
+from app.middleware import CompressionMiddleware, TimingMiddleware
+from app.utils.log import get_logger
+
+logger = get_logger("main")
 
 # ---------------------------------------------------------------------------
 # App definition
@@ -30,8 +35,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the pagination cursor
+    expose_headers=[product_routes.NEXT_CURSOR_HEADER, "ETag", "Server-Timing"],
 )
 
+# gzip / brotli for large JSON bodies (cached payloads arrive pre-compressed)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# Outermost: per-stage Server-Timing header + latency histograms (/admin/latency)
+app.add_middleware(TimingMiddleware, header=settings.SERVER_TIMING)
+
 # ---------------------------------------------------------------------------
 # NLP readiness flag
 # Prevents half-initialised NLP state from being used during cold-start
@@ -39,43 +52,59 @@ app.add_middleware(
 _nlp_ready = False
 
 
-async def _load_nlp_data():
-    """Load brand/category entities from ES into the NLP parser. Sets the
-    readiness flag so route handlers know it's safe to use parse_query()."""
+def _mark_nlp_ready():
     global _nlp_ready
-    print("Startup: Loading NLP Knowledge Base...")
+    _nlp_ready = True
+    # Inject the flag into the product routes module
+    product_routes.set_nlp_ready(True)
+
+
+def _load_nlp_snapshot() -> bool:
+    """Install the last compiled knowledge base from disk (milliseconds), so a
+    fresh worker serves NLP search before the databases have been read."""
+    from app.utils.query_parser import load_snapshot
+    start = time.perf_counter()
+    if not load_snapshot():
+        logger.info("Startup: No NLP snapshot — building knowledge base from the databases")
+        return False
+    _mark_nlp_ready()
+    logger.info("Startup: NLP snapshot loaded in %.1f ms — NLP is ready", (time.perf_counter() - start) * 1000)
+    return True
+
+
+def _refresh_knowledge_base():
+    """Load synonyms from MongoDB and brand/category entities from ES into the
+    NLP parser and re-save the snapshot (blocking — run off the event loop)."""
     try:
-        from app.db import es_client, settings
-        from app.utils.query_parser import update_entities, load_synonyms_from_db
-
-        # Load synonyms persisted in MongoDB
-        load_synonyms_from_db()
-
-        # Pull brands + categories from Elasticsearch aggregations
-        res = es_client.search(
-            index=settings.ES_INDEX,
-            body={
-                "size": 0,
-                "aggs": {
-                    "unique_brands": {"terms": {"field": "brand", "size": 1000}},
-                    "unique_categories": {"terms": {"field": "category", "size": 100}},
-                },
-            },
-        )
-        brands = [b["key"] for b in res["aggregations"]["unique_brands"]["buckets"]]
-        categories = [c["key"] for c in res["aggregations"]["unique_categories"]["buckets"]]
-
-        if brands or categories:
-            update_entities(new_brands=brands, new_categories=categories)
-            print(f"Startup: NLP loaded - {len(brands)} brands, {len(categories)} categories")
+        from app.services.entity_service import EntityService
+        EntityService.refresh_knowledge_base()
+    except Exception as e:
+        logger.warning("NLP startup load failed: %s", e)
 
+
+async def _load_nlp_data():
+    """Refresh the NLP knowledge base in the background. Sets the readiness
+    flag so route handlers know it's safe to use parse_query() (already set
+    when a snapshot was loaded at startup)."""
+    logger.info("Startup: Refreshing NLP Knowledge Base...")
+    await asyncio.to_thread(_refresh_knowledge_base)
+    if not _nlp_ready:
+        _mark_nlp_ready()
+        logger.info("Startup: NLP is ready")
+
+    # Pre-warm the autocomplete cache for the most-typed prefixes
+    try:
+        from app.services.product_service import ProductService
+        warmed = await asyncio.to_thread(ProductService.prewarm_autocomplete)
+        logger.info("Startup: Autocomplete cache pre-warmed for %d prefixes", warmed)
     except Exception as e:
-        print(f"Warning: NLP startup load failed: {e}")
-    finally:
-        _nlp_ready = True
-        # Inject the flag into the product routes module
-        product_routes.set_nlp_ready(True)
-        print("Startup: NLP is ready")
+        logger.warning("Autocomplete pre-warm failed: %s", e)
+
+    # Keep the head queries precomputed (needs the NLP knowledge base loaded)
+    if settings.MATERIALIZE_ENABLED:
+        from app.services.materialization_service import MaterializationService
+        asyncio.create_task(MaterializationService.run_forever())
+        logger.info("Startup: Query materializer started")
 
 
 # ---------------------------------------------------------------------------
@@ -91,9 +120,9 @@ def _keep_alive_worker(interval_seconds: int = 600):
     while True:
         try:
             resp = _requests.get("http://localhost:8000/health", timeout=10)
-            print(f"[KeepAlive] Heartbeat -> status {resp.status_code}")
+            logger.info("[KeepAlive] Heartbeat -> status %d", resp.status_code)
         except Exception as e:
-            print(f"[KeepAlive] Heartbeat failed (will retry next cycle): {e}")
+            logger.warning("[KeepAlive] Heartbeat failed (will retry next cycle): %s", e)
         time.sleep(interval_seconds)
 
 
@@ -106,13 +135,15 @@ async def startup_event():
     # 1. Ensure ES index exists with correct mapping
     init_es_index()
 
-    # 2. Load NLP data in background (non-blocking — server accepts requests immediately)
+    # 2. NLP-ready immediately from the on-disk snapshot when there is one,
+    #    then refresh from ES/MongoDB in background (non-blocking)
+    _load_nlp_snapshot()
     asyncio.create_task(_load_nlp_data())
 
     # 3. Start keep-alive daemon thread
     ka_thread = threading.Thread(target=_keep_alive_worker, daemon=True)
     ka_thread.start()
-    print("Startup: Keep-alive thread started")
+    logger.info("Startup: Keep-alive thread started")
 
 
 # ---------------------------------------------------------------------------
@@ -144,12 +175,13 @@ def health_check():
 def nlp_status():
     """Detailed NLP engine status — useful for debugging cold-start issues."""
     try:
-        from app.utils.query_parser import BRANDS, RAW_CATEGORIES, SYNONYM_MAP
+        from app.utils.query_parser import current_kb
+        kb = current_kb()
         return {
             "nlp_ready": _nlp_ready,
-            "brand_count": len(BRANDS),
-            "category_count": len(RAW_CATEGORIES),
-            "synonym_groups": {k: len(v) for k, v in SYNONYM_MAP.items()},
+            "brand_count": len(kb.brands),
+            "category_count": len(kb.raw_categories),
+            "synonym_groups": {k: len(v) for k, v in kb.synonyms.items()},
         }
     except Exception as e:
         return {"nlp_ready": _nlp_ready, "error": str(e)}
@@ -3,7 +3,7 @@ from datetime import datetime, timedelta
 import numpy as np
 if not hasattr(np, 'float_'):
     np.float_ = np.float64
-from app.db import product_collection, es_client, settings, init_es_index
+from app.db import product_collection, es_client, settings, init_es_index, suggest_doc, rating_fields
 from bson import ObjectId
 
 RANDOM_COUNT = 700  # additional random products on top of guaranteed ones
@@ -187,7 +187,7 @@ def generate_product(cat_key=None, brand=None, color=None, gender=None, price=No
 
     stock = random.randint(0, 300)
 
-    return {
+    product = {
         "name": name,
         "description": description,
         "category": cat_key,
@@ -201,6 +201,8 @@ def generate_product(cat_key=None, brand=None, color=None, gender=None, price=No
         "userRatings": generate_ratings(),
         "created_at": datetime.utcnow().isoformat(),
     }
+    product.update(rating_fields(product))
+    return product
 
 
 def generate_guaranteed_products():
@@ -298,7 +300,8 @@ def seed():
     product_collection.delete_many({})
     try:
         es_client.indices.delete(index=settings.ES_INDEX, ignore=[400, 404])
-        print(f"Deleted index '{settings.ES_INDEX}'")
+        es_client.indices.delete(index=settings.ES_SUGGEST_INDEX, ignore=[400, 404])
+        print(f"Deleted indices '{settings.ES_INDEX}', '{settings.ES_SUGGEST_INDEX}'")
     except Exception as e:
         print(f"Index delete error: {e}")
 
@@ -326,6 +329,8 @@ def seed():
         bulk_body.append({"index": {"_index": settings.ES_INDEX, "_id": doc_id}})
         es_doc = {k: v for k, v in product.items() if k != "_id"}
         bulk_body.append(es_doc)
+        bulk_body.append({"index": {"_index": settings.ES_SUGGEST_INDEX, "_id": doc_id}})
+        bulk_body.append(suggest_doc(es_doc))
 
     response = es_client.bulk(body=bulk_body)
     errors = response.get("errors", False)
@@ -0,0 +1,126 @@
+"""
+In-process RESP stand-in for testing the Redis cache backend without a Redis
+server. Implements only the commands RespClient / RedisCache send: PING,
+AUTH, SELECT, GET, SET [PX], DEL, SCAN (MATCH / COUNT), SADD, SMEMBERS,
+PTTL and PEXPIRE, with key expiry.
+"""
+
+import fnmatch
+import socketserver
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class RespStandIn:
+    """Threaded RESP server on 127.0.0.1. Use as a context manager; `url` is
+    the redis:// URL to hand to RedisCache."""
+
+    def __init__(self) -> None:
+        # key → (str/bytes value or set of members, expiry epoch or None)
+        self.data: Dict[bytes, Tuple[object, Optional[float]]] = {}
+        self.commands: list = []
+        self._lock = threading.Lock()
+        standin = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                while True:
+                    args = standin._read_command(self.rfile)
+                    if args is None:
+                        return
+                    self.wfile.write(standin._encode(standin.execute(args)))
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        self._server = Server(("127.0.0.1", 0), Handler)
+        self.url = f"redis://127.0.0.1:{self._server.server_address[1]}/0"
+
+    def __enter__(self) -> "RespStandIn":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    # -- protocol ----------------------------------------------------------
+
+    @staticmethod
+    def _read_command(rfile) -> Optional[list]:
+        line = rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(rfile.readline()[1:-2])
+            args.append(rfile.read(length + 2)[:-2])
+        return args
+
+    @classmethod
+    def _encode(cls, reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, Exception):
+            return b"-ERR " + str(reply).encode() + b"\r\n"
+        if isinstance(reply, int):
+            return b":%d\r\n" % reply
+        if isinstance(reply, str):
+            return b"+" + reply.encode() + b"\r\n"
+        if isinstance(reply, bytes):
+            return b"$%d\r\n%s\r\n" % (len(reply), reply)
+        return b"*%d\r\n" % len(reply) + b"".join(cls._encode(r) for r in reply)
+
+    # -- commands ----------------------------------------------------------
+
+    def _live(self, key: bytes):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self.data[key]
+            return None
+        return entry
+
+    def execute(self, args: list):
+        cmd, args = args[0].upper().decode(), args[1:]
+        with self._lock:
+            self.commands.append(cmd)
+            if cmd in ("PING", "AUTH", "SELECT"):
+                return "OK" if cmd != "PING" else "PONG"
+            if cmd == "GET":
+                entry = self._live(args[0])
+                return None if entry is None else entry[0]
+            if cmd == "SET":
+                expires = None
+                if len(args) >= 4 and args[2].upper() == b"PX":
+                    expires = time.time() + int(args[3]) / 1000
+                self.data[args[0]] = (args[1], expires)
+                return "OK"
+            if cmd == "DEL":
+                return sum(1 for key in args if self._live(key) is not None and self.data.pop(key))
+            if cmd == "SCAN":
+                pattern = args[args.index(b"MATCH") + 1].decode() if b"MATCH" in args else "*"
+                keys = [k for k in list(self.data) if self._live(k) and fnmatch.fnmatchcase(k.decode(), pattern)]
+                return [b"0", keys]
+            if cmd == "SADD":
+                entry = self._live(args[0])
+                members, expires = entry if entry else (set(), None)
+                added = len(set(args[1:]) - members)
+                self.data[args[0]] = (members | set(args[1:]), expires)
+                return added
+            if cmd == "SMEMBERS":
+                entry = self._live(args[0])
+                return sorted(entry[0]) if entry else []
+            if cmd == "PTTL":
+                entry = self._live(args[0])
+                if entry is None:
+                    return -2
+                return -1 if entry[1] is None else int((entry[1] - time.time()) * 1000)
+            if cmd == "PEXPIRE":
+                entry = self._live(args[0])
+                if entry is None:
+                    return 0
+                self.data[args[0]] = (entry[0], time.time() + int(args[1]) / 1000)
+                return 1
+            return ValueError(f"unknown command '{cmd}'")
@@ -0,0 +1,53 @@
+"""ETag / If-None-Match on list endpoints, with and without FAST_JSON."""
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.utils.serialization import encode_page, page_response
+
+PAGE = {"results": [{"id": "1", "name": "Red shoes"}], "next_cursor": "abc"}
+
+
+def _client(page: dict) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items")
+    async def items(request: Request, response: Response):
+        return page_response(request, response, page, {"X-Next-Cursor": page["next_cursor"]})
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("fast_json", [False, True])
+def test_matching_if_none_match_gets_304(monkeypatch, fast_json):
+    monkeypatch.setattr(settings, "FAST_JSON", fast_json)
+    monkeypatch.setattr(settings, "CACHE_COMPRESSION", "none")
+    client = _client(encode_page(PAGE))
+
+    first = client.get("/items")
+    assert first.status_code == 200
+    assert first.json() == PAGE["results"]
+    assert first.headers["X-Next-Cursor"] == "abc"
+    etag = first.headers["ETag"]
+
+    again = client.get("/items", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert again.content == b""
+
+
+def test_stale_etag_gets_full_body(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON", False)
+    client = _client(encode_page(PAGE))
+    res = client.get("/items", headers={"If-None-Match": '"0123456789abcdef0123"'})
+    assert res.status_code == 200
+    assert res.json() == PAGE["results"]
+
+
+def test_uncached_page_has_no_etag(monkeypatch):
+    monkeypatch.setattr(settings, "FAST_JSON", False)
+    res = _client(PAGE).get("/items", headers={"If-None-Match": "*"})
+    assert res.status_code == 200
+    assert "ETag" not in res.headers
@@ -0,0 +1,63 @@
+"""In-process cache: tag invalidation and use from several threads at once."""
+
+import sys
+import threading
+
+from app.cache.memory import InMemoryCache
+
+
+def test_tag_invalidation_drops_tagged_keys_only():
+    cache = InMemoryCache()
+    cache.set("a", 1, tags=["catalog", "brand:nike"])
+    cache.set("b", 2, tags=["catalog"])
+    cache.set("c", 3)
+    assert cache.invalidate_tags(["brand:nike"]) == 1
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.invalidate_tags(["catalog"]) == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["total_tags"] == 0
+
+
+def test_expired_entries_are_misses():
+    cache = InMemoryCache()
+    cache.set("a", 1, ttl=-1, tags=["t"])
+    assert cache.get("a") is None
+    assert cache.cleanup_expired() == 0
+    assert cache.stats()["total_keys"] == 0
+
+
+def test_concurrent_set_get_and_invalidate():
+    cache = InMemoryCache()
+    errors = []
+
+    def hammer(worker: int) -> None:
+        try:
+            for i in range(2000):
+                key = f"k{i % 50}"
+                cache.set(key, i, ttl=60, tags=["catalog", f"tag{i % 7}"])
+                cache.get(key)
+                if i % 5 == worker % 5:
+                    cache.invalidate_tags([f"tag{i % 7}", "catalog"])
+                if i % 97 == 0:
+                    cache.delete(key)
+                    cache.cleanup_expired()
+        except Exception as e:  # pragma: no cover - only on a race
+            errors.append(e)
+
+    # Switch threads as often as possible so check-then-act races show up
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=hammer, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+
+    cache.invalidate_tags(["catalog"])
+    stats = cache.stats()
+    assert stats["total_keys"] == 0 and stats["total_tags"] == 0
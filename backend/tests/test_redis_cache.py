@@ -0,0 +1,100 @@
+"""RedisCache / RespClient against the in-process RESP stand-in."""
+
+import time
+
+import pytest
+
+from app.cache.base import dump_entry, load_entry
+from app.cache.redis import RedisCache, RespClient, RespError
+from app.utils.serialization import encode_page
+from tests.resp_standin import RespStandIn
+
+
+@pytest.fixture
+def server():
+    with RespStandIn() as standin:
+        yield standin
+
+
+@pytest.fixture
+def cache(server):
+    return RedisCache(server.url, default_ttl=60)
+
+
+def test_client_roundtrip_and_errors(server):
+    client = RespClient(server.url)
+    assert client.command("SET", "k", b"\x00binary\r\n", "PX", 1000) == "OK"
+    assert client.command("GET", "k") == b"\x00binary\r\n"
+    assert client.command("GET", "missing") is None
+    with pytest.raises(RespError):
+        client.command("NOSUCHCOMMAND")
+
+
+def test_get_set_delete(cache):
+    cache.set("a", {"response": {"products": [1, 2]}, "complete": True})
+    assert cache.get("a") == {"response": {"products": [1, 2]}, "complete": True}
+    cache.delete("a")
+    assert cache.get("a") is None
+
+
+def test_encoded_payload_roundtrip(cache):
+    entry = {**encode_page({"results": [{"id": "1", "name": "Shoe"}], "next_cursor": "c"}), "facets": {}}
+    cache.set("page", entry)
+    assert cache.get("page") == entry
+
+
+def test_ttl_expiry(cache):
+    cache.set("short", [1], ttl=0.05)
+    assert cache.get("short") == [1]
+    time.sleep(0.1)
+    assert cache.get("short") is None
+
+
+def test_tag_invalidation(cache, server):
+    cache.set("shoes", [1], tags=["category:shoes", "product:1"])
+    cache.set("nike", [2], tags=["brand:nike", "product:1"])
+    cache.set("phones", [3], tags=["category:phone"])
+    assert cache.invalidate_tags(["product:1"]) == 2
+    assert cache.get("shoes") is None and cache.get("nike") is None
+    assert cache.get("phones") == [3]
+    assert {"SADD", "SMEMBERS", "DEL"} <= set(server.commands)
+
+
+def test_tag_set_outlives_its_members(cache, server):
+    cache.set("long", [1], ttl=60, tags=["t"])
+    cache.set("short", [2], ttl=1, tags=["t"])
+    assert server.execute([b"PTTL", b"cart:tag:t"]) > 30_000
+
+
+def test_clear_only_drops_own_prefix(cache, server):
+    other = RedisCache(server.url, prefix="other:")
+    cache.set("a", [1], tags=["t"])
+    other.set("a", [2])
+    cache.clear()
+    assert cache.get("a") is None
+    assert other.get("a") == [2]
+    assert "SCAN" in server.commands
+
+
+def test_stats(cache):
+    cache.set("page", encode_page({"results": [{"id": "1"}] * 50, "next_cursor": None}))
+    cache.set("plain", [1])
+    stats = cache.stats()
+    assert stats["backend"] == "redis"
+    assert stats["total_keys"] == 2
+    assert stats["payload_keys"] == 1
+
+
+def test_outage_degrades_to_miss():
+    cache = RedisCache("redis://127.0.0.1:1/0")
+    cache.set("a", [1])
+    assert cache.get("a") is None
+    assert cache.invalidate_tags(["t"]) == 0
+
+
+def test_pickled_or_foreign_entries_are_misses(cache, server):
+    server.execute([b"SET", b"cart:evil", b"\x80\x04\x95cos\nsystem\n"])
+    assert cache.get("evil") is None
+    with pytest.raises(ValueError):
+        load_entry(b"\x80\x04")
+    assert load_entry(dump_entry({"x": [1, "y"]})) == {"x": [1, "y"]}
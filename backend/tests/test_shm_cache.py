@@ -0,0 +1,51 @@
+"""Same-host SQLite cache: private directories and pickle-free entries."""
+
+import os
+import sqlite3
+import stat
+
+import pytest
+
+from app.cache.shm import SharedMemoryCache, shm_path
+from app.utils.serialization import encode_page
+
+
+def test_private_directory_per_namespace(tmp_path):
+    a = shm_path("cart_cache.db", str(tmp_path), "deploy-a")
+    b = shm_path("cart_cache.db", str(tmp_path), "deploy-b")
+    assert os.path.dirname(a) != os.path.dirname(b)
+    assert stat.S_IMODE(os.stat(os.path.dirname(a)).st_mode) == 0o700
+
+
+def test_refuses_directory_others_can_access(tmp_path):
+    shared = tmp_path / f"cart-{os.getuid()}-shared"
+    shared.mkdir(mode=0o777)
+    os.chmod(shared, 0o777)
+    with pytest.raises(PermissionError):
+        shm_path("cart_cache.db", str(tmp_path), "shared")
+
+
+def test_refuses_symlinked_directory(tmp_path):
+    target = tmp_path / "elsewhere"
+    target.mkdir(mode=0o700)
+    os.symlink(target, tmp_path / f"cart-{os.getuid()}-linked")
+    with pytest.raises(PermissionError):
+        shm_path("cart_cache.db", str(tmp_path), "linked")
+
+
+def test_entries_roundtrip_without_pickle(tmp_path):
+    cache = SharedMemoryCache(shm_path("cart_cache.db", str(tmp_path), "t"))
+    entry = encode_page({"results": [{"id": "1"}], "next_cursor": None})
+    cache.set("page", entry, tags=["product:1"])
+    assert cache.get("page") == entry
+    assert cache.invalidate_tags(["product:1"]) == 1
+    assert cache.get("page") is None
+
+
+def test_foreign_rows_are_misses(tmp_path):
+    cache = SharedMemoryCache(shm_path("cart_cache.db", str(tmp_path), "t"))
+    cache.set("k", [1])
+    conn = sqlite3.connect(cache.path)
+    conn.execute("UPDATE cache SET value = ? WHERE key = 'k'", (b"\x80\x04\x95cos\nsystem\n",))
+    conn.commit()
+    assert cache.get("k") is None
@@ -16,13 +16,7 @@ export function AdminProductList({ products, onEdit, onDelete }) {
     }
   };
 
-  const getAvgRating = (product) => {
-    const ratings = product.userRatings || [];
-    if (ratings.length > 0) {
-      return (ratings.reduce((s, r) => s + (r.rating || 0), 0) / ratings.length).toFixed(1);
-    }
-    return (product.rating || 0).toFixed(1);
-  };
+  const getAvgRating = (product) => (product.rating || 0).toFixed(1);
 
   if (products.length === 0) {
     return (
@@ -96,7 +90,7 @@ export function AdminProductList({ products, onEdit, onDelete }) {
                           <Star className="h-3.5 w-3.5 fill-amber-400 text-amber-400" />
                           <span>{getAvgRating(product)}</span>
                           <span className="text-muted-foreground">
-                            ({(product.userRatings || []).length})
+                            ({product.ratingCount || 0})
                           </span>
                         </div>
                         {product.stock !== undefined && (
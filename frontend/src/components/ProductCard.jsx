@@ -25,10 +25,8 @@ export function ProductCard({ product, onAddToCart, onRate }) {
     ? Math.round(((product.originalPrice - product.price) / product.originalPrice) * 100)
     : 0;
 
-  const ratings = product.userRatings || [];
-  const avgRating = ratings.length > 0
-    ? ratings.reduce((s, r) => s + (r.rating || 0), 0) / ratings.length
-    : product.rating || 0;
+  const avgRating = product.rating || 0;
+  const ratingCount = product.ratingCount || 0;
   const starCount = Math.round(avgRating);
 
   const cat = product.category?.toLowerCase();
@@ -134,8 +132,8 @@ export function ProductCard({ product, onAddToCart, onRate }) {
               className={`h-3 w-3 ${i < starCount ? "star-filled" : "star-empty"}`}
             />
           ))}
-          {ratings.length > 0 && (
-            <span className="text-[10px] text-muted-foreground ml-1">({ratings.length})</span>
+          {ratingCount > 0 && (
+            <span className="text-[10px] text-muted-foreground ml-1">({ratingCount})</span>
           )}
         </div>
 
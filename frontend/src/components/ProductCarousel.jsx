@@ -59,13 +59,10 @@ export function ProductCarousel({ products, title, onAddToCart }) {
                       <div className="flex items-center gap-1">
                         <Star className="h-3 w-3 fill-yellow-400 text-yellow-400" />
                         <span className="text-xs">
-                          {product.userRatings.length > 0 
-                            ? (product.userRatings.reduce((sum, r) => sum + r.rating, 0) / product.userRatings.length).toFixed(1)
-                            : '0.0'
-                          }
+                          {(product.rating || 0).toFixed(1)}
                         </span>
                       </div>
-                      <span className="text-xs text-muted-foreground">({product.userRatings.length})</span>
+                      <span className="text-xs text-muted-foreground">({product.ratingCount || 0})</span>
                     </div>
                     <div className="flex items-center gap-2">
                       <span className="font-bold text-primary">₹{product.price}</span>
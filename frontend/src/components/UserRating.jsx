@@ -4,29 +4,48 @@ import { Button } from "@/components/ui/button";
 import { Card, CardContent } from "@/components/ui/card";
 import { useCart } from "@/contexts/CartContext";
 
-export function UserRating({ productId, userRatings, onRate, showRatingInterface }) {
+// Products rated from this browser — list views only carry the rating summary,
+// not the individual userRatings, so "already rated" is remembered locally
+const RATED_KEY = "cartella_rated";
+
+const loadRated = () => {
+  try {
+    return new Set(JSON.parse(localStorage.getItem(RATED_KEY)) || []);
+  } catch {
+    return new Set();
+  }
+};
+
+const markRated = (productId) => {
+  const rated = loadRated();
+  rated.add(productId);
+  localStorage.setItem(RATED_KEY, JSON.stringify([...rated]));
+};
+
+export function UserRating({ productId, rating = 0, ratingCount = 0, onRate, showRatingInterface }) {
   const [selectedRating, setSelectedRating] = useState(0);
   const [hoveredRating, setHoveredRating] = useState(0);
+  const [summary, setSummary] = useState(null);
+  const [userHasRated, setUserHasRated] = useState(() => loadRated().has(productId));
   const { isInCart, isInWishlist } = useCart();
 
-  // Calculate average rating
-  const averageRating = userRatings.length > 0 
-    ? userRatings.reduce((sum, rating) => sum + rating.rating, 0) / userRatings.length 
-    : 0;
-
-  // Check if current user has already rated (using a mock user ID for now)
-  const currentUserId = "user123"; // In a real app, this would come from auth context
-  const userHasRated = userRatings.some(rating => rating.userId === currentUserId);
+  // Denormalized summary from the product, or the one returned by our own rating
+  const averageRating = summary ? summary.rating_avg : rating;
+  const reviewCount = summary ? summary.rating_count : ratingCount;
   
   // Determine if rating interface should be shown
   const canRate = showRatingInterface !== undefined 
     ? showRatingInterface 
     : isInCart(productId) || isInWishlist(productId);
 
-  const handleRating = (rating) => {
-    if (!userHasRated) {
-      onRate(productId, rating);
-      setSelectedRating(0);
+  const handleRating = async (value) => {
+    if (userHasRated) return;
+    setSelectedRating(0);
+    const result = await onRate(productId, value);
+    if (result) {
+      markRated(productId);
+      setUserHasRated(true);
+      setSummary(result);
     }
   };
 
@@ -59,7 +78,7 @@ export function UserRating({ productId, userRatings, onRate, showRatingInterface
           {renderStars(averageRating)}
         </div>
         <span className="text-sm text-muted-foreground">
-          {averageRating.toFixed(1)} ({userRatings.length} reviews)
+          {averageRating.toFixed(1)} ({reviewCount} reviews)
         </span>
       </div>
 
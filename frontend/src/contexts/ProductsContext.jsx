@@ -92,15 +92,23 @@ export const ProductsProvider = ({ children }) => {
   }, [fetchProducts]);
 
   const rateProduct = useCallback(async (productId, rating) => {
-    const newRating = { userId: `user${Date.now()}`, rating, timestamp: new Date() };
-    setProducts(prev => prev.map(product => {
-      if (product.id === productId) {
-        const updatedRatings = [...(product.userRatings || []), newRating];
-        const avg = updatedRatings.reduce((s, r) => s + r.rating, 0) / updatedRatings.length;
-        return { ...product, userRatings: updatedRatings, rating: Math.round(avg * 10) / 10 };
-      }
-      return product;
-    }));
+    try {
+      const summary = await api.rate(productId, rating);
+      setProducts(prev => prev.map(product => product.id === productId
+        ? {
+            ...product,
+            userRatings: [...(product.userRatings || []), summary.rating],
+            rating: summary.rating_avg,
+            ratingCount: summary.rating_count,
+          }
+        : product
+      ));
+      return summary;
+    } catch (error) {
+      console.error('Failed to rate product', error);
+      toast.error(`Rating failed: ${error.message}`);
+      return null;
+    }
   }, []);
 
   return (
@@ -27,7 +27,8 @@ const mapToFrontend = (p) => ({
   category: p.category,
   image: p.image_url || "https://placehold.co/400x400?text=No+Image",
   userRatings: p.userRatings || [],
-  rating: p.rating || 0,
+  rating: p.rating_avg ?? p.rating ?? 0,
+  ratingCount: p.rating_count ?? (p.userRatings || []).length,
   discount: p.discount || 0,
   stock: p.stock ?? 100,
   isNew: p.isNew || false,
@@ -69,9 +70,9 @@ export const api = {
    * NLP search that also returns parsed metadata (entity chips, did_you_mean, sort_by).
    * Used by SmartSearchBar to render real "AI understood" chips.
    */
-  async searchWithMeta(query, size = 100) {
+  async searchWithMeta(query, size = 100, { facets = false } = {}) {
     const res = await fetchWithTimeout(
-      `${API_BASE}/search/meta?q=${encodeURIComponent(query)}&size=${size}`
+      `${API_BASE}/search/meta?q=${encodeURIComponent(query)}&size=${size}${facets ? "&facets=true" : ""}`
     );
     if (!res.ok) throw new Error("Search failed");
     const data = await res.json();
@@ -80,6 +81,12 @@ export const api = {
       parsed: data.parsed || {},
       did_you_mean: data.did_you_mean || null,
       total: data.total || 0,
+      // Facet counts (brand, category, color, gender, price, discount) when requested
+      facets: data.facets || null,
+      // Results for did_you_mean, fetched speculatively alongside the original
+      corrected: data.corrected
+        ? { ...data.corrected, results: (data.corrected.results || []).map(mapToFrontend) }
+        : null,
     };
   },
 
@@ -204,6 +211,20 @@ export const api = {
     return res.json();
   },
 
+  /** Append a user rating — returns the product's updated rating summary */
+  async rate(id, rating, userId) {
+    const res = await fetchWithTimeout(`${API_BASE}/products/${id}/ratings`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ rating, ...(userId && { userId }) }),
+    });
+    if (!res.ok) {
+      const err = await res.json().catch(() => ({}));
+      throw new Error(err.detail || "Rating failed");
+    }
+    return res.json();
+  },
+
   /** Get similar products */
   async getSimilar(id, limit = 6) {
     const res = await fetchWithTimeout(
@@ -126,7 +126,7 @@ export default function Cart() {
 
                         {/* Rating */}
                         <div className="pt-2 border-t border-gray-100">
-                          <UserRating productId={item.id} userRatings={item.userRatings} onRate={rateProduct} />
+                          <UserRating productId={item.id} rating={item.rating} ratingCount={item.ratingCount} onRate={rateProduct} />
                         </div>
                       </div>
                     </div>
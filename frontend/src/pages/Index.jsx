@@ -72,7 +72,7 @@ export default function Index() {
 
   useEffect(() => setFiltered(products), [products]);
 
-  const bestSellers = products.filter(p => (p.userRatings?.length || 0) > 3).sort((a, b) => b.userRatings.length - a.userRatings.length).slice(0, 16);
+  const bestSellers = products.filter(p => (p.ratingCount || 0) > 3).sort((a, b) => b.ratingCount - a.ratingCount).slice(0, 16);
   const deals = products.filter(p => (p.discount || 0) >= 30).sort((a, b) => b.discount - a.discount).slice(0, 16);
 
   const onSearch = async (q) => { setQuery(q); await ctx.searchProducts(q); };
@@ -80,7 +80,7 @@ export default function Index() {
     let r = products;
     if (f.categories.length) r = r.filter(p => f.categories.includes(p.category));
     r = r.filter(p => p.price >= f.priceRange[0] && p.price <= f.priceRange[1]);
-    if (f.rating > 0) r = r.filter(p => { const rt = p.userRatings || []; return rt.length ? rt.reduce((s, v) => s + v.rating, 0) / rt.length >= f.rating : false; });
+    if (f.rating > 0) r = r.filter(p => p.ratingCount > 0 && p.rating >= f.rating);
     setFiltered(r);
   };
   const addCart = (p) => { addToCart(p); toast({ title: "Added to cart", description: p.name }); };
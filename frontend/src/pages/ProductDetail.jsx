@@ -50,11 +50,11 @@ const ProductDetail = () => {
 
   useEffect(() => {
     setLoading(true);
+    // List data is the slim "card" projection — show it instantly, then
+    // hydrate description + reviews from the detail endpoint
     const local = products.find((p) => p.id === id);
     if (local) { setProduct(local); setLoading(false); }
-    else {
-      api.getOne(id).then(setProduct).catch(() => toast({ title: "Product not found", variant: "destructive" })).finally(() => setLoading(false));
-    }
+    api.getOne(id).then(setProduct).catch(() => { if (!local) toast({ title: "Product not found", variant: "destructive" }); }).finally(() => setLoading(false));
     api.getSimilar(id, 6).then((d) => setSimilar(d.similar_products || []));
   }, [id]); // eslint-disable-line
 
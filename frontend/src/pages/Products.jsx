@@ -95,11 +95,7 @@ const Products = () => {
       r = r.filter(p => p.price >= filters.priceRange[0] && p.price <= filters.priceRange[1]);
     }
     if (filters.rating > 0) {
-      r = r.filter(p => {
-        const rts = p.userRatings || [];
-        const avg = rts.length > 0 ? rts.reduce((s, rv) => s + (rv.rating || 0), 0) / rts.length : (p.rating || 0);
-        return avg >= filters.rating;
-      });
+      r = r.filter(p => (p.rating || 0) >= filters.rating);
     }
     return r;
   };
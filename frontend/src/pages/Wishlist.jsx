@@ -87,7 +87,8 @@ export default function Wishlist() {
                    {/* Rating Component - Show average rating only */}
                     <UserRating
                       productId={item.id}
-                      userRatings={item.userRatings}
+                      rating={item.rating}
+                      ratingCount={item.ratingCount}
                       onRate={rateProduct}
                       showRatingInterface={false}
                     />